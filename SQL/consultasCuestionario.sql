@@ -56,25 +56,10 @@ WHERE a.species IS NOT NULL
 
 CREATE VIEW vista_ataques_fatales_por_decada AS
 SELECT 
-    CASE 
-        WHEN year BETWEEN 1900 AND 1909 THEN '1900-1909'
-        WHEN year BETWEEN 1910 AND 1919 THEN '1910-1919'
-        WHEN year BETWEEN 1920 AND 1929 THEN '1920-1929'
-        WHEN year BETWEEN 1930 AND 1939 THEN '1930-1939'
-        WHEN year BETWEEN 1940 AND 1949 THEN '1940-1949'
-        WHEN year BETWEEN 1950 AND 1959 THEN '1950-1959'
-        WHEN year BETWEEN 1960 AND 1969 THEN '1960-1969'
-        WHEN year BETWEEN 1970 AND 1979 THEN '1970-1979'
-        WHEN year BETWEEN 1980 AND 1989 THEN '1980-1989'
-        WHEN year BETWEEN 1990 AND 1999 THEN '1990-1999'
-        WHEN year BETWEEN 2000 AND 2009 THEN '2000-2009'
-        WHEN year BETWEEN 2010 AND 2019 THEN '2010-2019'
-        WHEN year BETWEEN 2020 AND 2025 THEN '2020-2025'
-        ELSE 'Otra'
-    END as decada,
+    ((year / 10) * 10) || '-' || ((year / 10) * 10 + 9) as decada,
     COUNT(*) as ataques_fatales
 FROM shark_attackdatos 
 WHERE is_fatal = 'Y' 
     AND year IS NOT NULL
-GROUP BY decada
+GROUP BY (year / 10)
 ORDER BY MIN(year);
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Normalización de la actividad de cada ataque a un conjunto fijo de categorías.
+
+Cada texto se separa en palabras (mayúsculas, sin signos de puntuación) y se busca en un
+vocabulario de términos por categoría, comparando siempre la forma compacta (sin espacios ni
+guiones) para que 'PADDLE BOARDING', 'PADDLE-BOARDING' y 'PADDLEBOARDING' coincidan:
+    1. Exacto: el texto completo es un término del vocabulario
+    2. Reglas: el primer término que aparece en el texto, probando en cada posición los
+       grupos de 3, 2 y 1 palabras (el término más largo gana: 'SURF FISHING' es pesca)
+    3. Difuso: si no aparece ningún término, el más parecido por distancia de edición
+       (candidatos preseleccionados por trigramas de caracteres compartidos)
+    4. Sin coincidencia: 'Otras actividades'
+
+La clasificación se memoriza por texto crudo y por palabra, y la columna se recodifica con
+un `take` sobre los códigos de pd.factorize: el costo depende del número de valores únicos,
+no del número de filas.
+"""
+import re
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+OTRAS = 'Otras actividades'
+DESCONOCIDO = 'Desconocido'
+
+# Terminos de cada categoria (se comparan en forma compacta: mayusculas sin espacios ni guiones)
+TERMINOS = {
+    'Surfing': ('SURFING', 'SURF', 'SURFER', 'SURFBOARD', 'SURFBOARDING', 'BODY SURFING', 'BODYSURFER',
+                'WINDSURFING', 'WINDSURFER', 'KITE SURFING', 'KITESURFER', 'KITEBOARDING'),
+    'Bodyboarding': ('BODYBOARDING', 'BODY BOARDING', 'BODYBOARD', 'BODYBOARDER', 'BOOGIE BOARDING',
+                     'BOOGIE BOARD', 'BOOGIEBOARDER'),
+    'Pesca': ('FISHING', 'FISHERMAN', 'FISHERMEN', 'SPEARFISHING', 'SPEARFISHERMAN', 'SPEAR FISHING', 'ANGLING',
+              'SURF FISHING', 'KAYAK FISHING', 'SHARK FISHING', 'NETTING', 'NETFISHING', 'LINE FISHING'),
+    'Natación': ('SWIMMING', 'SWIM', 'SWIMMER', 'BATHING', 'BATHER', 'FLOATING', 'TREADING WATER', 'SPLASHING'),
+    'Paddle Boarding': ('PADDLE BOARDING', 'PADDLEBOARD', 'PADDLEBOARDER', 'STAND UP PADDLE BOARDING', 'SUP'),
+    'Buceo': ('DIVING', 'DIVER', 'DIVERS', 'SCUBA DIVING', 'SCUBA', 'SNORKELING', 'SNORKELLING', 'SNORKELER', 'SNORKELLER',
+              'FREE DIVING', 'FREEDIVER', 'SKIN DIVING', 'SKINDIVER', 'PEARL DIVING', 'SPONGE DIVING',
+              'HARD HAT DIVING'),
+    'Vadeo': ('WADING', 'WADE', 'WADE FISHING', 'STANDING', 'WALKING'),
+    'Kayaking': ('KAYAKING', 'KAYAK', 'KAYAKER', 'CANOEING', 'CANOE'),
+    'Surf-skiing': ('SURF SKIING', 'SURF SKI', 'SURFSKIER', 'PADDLE SKIING', 'PADDLESKI'),
+    'Remo': ('ROWING', 'ROWBOAT', 'ROWER')
+}
+CATEGORIAS = (*TERMINOS, OTRAS)
+
+# Grupos de palabras que se prueban en cada posicion (de mayor a menor) y umbral del difuso
+MAXIMO_PALABRAS = 3
+LONGITUD_MINIMA_DIFUSA = 6
+
+_NO_LETRAS = re.compile(r'[^A-Z]+')
+
+
+def _compacto(texto: str) -> str:
+    """Forma compacta de un texto: mayúsculas, solo letras, sin espacios."""
+    return _NO_LETRAS.sub('', texto.upper())
+
+
+def _trigramas(termino: str) -> set:
+    """Trigramas de caracteres de un término con marcas de inicio y fin."""
+    marcado = f"^{termino}$"
+    return {marcado[i:i + 3] for i in range(len(marcado) - 2)}
+
+
+# Tabla compilada una sola vez: forma compacta -> categoria, e indice invertido de trigramas
+VOCABULARIO = {_compacto(t): categoria for categoria, terminos in TERMINOS.items() for t in terminos}
+_INDICE_TRIGRAMAS = defaultdict(set)
+for _termino in VOCABULARIO:
+    for _trigrama in _trigramas(_termino):
+        _INDICE_TRIGRAMAS[_trigrama].add(_termino)
+
+
+def palabras(texto: str) -> Tuple[str, ...]:
+    """Palabras de un texto de actividad (mayúsculas, separadas por cualquier carácter que no sea letra)."""
+    return tuple(p for p in _NO_LETRAS.split(str(texto).upper()) if p)
+
+
+def distancia_edicion(a: str, b: str, maximo: Optional[int] = None) -> int:
+    """
+    Distancia de Levenshtein entre dos textos (inserciones, borrados y sustituciones).
+
+    Args:
+        a (str): Primer texto
+        b (str): Segundo texto
+        maximo (Optional[int]): Si se indica, se deja de calcular en cuanto la distancia lo supera
+
+    Returns:
+        int: Distancia (maximo + 1 si se cortó el cálculo)
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        actual = [i]
+        for j, cb in enumerate(b, start=1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if maximo is not None and min(actual) > maximo:
+            return maximo + 1
+        anterior = actual
+    return anterior[-1]
+
+
+def _umbral_difuso(termino: str) -> int:
+    """Distancia de edición máxima aceptada para un término del vocabulario."""
+    if len(termino) >= 10:
+        return 2
+    return 1 if len(termino) >= LONGITUD_MINIMA_DIFUSA else 0
+
+
+@lru_cache(maxsize=None)
+def termino_cercano(palabra: str) -> Optional[str]:
+    """
+    Término del vocabulario más parecido a una palabra (o grupo de palabras compactado) que
+    empieza por la misma letra, a distancia de edición 1 para términos de 6 a 9 letras y 2
+    para los más largos (las palabras cortas no se corrigen: 'PETTING' no es 'NETTING'). Los
+    candidatos se preseleccionan por trigramas compartidos y longitud.
+
+    Args:
+        palabra (str): Forma compacta a buscar
+
+    Returns:
+        Optional[str]: Término más cercano, o None si ninguno está dentro del umbral
+    """
+    if len(palabra) < LONGITUD_MINIMA_DIFUSA:
+        return None
+    candidatos = set().union(*(_INDICE_TRIGRAMAS.get(t, ()) for t in _trigramas(palabra)))
+    mejor, mejor_distancia = None, None
+    for termino in sorted(candidatos):
+        umbral = _umbral_difuso(termino)
+        if termino[0] != palabra[0] or abs(len(termino) - len(palabra)) > umbral:
+            continue
+        distancia = distancia_edicion(palabra, termino, umbral)
+        if distancia <= umbral and (mejor_distancia is None or distancia < mejor_distancia):
+            mejor, mejor_distancia = termino, distancia
+    return mejor
+
+
+def _buscar(partes: Tuple[str, ...], difuso: bool) -> Optional[str]:
+    """Primer término del texto, probando en cada posición los grupos de palabras más largos primero."""
+    for inicio in range(len(partes)):
+        for largo in range(min(MAXIMO_PALABRAS, len(partes) - inicio), 0, -1):
+            grupo = ''.join(partes[inicio:inicio + largo])
+            termino = termino_cercano(grupo) if difuso else (grupo if grupo in VOCABULARIO else None)
+            if termino is not None:
+                return VOCABULARIO[termino]
+    return None
+
+
+@lru_cache(maxsize=None)
+def clasificar(texto: str) -> Tuple[str, str]:
+    """
+    Categoría de un texto de actividad y el método con el que se obtuvo.
+
+    Args:
+        texto (str): Actividad cruda
+
+    Returns:
+        Tuple[str, str]: (categoría de CATEGORIAS, método: 'exacto', 'reglas', 'difuso',
+        'sin coincidencia' o 'desconocido')
+    """
+    if texto.strip().upper() in {'', DESCONOCIDO.upper(), 'NAN', 'NONE', 'UNKNOWN'}:
+        return OTRAS, 'desconocido'
+    compacto = _compacto(texto)
+    if compacto in VOCABULARIO:
+        return VOCABULARIO[compacto], 'exacto'
+
+    partes = palabras(texto)
+    categoria = _buscar(partes, difuso=False)
+    if categoria is not None:
+        return categoria, 'reglas'
+    categoria = _buscar(partes, difuso=True)
+    if categoria is not None:
+        return categoria, 'difuso'
+    return OTRAS, 'sin coincidencia'
+
+
+def normalizar_actividades(serie: pd.Series) -> pd.Series:
+    """
+    Recodifica una columna de actividades a CATEGORIAS clasificando solo sus valores únicos.
+
+    Args:
+        serie (pd.Series): Actividades crudas (texto o categórica)
+
+    Returns:
+        pd.Series: Columna categórica con las categorías CATEGORIAS y el índice de la original
+        (los nulos y desconocidos quedan en 'Otras actividades')
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    posiciones = {categoria: i for i, categoria in enumerate(CATEGORIAS)}
+    tabla = np.array([posiciones[clasificar(str(valor))[0]] for valor in unicos] + [posiciones[OTRAS]],
+                     dtype=np.int8)
+    categoria = pd.Categorical.from_codes(tabla[codigos], categories=CATEGORIAS)
+    return pd.Series(categoria, index=serie.index, name=serie.name)
+
+
+def informe_cobertura(serie: pd.Series) -> Dict[str, object]:
+    """
+    Normaliza una columna de actividades midiendo el tiempo y reporta la cobertura: qué
+    fracción de las filas y de los valores únicos con actividad conocida llega a una
+    categoría distinta de 'Otras actividades', y con qué método.
+
+    Args:
+        serie (pd.Series): Actividades crudas
+
+    Returns:
+        Dict[str, object]: Diccionario con:
+            - 'filas', 'valores_unicos': tamaño de la columna
+            - 'cobertura_filas', 'cobertura_valores': proporción clasificada (0 a 1) sobre
+              las filas y valores únicos con actividad conocida
+            - 'segundos': tiempo de normalizar_actividades con las memorias vacías
+            - 'segundos_memoria': tiempo de una segunda pasada con las memorias llenas
+            - 'metodos': pd.DataFrame con filas y valores únicos por método
+            - 'sin_clasificar': pd.Series con las actividades sin categoría más frecuentes
+    """
+    clasificar.cache_clear()
+    termino_cercano.cache_clear()
+    inicio = time.perf_counter()
+    normalizar_actividades(serie)
+    segundos = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    normalizar_actividades(serie)
+    segundos_memoria = time.perf_counter() - inicio
+
+    conteos = serie.astype(object).fillna('').astype(str).value_counts()
+    metodos = pd.Series([clasificar(valor)[1] for valor in conteos.index], index=conteos.index)
+    conocidos = metodos != 'desconocido'
+    clasificados = conocidos & (metodos != 'sin coincidencia')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cobertura_filas = conteos[clasificados].sum() / conteos[conocidos].sum()
+        cobertura_valores = clasificados.sum() / conocidos.sum()
+
+    return {
+        'filas': len(serie),
+        'valores_unicos': len(conteos),
+        'cobertura_filas': float(cobertura_filas),
+        'cobertura_valores': float(cobertura_valores),
+        'segundos': segundos,
+        'segundos_memoria': segundos_memoria,
+        'metodos': pd.DataFrame({'filas': conteos.groupby(metodos).sum(),
+                                 'valores_unicos': metodos.value_counts()}).fillna(0).astype(np.int64),
+        'sin_clasificar': conteos[metodos == 'sin coincidencia']
+    }
@@ -9,6 +9,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Migraciones pendientes del esquema de la base de datos (una vez por proceso)
+utils.preparar_bd()
+
 # mostrar logos
 stilez.mostrar_logos()
 
@@ -1,7 +1,155 @@
+"""
+Exporta la tabla shark_attackdatos (u otra tabla de shark_attacks.db) en bloques, sin cargarla
+completa en memoria. La memoria usada queda acotada por el tamaño del bloque (--bloque).
+
+Formatos: csv, csv.gz, parquet (requiere pyarrow) y jsonl.
+
+Uso:
+    python db_to_csv.py                                   # SharkAttacks.csv junto a este script
+    python db_to_csv.py -f parquet -o ataques.parquet
+    python db_to_csv.py -f csv.gz -c case_number,year,country -w "is_fatal = 'Y'"
+"""
+import argparse
+import gzip
+import os
+import sqlite3
+import sys
+import time
+from urllib.parse import quote
+
 import pandas as pd
-import sqlite3 as db
 
-con = db.connect('shark_attacks.db')
-df = pd.read_sql_query('select * from shark_attackdatos;', con)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+RUTA_BD = os.path.join(current_dir, 'shark_attacks.db')
+
+FORMATOS = {'csv': '.csv', 'csv.gz': '.csv.gz', 'parquet': '.parquet', 'jsonl': '.jsonl'}
+BLOQUE = 50_000
+
+
+def _columnas_tabla(conn: sqlite3.Connection, tabla: str) -> list:
+    columnas = [fila[1] for fila in conn.execute(f'PRAGMA table_info("{tabla}")')]
+    if not columnas:
+        raise ValueError(f"la tabla {tabla} no existe")
+    return columnas
+
+
+def _esquema_parquet(conn: sqlite3.Connection, tabla: str, columnas: list, filtro: str):
+    """
+    Determina un tipo Arrow estable por columna a partir de las clases de almacenamiento
+    reales de SQLite (una sola pasada), para que todos los bloques compartan el esquema.
+    """
+    import pyarrow as pa
+
+    expresiones = ", ".join(f'group_concat(DISTINCT typeof("{c}"))' for c in columnas)
+    tipos = conn.execute(f'SELECT {expresiones} FROM "{tabla}" {filtro}').fetchone()
+
+    campos = []
+    for columna, clases in zip(columnas, tipos):
+        clases = set((clases or 'null').split(',')) - {'null'}
+        if clases and clases <= {'integer'}:
+            campos.append(pa.field(columna, pa.int64()))
+        elif clases and clases <= {'integer', 'real'}:
+            campos.append(pa.field(columna, pa.float64()))
+        else:
+            campos.append(pa.field(columna, pa.string()))
+    return pa.schema(campos)
+
+
+def _escritor_parquet(conn, tabla, columnas, filtro, salida):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_parquet(conn, tabla, columnas, filtro)
+    escritor = pq.ParquetWriter(salida, esquema)
+    texto = [campo.name for campo in esquema if campo.type == pa.string()]
+
+    def escribir(bloque: pd.DataFrame, primero: bool):
+        for columna in texto:
+            bloque[columna] = bloque[columna].map(lambda v: v if v is None or isinstance(v, str) else str(v))
+        escritor.write_table(pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False))
+
+    return escribir, escritor.close
+
+
+def exportar(salida: str, formato: str = 'csv', tabla: str = 'shark_attackdatos', columnas: list = None,
+             filtro: str = None, bloque: int = BLOQUE, ruta_bd: str = RUTA_BD) -> dict:
+    """
+    Exporta una tabla en bloques de `bloque` filas al formato indicado.
+
+    Args:
+        salida (str): Ruta del archivo de salida
+        formato (str): 'csv', 'csv.gz', 'parquet' o 'jsonl'
+        tabla (str): Tabla a exportar
+        columnas (list): Columnas a exportar (por defecto todas)
+        filtro (str): Condición SQL para la cláusula WHERE (por defecto sin filtro)
+        bloque (int): Número de filas por bloque; acota la memoria usada
+        ruta_bd (str): Ruta del archivo de base de datos
+
+    Returns:
+        dict: filas exportadas, segundos y filas por segundo
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"formato no soportado: {formato}")
+
+    conn = sqlite3.connect(f"file:{quote(ruta_bd)}?mode=ro", uri=True)
+    inicio = time.perf_counter()
+    filas = 0
+    try:
+        disponibles = _columnas_tabla(conn, tabla)
+        columnas = columnas or disponibles
+        desconocidas = [c for c in columnas if c not in disponibles]
+        if desconocidas:
+            raise ValueError(f"columnas inexistentes en {tabla}: {', '.join(desconocidas)}")
+
+        condicion = f"WHERE {filtro}" if filtro else ""
+        lista = ", ".join(f'"{c}"' for c in columnas)
+        consulta = f'SELECT {lista} FROM "{tabla}" {condicion}'
+
+        if formato == 'parquet':
+            escribir, cerrar = _escritor_parquet(conn, tabla, columnas, condicion, salida)
+        else:
+            archivo = gzip.open(salida, 'wt', newline='') if formato == 'csv.gz' else open(salida, 'w', newline='')
+            cerrar = archivo.close
+            if formato == 'jsonl':
+                def escribir(b, primero):
+                    b.to_json(archivo, orient='records', lines=True, force_ascii=False)
+            else:
+                def escribir(b, primero):
+                    b.to_csv(archivo, index=False, header=primero)
+
+        try:
+            for numero, trozo in enumerate(pd.read_sql_query(consulta, conn, chunksize=bloque)):
+                escribir(trozo, numero == 0)
+                filas += len(trozo)
+            if filas == 0 and formato in ('csv', 'csv.gz'):
+                escribir(pd.DataFrame(columns=columnas), True)
+        finally:
+            cerrar()
+    finally:
+        conn.close()
+
+    segundos = time.perf_counter() - inicio
+    return {'filas': filas, 'segundos': segundos, 'filas_por_segundo': filas / segundos if segundos else 0.0}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Exporta shark_attacks.db en bloques con memoria acotada.")
+    parser.add_argument('-f', '--formato', choices=list(FORMATOS), default='csv')
+    parser.add_argument('-o', '--salida', help="archivo de salida (por defecto SharkAttacks.<ext> junto a este script)")
+    parser.add_argument('-t', '--tabla', default='shark_attackdatos')
+    parser.add_argument('-c', '--columnas', help="lista de columnas separadas por coma")
+    parser.add_argument('-w', '--where', help="condición SQL para filtrar filas")
+    parser.add_argument('-b', '--bloque', type=int, default=BLOQUE, help="filas por bloque")
+    parser.add_argument('--bd', default=RUTA_BD, help="ruta de la base de datos")
+    args = parser.parse_args(argumentos)
+
+    salida = args.salida or os.path.join(current_dir, 'SharkAttacks' + FORMATOS[args.formato])
+    columnas = [c.strip() for c in args.columnas.split(',')] if args.columnas else None
+
+    resultado = exportar(salida, args.formato, args.tabla, columnas, args.where, args.bloque, args.bd)
+    print(f"{resultado['filas']} filas exportadas a {salida} en {resultado['segundos']:.2f} s "
+          f"({resultado['filas_por_segundo']:,.0f} filas/s)")
+
 
-df.to_csv('SharkAttacks.csv', index=False)
+if __name__ == '__main__':
+    sys.exit(main())
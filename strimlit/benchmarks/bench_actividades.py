@@ -0,0 +1,78 @@
+"""
+Compara la categorización de actividades previa (diccionario de términos exactos) con el
+motor de actividades.py sobre los textos de actividad crudos de bbdd/SharkAttacks.csv,
+repetidos hasta el número de filas pedido: cobertura de cada enfoque y tiempo de ambos.
+Comprueba además que el motor da lo mismo que clasificar fila a fila.
+
+Uso:
+    python benchmarks/bench_actividades.py [filas ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import actividades  # noqa: E402
+
+RUTA_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bbdd', 'SharkAttacks.csv')
+TAMANOS = [6_000, 600_000, 6_000_000]
+
+# Diccionario de la categorizacion previa de utilsg._construir_datos_graficos
+MAPEO_ORIGINAL = {
+    'SURFING': 'Surfing', 'SURF': 'Surfing', 'SURFER': 'Surfing',
+    'BODYBOARDING': 'Bodyboarding', 'BODY BOARDING': 'Bodyboarding', 'BOOGIE BOARDING': 'Bodyboarding',
+    'FISHING': 'Pesca', 'FISHERMAN': 'Pesca', 'SPEARFISHING': 'Pesca',
+    'SWIMMING': 'Natación', 'SWIM': 'Natación', 'SWIMMER': 'Natación',
+    'PADDLE BOARDING': 'Paddle Boarding', 'STAND-UP PADDLE BOARDING': 'Paddle Boarding',
+    'DIVING': 'Buceo', 'SCUBA DIVING': 'Buceo', 'SNORKELING': 'Buceo',
+    'WADING': 'Vadeo', 'WADE FISHING': 'Vadeo',
+    'KAYAKING': 'Kayaking', 'CANOEING': 'Kayaking',
+    'SURF-SKIING': 'Surf-skiing', 'SURF SKIING': 'Surf-skiing',
+    'ROWING': 'Remo', 'ROWBOAT': 'Remo'
+}
+
+
+def categorizacion_original(serie: pd.Series) -> pd.Series:
+    """Réplica de la categorización previa, usada como referencia."""
+    resultado = serie.astype(str).str.upper().str.strip().map(MAPEO_ORIGINAL)
+    return resultado.fillna(actividades.OTRAS)
+
+
+def main(tamanos):
+    crudas = pd.read_csv(RUTA_CSV, usecols=['activity'])['activity']
+    conocidas = crudas.notna()
+    original = categorizacion_original(crudas)
+    nueva = actividades.normalizar_actividades(crudas)
+    print(f"{len(crudas):,} filas y {crudas.nunique():,} valores únicos en SharkAttacks.csv")
+    print(f"cobertura (filas con actividad): diccionario {(original[conocidas] != actividades.OTRAS).mean():.1%}"
+          f" | motor {(nueva[conocidas] != actividades.OTRAS).mean():.1%}")
+    print(actividades.informe_cobertura(crudas)['metodos'].to_string())
+
+    # El recodificado por valores unicos da lo mismo que clasificar cada fila
+    fila_a_fila = [actividades.clasificar(str(v))[0] if pd.notna(v) else actividades.OTRAS for v in crudas]
+    assert nueva.astype(str).tolist() == fila_a_fila
+
+    for filas in tamanos:
+        serie = pd.Series(np.resize(crudas.to_numpy(dtype=object), filas)).astype('category')
+        inicio = time.perf_counter()
+        categorizacion_original(serie)
+        t_original = time.perf_counter() - inicio
+
+        actividades.clasificar.cache_clear()
+        actividades.termino_cercano.cache_clear()
+        inicio = time.perf_counter()
+        actividades.normalizar_actividades(serie)
+        t_frio = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        actividades.normalizar_actividades(serie)
+        t_memoria = time.perf_counter() - inicio
+        print(f"{filas:>11,} filas: diccionario {t_original:7.3f} s | motor {t_frio:7.3f} s"
+              f" (con memoria {t_memoria:7.3f} s)")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAMANOS)
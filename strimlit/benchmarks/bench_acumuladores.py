@@ -0,0 +1,67 @@
+"""
+Compara las tablas de frecuencia y de doble entrada calculadas sobre el DataFrame completo con
+las obtenidas por bloques con los acumuladores de frecuencias.py, y reporta tiempo y memoria
+máxima de cada camino.
+
+Uso:
+    python benchmarks/bench_acumuladores.py [filas_por_bloque]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import frecuencias  # noqa: E402
+import utils  # noqa: E402
+
+COLUMNAS = ['is_fatal_cat', 'activity', 'country', 'season', 'sex']
+PARES = [('activity', 'is_fatal_cat'), ('country', 'is_fatal_cat'), ('season', 'is_fatal_cat')]
+
+
+def _medir(funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico / 1024
+
+
+def _completo():
+    df = utils._consultar_y_limpiar()
+    return ({c: utils.analizar_frecuencias(df, c) for c in COLUMNAS},
+            {p: utils.crear_tablas_doble_entrada(df, *p) for p in PARES})
+
+
+def _por_bloques(bloque: int):
+    acumuladores = utils.acumular_por_bloques(
+        [frecuencias.AcumuladorFrecuencias(c) for c in COLUMNAS]
+        + [frecuencias.AcumuladorContingencia(*p) for p in PARES],
+        bloque=bloque
+    )
+    return ({a.columna: a.result() for a in acumuladores[:len(COLUMNAS)]},
+            {(a.fila, a.columna): a.result() for a in acumuladores[len(COLUMNAS):]})
+
+
+def main(bloque: int):
+    (simples, dobles), t_completo, m_completo = _medir(_completo)
+    (simples_b, dobles_b), t_bloques, m_bloques = _medir(lambda: _por_bloques(bloque))
+
+    for columna in COLUMNAS:
+        pd.testing.assert_frame_equal(simples[columna], simples_b[columna])
+    for par in PARES:
+        for clave in ('absoluta', 'porcentaje_total', 'condicional_filas', 'condicional_columnas'):
+            pd.testing.assert_frame_equal(dobles[par][clave], dobles_b[par][clave])
+
+    print(f"tablas identicas ({len(COLUMNAS)} de frecuencia, {len(PARES)} de doble entrada)")
+    print(f"completo:   {t_completo:.3f} s, pico {m_completo:,.0f} KB")
+    print(f"por bloques ({bloque} filas): {t_bloques:.3f} s, pico {m_bloques:,.0f} KB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,57 @@
+"""
+Mide el explorador de filtros sobre el DataFrame limpio replicado hasta `filas` filas: tiempo
+de construcción del índice de bitmaps, memoria de los bitmaps y tiempo de cada máscara frente
+al mismo filtro con comparaciones booleanas de pandas (los resultados deben coincidir).
+
+Uso:
+    python benchmarks/bench_filtros.py [filas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import filtros  # noqa: E402
+import utils  # noqa: E402
+
+CONSULTAS = [
+    ({'country': ['USA', 'AUSTRALIA']}, {}, 'y'),
+    ({'activity': ['SURFING'], 'season': ['SUMMER', 'WINTER']}, {'age': (18, 40)}, 'y'),
+    ({'sex': ['Femenino'], 'moon_phase': ['FULL MOON']}, {'year': (1950, 2000)}, 'o'),
+    ({'country': ['USA'], 'species': ['WHITE_SHARK']}, {'age': (10, 30), 'year': (1980, 2020)}, 'y'),
+]
+
+
+def _mascara_pandas(df: pd.DataFrame, valores: dict, rangos: dict, combinar: str) -> np.ndarray:
+    condiciones = [df[c].isin(v).to_numpy() for c, v in valores.items()]
+    condiciones += [df[c].between(*r).to_numpy() for c, r in rangos.items()]
+    return np.logical_and.reduce(condiciones) if combinar == 'y' else np.logical_or.reduce(condiciones)
+
+
+def main(filas: int):
+    base = utils._consultar_y_limpiar()
+    df = pd.concat([base] * max(1, -(-filas // len(base))), ignore_index=True).iloc[:filas]
+
+    inicio = time.perf_counter()
+    indice = filtros.IndiceBitmaps.desde_dataframe(df, utils.DIMENSIONES_FILTRO, utils.RANGOS_FILTRO)
+    print(f"{len(df):,} filas: indice en {time.perf_counter() - inicio:.2f} s, {indice.memoria_kb():,.0f} KB")
+
+    for valores, rangos, combinar in CONSULTAS:
+        inicio = time.perf_counter()
+        mascara = indice.mascara(valores, rangos, combinar)
+        t_bitmaps = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        referencia = _mascara_pandas(df, valores, rangos, combinar)
+        t_pandas = time.perf_counter() - inicio
+
+        assert (mascara == referencia).all()
+        print(f"{int(mascara.sum()):>10,} filas | bitmaps {t_bitmaps * 1000:7.1f} ms | pandas {t_pandas * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,83 @@
+"""
+Mide el DBSCAN sobre la esfera de hotspots.py con coordenadas sintéticas (la bbdd actual no
+trae geo_point) y comprueba, en una muestra pequeña, que las etiquetas coinciden con un
+DBSCAN de fuerza bruta sobre la matriz completa de distancias haversine.
+
+Uso:
+    python benchmarks/bench_hotspots.py [puntos] [radio_km] [minimo]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hotspots  # noqa: E402
+
+
+def _sinteticos(puntos: int, generador: np.random.Generator, playas: int):
+    # La mitad de los ataques se concentra alrededor de las playas; el resto se reparte por las costas
+    centros = np.column_stack([generador.uniform(-45, 45, playas), generador.uniform(-180, 180, playas)])
+    playa = generador.integers(0, len(centros), puntos // 2)
+    latitud = np.r_[centros[playa, 0] + generador.normal(0, 0.2, len(playa)),
+                    generador.uniform(-60, 60, puntos - len(playa))]
+    longitud = np.r_[centros[playa, 1] + generador.normal(0, 0.2, len(playa)),
+                     generador.uniform(-180, 180, puntos - len(playa))]
+    return np.clip(latitud, -90, 90), (longitud + 180) % 360 - 180
+
+
+def _dbscan_fuerza_bruta(latitud, longitud, radio_km, minimo):
+    lat, lon = np.radians(latitud), np.radians(longitud)
+    a = (np.sin((lat[:, None] - lat) / 2) ** 2
+         + np.cos(lat[:, None]) * np.cos(lat) * np.sin((lon[:, None] - lon) / 2) ** 2)
+    vecinos = 2 * hotspots.RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1))) <= radio_km
+    nucleo = vecinos.sum(axis=1) >= minimo
+    etiquetas = np.full(len(latitud), -1)
+    actual = 0
+    for inicio in np.flatnonzero(nucleo):
+        if etiquetas[inicio] >= 0:
+            continue
+        pendientes = [inicio]
+        etiquetas[inicio] = actual
+        while pendientes:
+            punto = pendientes.pop()
+            for vecino in np.flatnonzero(vecinos[punto] & nucleo & (etiquetas < 0)):
+                etiquetas[vecino] = actual
+                pendientes.append(vecino)
+        actual += 1
+    # Puntos frontera: cualquier nucleo vecino (el DBSCAN no fija cual si hay varios)
+    frontera = ~nucleo & (vecinos & nucleo).any(axis=1)
+    etiquetas[frontera] = etiquetas[np.argmax(vecinos[frontera] & nucleo, axis=1)]
+    return etiquetas, nucleo
+
+
+def _misma_particion(a, b, nucleo):
+    # Las etiquetas pueden diferir en numeracion; los nucleos deben formar los mismos grupos
+    pares = set(zip(a[nucleo], b[nucleo]))
+    return len(pares) == len({x for x, _ in pares}) == len({y for _, y in pares})
+
+
+def main(puntos: int, radio_km: float, minimo: int):
+    generador = np.random.default_rng(0)
+
+    latitud, longitud = _sinteticos(2_000, generador, playas=20)
+    referencia, nucleo = _dbscan_fuerza_bruta(latitud, longitud, radio_km, minimo)
+    etiquetas = hotspots.dbscan_esferico(latitud, longitud, radio_km, minimo)
+    assert _misma_particion(etiquetas, referencia, nucleo)
+    assert np.array_equal(etiquetas < 0, referencia < 0)
+    print(f"2,000 puntos: {etiquetas.max() + 1} hotspots, igual que la fuerza bruta")
+
+    latitud, longitud = _sinteticos(puntos, generador, playas=puntos // 1000)
+    inicio = time.perf_counter()
+    etiquetas = hotspots.dbscan_esferico(latitud, longitud, radio_km, minimo)
+    segundos = time.perf_counter() - inicio
+    print(f"{puntos:,} puntos, radio {radio_km:g} km, minimo {minimo}: {etiquetas.max() + 1} hotspots "
+          f"en {segundos:.2f} s ({(etiquetas >= 0).mean():.1%} de los puntos en hotspots)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 10.0,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 5)
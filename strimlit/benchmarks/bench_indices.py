@@ -0,0 +1,69 @@
+"""
+Benchmark de latencia de las vistas SQL antes y después de las migraciones de índices,
+sobre una copia temporal de shark_attacks.db con la tabla de ataques replicada.
+
+Uso:
+    python benchmarks/bench_indices.py [factor_replicacion] [repeticiones]
+"""
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migraciones  # noqa: E402
+
+
+def escalar_tabla(ruta: str, factor: int):
+    """Replica las filas de shark_attackdatos hasta tener `factor` veces el tamaño original."""
+    conn = sqlite3.connect(ruta)
+    columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(shark_attackdatos)") if fila[1] != 'id']
+    lista = ", ".join(f'"{c}"' for c in columnas)
+    original = conn.execute("SELECT MAX(id) FROM shark_attackdatos").fetchone()[0]
+    for _ in range(factor - 1):
+        conn.execute(f"INSERT INTO shark_attackdatos ({lista}) SELECT {lista} FROM shark_attackdatos WHERE id <= ?",
+                     (original,))
+    conn.commit()
+    conn.close()
+
+
+def medir_vistas(ruta: str, repeticiones: int) -> dict:
+    """Mediana en milisegundos de ejecutar cada vista completa."""
+    conn = sqlite3.connect(ruta)
+    tiempos = {}
+    for vista in migraciones.VISTAS:
+        muestras = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            conn.execute(f"SELECT * FROM {vista}").fetchall()
+            muestras.append((time.perf_counter() - inicio) * 1000)
+        tiempos[vista] = statistics.median(muestras)
+    conn.close()
+    return tiempos
+
+
+def main(factor: int, repeticiones: int):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "shark_attacks.db")
+        shutil.copy(migraciones.RUTA_BD, ruta)
+        migraciones.revertir_migraciones(ruta, hasta=0)
+        escalar_tabla(ruta, factor)
+
+        antes = medir_vistas(ruta, repeticiones)
+        migraciones.aplicar_migraciones(ruta)
+        despues = medir_vistas(ruta, repeticiones)
+
+        filas = sqlite3.connect(ruta).execute("SELECT COUNT(*) FROM shark_attackdatos").fetchone()[0]
+        print(f"filas: {filas}")
+        print(f"{'vista':<36} {'sin indices (ms)':>17} {'con indices (ms)':>17} {'aceleracion':>12}")
+        for vista in migraciones.VISTAS:
+            print(f"{vista:<36} {antes[vista]:>17.2f} {despues[vista]:>17.2f} {antes[vista] / despues[vista]:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,45 @@
+"""
+Mide el bootstrap de las tasas de fatalidad (todas las categorías de actividad, país, estación
+y grupo de edad) en el proceso actual y en un pool de procesos, y comprueba que con la misma
+semilla ambos caminos dan los mismos intervalos.
+
+Uso:
+    python benchmarks/bench_intervalos.py [replicas] [procesos]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import intervalos  # noqa: E402
+import utils  # noqa: E402
+
+
+def main(replicas: int, procesos: int):
+    cubo_df = utils._construir_cubo(utils._consultar_y_limpiar())
+    tablas = [cubo_df.conteos_cruzados(d, 'is_fatal_cat')[['Fatal', 'No Fatal']].to_numpy()
+              for d in utils.DIMENSIONES_TASAS]
+    tablas = [t[t.sum(axis=1) > 0] for t in tablas]
+    categorias = sum(len(t) for t in tablas)
+
+    tiempos, resultados = {}, {}
+    for n_procesos in (1, procesos):
+        inicio = time.perf_counter()
+        resultados[n_procesos] = intervalos.bootstrap_tasas(tablas, replicas, semilla=0, procesos=n_procesos,
+                                                            minimo_pool=0)
+        tiempos[n_procesos] = time.perf_counter() - inicio
+
+    for (inf_a, sup_a), (inf_b, sup_b) in zip(resultados[1], resultados[procesos]):
+        assert np.array_equal(inf_a, inf_b, equal_nan=True) and np.array_equal(sup_a, sup_b, equal_nan=True)
+
+    print(f"{replicas:,} replicas x {categorias} categorias: resultados identicos con semilla fija")
+    for n_procesos, segundos in tiempos.items():
+        print(f"{n_procesos} proceso(s): {segundos:.2f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1))
@@ -0,0 +1,67 @@
+"""
+Benchmark de la limpieza de datos: compara la limpieza original (fila a fila con `.apply`
+y tres pasadas de texto) con el motor declarativo de limpieza.limpiar_columnas.
+
+Uso:
+    python benchmarks/bench_limpieza.py [filas ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import limpieza  # noqa: E402
+from utils import FATAL_MAPPING, SEX_MAPPING, UNKNOWN_VALUES, REGLAS_LIMPIEZA  # noqa: E402
+
+TAMANOS = [5_000, 500_000, 5_000_000]
+
+
+def limpieza_original(df: pd.DataFrame) -> pd.DataFrame:
+    """Réplica de la limpieza previa de utils.load_and_clean_data, usada como referencia."""
+    df['is_fatal_cat'] = df['is_fatal'].map(FATAL_MAPPING).fillna('Desconocido')
+    df['sex'] = df['sex'].map(SEX_MAPPING).fillna('Desconocido')
+
+    for columna in ['activity', 'moon_phase', 'season']:
+        df[columna] = df[columna].astype(str).str.upper().str.strip()
+        df.loc[df[columna].str.upper().isin(UNKNOWN_VALUES), columna] = 'Desconocido'
+        df.loc[df[columna].isna(), columna] = 'Desconocido'
+
+    df['age'] = pd.to_numeric(df['age'], errors='coerce')
+    df['age'] = df['age'].apply(lambda x: x if pd.notna(x) and 0 <= x <= 100 else np.nan)
+    return df
+
+
+def generar_datos(filas: int, semilla: int = 0) -> pd.DataFrame:
+    """Genera un DataFrame sintético con la forma de la consulta de load_and_clean_data."""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'is_fatal': rng.choice(['Y', 'N', None, 'UNKNOWN'], filas, p=[0.2, 0.7, 0.05, 0.05]),
+        'activity': rng.choice(['Surfing', ' Fishing', 'Swimming ', '', None, 'Boogie Boarding'], filas),
+        'moon_phase': rng.choice(['', 'WANING_GIBBOUS', 'NEW_MOON', None], filas),
+        'age': rng.choice([25.0, 40.0, -3.0, 130.0, np.nan, 61.0], filas),
+        'sex': rng.choice(['M', 'F', '', None], filas),
+        'season': rng.choice(['WINTER', 'summer', 'AUTUMN ', 'SPRING', None], filas),
+    })
+
+
+def medir(funcion, df: pd.DataFrame) -> float:
+    inicio = time.perf_counter()
+    funcion(df.copy())
+    return time.perf_counter() - inicio
+
+
+def main(tamanos):
+    print(f"{'filas':>10} {'original (s)':>14} {'motor (s)':>12} {'aceleracion':>12}")
+    for filas in tamanos:
+        df = generar_datos(filas)
+        t_original = medir(limpieza_original, df)
+        t_motor = medir(lambda d: limpieza.limpiar_columnas(d, REGLAS_LIMPIEZA), df)
+        print(f"{filas:>10} {t_original:>14.3f} {t_motor:>12.3f} {t_original / t_motor:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or TAMANOS)
@@ -0,0 +1,69 @@
+"""
+Mide el índice espacial del mapa de incidentes con coordenadas sintéticas (la bbdd actual no
+trae geo_point): construcción del índice, consultas de ventana sobre los clusters
+precalculados y consultas con máscara de filtros, frente a filtrar y agrupar los puntos con
+pandas en cada consulta.
+
+Uso:
+    python benchmarks/bench_mapa.py [puntos]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geoespacial  # noqa: E402
+
+VENTANAS = {
+    "mundo": None,
+    "australia": (-50.0, 0.0, 110.0, 180.0),
+    "pacifico (cruza el antimeridiano)": (-30.0, 30.0, 150.0, -150.0),
+    "sudafrica": (-40.0, -20.0, 10.0, 40.0),
+}
+
+
+def _clusters_pandas(latitud, longitud, ventana, nivel):
+    df = pd.DataFrame({'latitud': latitud, 'longitud': longitud}).dropna()
+    columna, fila = geoespacial._celdas(df['latitud'].to_numpy(), df['longitud'].to_numpy(), nivel)
+    clusters = df.groupby([columna, fila]).agg(latitud=('latitud', 'mean'), longitud=('longitud', 'mean'),
+                                                casos=('latitud', 'size'))
+    dentro = geoespacial._en_ventana(clusters['latitud'].to_numpy(), clusters['longitud'].to_numpy(), ventana)
+    return clusters[dentro]
+
+
+def main(puntos: int):
+    generador = np.random.default_rng(0)
+    latitud = np.clip(generador.normal(-10, 30, puntos), -90, 90).astype(np.float32)
+    longitud = generador.uniform(-180, 180, puntos).astype(np.float32)
+    fatal = generador.random(puntos) < 0.2
+
+    inicio = time.perf_counter()
+    indice = geoespacial.IndiceMalla(latitud, longitud, fatal)
+    print(f"{puntos:,} puntos: indice en {time.perf_counter() - inicio:.2f} s, {indice.memoria_kb():,.0f} KB")
+
+    mascara = generador.random(puntos) < 0.3
+    for nombre, ventana in VENTANAS.items():
+        nivel = indice.nivel_para(ventana)
+        inicio = time.perf_counter()
+        clusters = indice.clusters(nivel, ventana)
+        t_indice = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice.clusters(nivel, ventana, mascara)
+        t_mascara = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        referencia = _clusters_pandas(latitud, longitud, ventana, nivel)
+        t_pandas = time.perf_counter() - inicio
+
+        assert clusters['casos'].sum() == referencia['casos'].sum()
+        print(f"{nombre:>35} nivel {nivel}: {len(clusters):>5} clusters | indice {t_indice * 1000:6.1f} ms"
+              f" | con mascara {t_mascara * 1000:6.1f} ms | pandas {t_pandas * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,36 @@
+"""
+Reporte de memoria del DataFrame limpio: compara la representación compacta
+(pd.Categorical + float32) con la representación anterior de cadenas object/float64.
+
+Uso:
+    python benchmarks/bench_memoria.py [factor_replicacion]
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import limpieza  # noqa: E402
+import utils  # noqa: E402
+
+
+def main(factor: int):
+    df = utils.load_and_clean_data()
+    if factor > 1:
+        df = pd.concat([df] * factor, ignore_index=True)
+
+    compacto = limpieza.memoria_dataframe(df)
+    objeto = limpieza.memoria_dataframe(df.astype({
+        c: ('float64' if c == 'age' else object) for c in df.columns
+    }))
+
+    reporte = compacto.merge(objeto[['Columna', 'Memoria (KB)']], on='Columna',
+                             suffixes=(' compacto', ' object'))
+    print(f"filas: {len(df)}")
+    print(reporte.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -0,0 +1,59 @@
+"""
+Mide los agregados de temporal.SerieTemporal (remuestreo mensual y anual, histograma por
+hora) con fechas sintéticas, frente a agrupar la columna datetime64 con pandas en cada
+consulta, y comprueba que ambos caminos dan los mismos conteos.
+
+Uso:
+    python benchmarks/bench_temporal.py [filas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import temporal  # noqa: E402
+
+
+def _medir(funcion, repeticiones: int = 5) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main(filas: int):
+    generador = np.random.default_rng(0)
+    dias = generador.integers(np.datetime64('1900-01-01', 'D').astype(np.int64),
+                              np.datetime64('2025-12-31', 'D').astype(np.int64), filas)
+    df = pd.DataFrame({
+        'fecha': dias.astype('datetime64[D]').astype('datetime64[ns]'),
+        'hora': np.where(generador.random(filas) < 0.5, generador.uniform(0, 24, filas), np.nan),
+        'is_fatal_cat': np.where(generador.random(filas) < 0.2, 'Fatal', 'No Fatal')
+    })
+    df['mes'] = df['fecha'].dt.to_period('M').dt.to_timestamp()
+    mascara = generador.random(filas) < 0.3
+
+    inicio = time.perf_counter()
+    serie = temporal.SerieTemporal.desde_dataframe(df)
+    print(f"{filas:,} filas: serie en {time.perf_counter() - inicio:.2f} s, {serie.memoria_kb():,.0f} KB")
+
+    consultas = {
+        'mensual': (lambda: serie.mensual(mascara),
+                    lambda: df[mascara].groupby(df['mes'][mascara]).size()),
+        'anual': (lambda: serie.anual(mascara),
+                  lambda: df[mascara].groupby(df['fecha'][mascara].dt.year).size()),
+        'por hora': (lambda: serie.por_hora(mascara),
+                     lambda: df[mascara].groupby(np.floor(df['hora'][mascara])).size())
+    }
+    for nombre, (rapida, referencia) in consultas.items():
+        conteos = rapida()['ataques']
+        assert np.array_equal(conteos[conteos > 0].to_numpy(), referencia().to_numpy())
+        print(f"{nombre:>10}: bincount {_medir(rapida) * 1000:7.1f} ms | pandas {_medir(referencia) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
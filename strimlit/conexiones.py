@@ -0,0 +1,214 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+from typing import Dict, Any
+
+# PRAGMAs aplicados a cada conexión de solo lectura del pool
+PRAGMAS_LECTURA = {
+    'query_only': 'ON',
+    'mmap_size': 268435456,   # 256 MB mapeados en memoria
+    'cache_size': -65536,     # 64 MB de caché de páginas (valor negativo = KiB)
+    'temp_store': 'MEMORY'
+}
+
+# Conexiones abiertas como máximo (consultas simultáneas de todas las sesiones)
+TAMANO_POOL = 4
+
+# Segundos entre verificaciones de salud de una conexión reutilizada
+INTERVALO_VERIFICACION = 30.0
+
+# Segundos que se espera una conexión libre antes de fallar
+ESPERA_MAXIMA = 30.0
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones SQLite de solo lectura compartidas por todos los hilos.
+
+    Streamlit ejecuta cada rerun en un hilo nuevo, por lo que las conexiones no se atan a un
+    hilo: se abren con check_same_thread=False, en modo 'ro' y con PRAGMAS_LECTURA, y se
+    guardan en una cola de conexiones libres. Cada consulta toma una conexión con
+    `conexion()` y la devuelve al salir del bloque; si las `tamano` conexiones están en uso,
+    espera a que se libere una. Antes de reutilizar una conexión se verifica periódicamente
+    con 'SELECT 1' y se reabre si falló.
+    """
+
+    def __init__(self, ruta: str, tamano: int = TAMANO_POOL, pragmas: Dict[str, Any] = None,
+                 intervalo_verificacion: float = INTERVALO_VERIFICACION,
+                 espera_maxima: float = ESPERA_MAXIMA):
+        self.ruta = ruta
+        self.tamano = tamano
+        self.pragmas = PRAGMAS_LECTURA if pragmas is None else pragmas
+        self.intervalo_verificacion = intervalo_verificacion
+        self.espera_maxima = espera_maxima
+        # Pila de (conexion, instante de la ultima verificacion): se reutiliza la mas reciente
+        self._libres = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._abiertas = 0
+        self._generacion = 0
+        # id de cada conexion en uso -> (generacion del pool, instante de la ultima verificacion)
+        self._prestadas: Dict[int, tuple] = {}
+        self._metricas = {
+            'adquisiciones': 0,
+            'reutilizadas': 0,
+            'creadas': 0,
+            'reconexiones': 0,
+            'esperas': 0,
+            'espera_total_s': 0.0,
+            'espera_maxima_s': 0.0
+        }
+
+    def _abrir(self) -> sqlite3.Connection:
+        """Abre una conexión de solo lectura y le aplica los PRAGMAs configurados."""
+        conn = sqlite3.connect(f"file:{quote(self.ruta)}?mode=ro", uri=True, check_same_thread=False)
+        for pragma, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        return conn
+
+    def _es_saludable(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _cerrar(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def adquirir(self) -> sqlite3.Connection:
+        """
+        Toma una conexión libre, o abre una nueva si hay menos de `tamano` abiertas; si no,
+        espera hasta `espera_maxima` segundos a que otra consulta devuelva la suya.
+
+        Returns:
+            sqlite3.Connection: Conexión de solo lectura; debe devolverse con `devolver`
+
+        Raises:
+            TimeoutError: Si no se liberó ninguna conexión a tiempo
+        """
+        inicio = time.perf_counter()
+        conn, verificada, reutilizada, espero = None, 0.0, False, False
+        try:
+            conn, verificada = self._libres.get_nowait()
+            reutilizada = True
+        except queue.Empty:
+            with self._lock:
+                abrir = self._abiertas < self.tamano
+                if abrir:
+                    self._abiertas += 1
+            if abrir:
+                try:
+                    conn, verificada = self._abrir(), time.monotonic()
+                except Exception:
+                    with self._lock:
+                        self._abiertas -= 1
+                    raise
+                with self._lock:
+                    self._metricas['creadas'] += 1
+            else:
+                espero = True
+                try:
+                    conn, verificada = self._libres.get(timeout=self.espera_maxima)
+                except queue.Empty:
+                    raise TimeoutError(f"sin conexiones libres tras {self.espera_maxima} s "
+                                       f"({self.tamano} en uso)") from None
+                reutilizada = True
+
+        if reutilizada and time.monotonic() - verificada > self.intervalo_verificacion:
+            if self._es_saludable(conn):
+                verificada = time.monotonic()
+            else:
+                self._cerrar(conn)
+                try:
+                    conn, verificada, reutilizada = self._abrir(), time.monotonic(), False
+                except Exception:
+                    with self._lock:
+                        self._abiertas -= 1
+                    raise
+                with self._lock:
+                    self._metricas['reconexiones'] += 1
+
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self._prestadas[id(conn)] = (self._generacion, verificada)
+            self._metricas['adquisiciones'] += 1
+            self._metricas['reutilizadas'] += int(reutilizada)
+            self._metricas['esperas'] += int(espero)
+            self._metricas['espera_total_s'] += espera
+            self._metricas['espera_maxima_s'] = max(self._metricas['espera_maxima_s'], espera)
+        return conn
+
+    def devolver(self, conn: sqlite3.Connection):
+        """Devuelve una conexión tomada con `adquirir` a la cola de libres (o la cierra si el pool se vació)."""
+        with self._lock:
+            generacion, verificada = self._prestadas.pop(id(conn), (None, 0.0))
+            vigente = generacion == self._generacion
+            if not vigente and generacion is not None:
+                self._abiertas -= 1
+        if vigente:
+            self._libres.put((conn, verificada))
+        else:
+            self._cerrar(conn)
+
+    @contextmanager
+    def conexion(self):
+        """
+        Conexión del pool para un bloque `with`; se devuelve al salir. Quien la usa no debe cerrarla.
+
+        Yields:
+            sqlite3.Connection: Conexión de solo lectura
+        """
+        conn = self.adquirir()
+        try:
+            yield conn
+        finally:
+            self.devolver(conn)
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Devuelve las métricas acumuladas del pool para dimensionarlo con sesiones concurrentes.
+
+        Returns:
+            Dict[str, Any]: adquisiciones, conexiones creadas/abiertas/en uso, reconexiones,
+            tasa de reutilización, adquisiciones que esperaron una conexión libre y tiempos
+            de espera (promedio y máximo en milisegundos)
+        """
+        with self._lock:
+            m = dict(self._metricas)
+            abiertas = self._abiertas
+            en_uso = len(self._prestadas)
+        adquisiciones = m['adquisiciones']
+        return {
+            'adquisiciones': adquisiciones,
+            'tamano': self.tamano,
+            'conexiones_creadas': m['creadas'],
+            'conexiones_abiertas': abiertas,
+            'conexiones_en_uso': en_uso,
+            'reconexiones': m['reconexiones'],
+            'esperas': m['esperas'],
+            'tasa_reutilizacion': m['reutilizadas'] / adquisiciones if adquisiciones else 0.0,
+            'espera_promedio_ms': m['espera_total_s'] / adquisiciones * 1000 if adquisiciones else 0.0,
+            'espera_maxima_ms': m['espera_maxima_s'] * 1000
+        }
+
+    def cerrar_todas(self):
+        """
+        Cierra las conexiones libres del pool (por ejemplo, antes de migrar la BDD); las que
+        están en uso se cierran al devolverse.
+        """
+        with self._lock:
+            self._generacion += 1
+        while True:
+            try:
+                conn, _ = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            self._cerrar(conn)
+            with self._lock:
+                self._abiertas -= 1
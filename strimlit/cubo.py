@@ -0,0 +1,126 @@
+"""
+Cubo de conteos (estilo OLAP) sobre varias dimensiones categóricas.
+
+El cubo es un arreglo denso de NumPy con un eje por dimensión; cada eje tiene una posición por
+categoría más una posición final para los nulos, y un diccionario de códigos (las categorías
+de la columna) para traducir posiciones a etiquetas. Se construye con un solo np.bincount
+sobre los índices combinados de todas las dimensiones.
+
+Las tablas de frecuencia (1-D) y de doble entrada (2-D) se obtienen sumando el cubo sobre los
+demás ejes, sin volver a recorrer las filas, y se arman con las mismas funciones que
+utils.analizar_frecuencias y utils.crear_tablas_doble_entrada, por lo que el resultado es
+idéntico.
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+import frecuencias
+
+
+class CuboConteos:
+    """Conteos de todas las combinaciones de categorías de un conjunto de dimensiones."""
+
+    def __init__(self, conteos: np.ndarray, dimensiones: Sequence[str], categorias: Sequence[pd.Index]):
+        """
+        Args:
+            conteos (np.ndarray): Arreglo con un eje por dimensión; el tamaño de cada eje es el
+                número de categorías más uno (la última posición cuenta los nulos)
+            dimensiones (Sequence[str]): Nombre de cada eje
+            categorias (Sequence[pd.Index]): Categorías de cada eje, sin la posición de nulos
+        """
+        self.conteos = conteos
+        self.dimensiones = list(dimensiones)
+        self.categorias = {d: c for d, c in zip(self.dimensiones, categorias)}
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, dimensiones: Sequence[str]) -> 'CuboConteos':
+        """
+        Construye el cubo recorriendo el DataFrame una sola vez.
+
+        Args:
+            df (pd.DataFrame): DataFrame limpio
+            dimensiones (Sequence[str]): Columnas categóricas (o de texto) del cubo
+
+        Returns:
+            CuboConteos: Cubo con un eje por dimensión
+        """
+        codigos, categorias, forma = [], [], []
+        for dimension in dimensiones:
+            c, cats = frecuencias.codigos_categoria(df[dimension])
+            # Los nulos (-1) van a la ultima posicion del eje
+            codigos.append(np.where(c >= 0, c, len(cats)).astype(np.int64))
+            categorias.append(cats)
+            forma.append(len(cats) + 1)
+
+        dtype = np.int32 if len(df) < np.iinfo(np.int32).max else np.int64
+        if len(df):
+            planos = np.ravel_multi_index(codigos, forma)
+            conteos = np.bincount(planos, minlength=int(np.prod(forma))).astype(dtype).reshape(forma)
+        else:
+            conteos = np.zeros(forma, dtype=dtype)
+        return cls(conteos, dimensiones, categorias)
+
+    def _eje(self, dimension: str) -> int:
+        if dimension not in self.categorias:
+            raise KeyError(f"{dimension} no es una dimensión del cubo ({', '.join(self.dimensiones)})")
+        return self.dimensiones.index(dimension)
+
+    def marginal(self, *dimensiones: str) -> np.ndarray:
+        """
+        Suma el cubo sobre todas las dimensiones que no se piden.
+
+        Args:
+            *dimensiones (str): Dimensiones que se conservan, en el orden de salida
+
+        Returns:
+            np.ndarray: Conteos con un eje por dimensión pedida (incluida la posición de nulos)
+        """
+        ejes = [self._eje(d) for d in dimensiones]
+        otros = tuple(i for i in range(self.conteos.ndim) if i not in ejes)
+        suma = self.conteos.sum(axis=otros, dtype=np.int64)
+        # Tras sumar, los ejes que quedan estan en orden creciente; se reordenan como se pidieron
+        return np.transpose(suma, [sorted(ejes).index(e) for e in ejes])
+
+    def conteos_columna(self, dimension: str) -> pd.Series:
+        """Conteos por etiqueta de una dimensión, mismo formato que frecuencias.conteos_columna."""
+        etiquetas = np.append(self.categorias[dimension].to_numpy(dtype=object), np.nan)
+        return pd.Series(self.marginal(dimension), index=pd.Index(etiquetas, dtype=object))
+
+    def conteos_cruzados(self, fila: str, columna: str) -> pd.DataFrame:
+        """Tabla de conteos de dos dimensiones sin nulos ni 'Desconocido' (ver frecuencias.conteos_cruzados)."""
+        tabla = self.marginal(fila, columna)[:-1, :-1].copy()
+        categorias_fila, categorias_columna = self.categorias[fila], self.categorias[columna]
+
+        desconocido = frecuencias.codigo_desconocido(categorias_fila)
+        if desconocido >= 0:
+            tabla[desconocido, :] = 0
+        desconocido = frecuencias.codigo_desconocido(categorias_columna)
+        if desconocido >= 0:
+            tabla[:, desconocido] = 0
+
+        return pd.DataFrame(
+            tabla,
+            index=pd.Index(categorias_fila, name=fila),
+            columns=pd.Index(categorias_columna, name=columna)
+        )
+
+    def frecuencias(self, dimension: str, excluir_desconocido: bool = True) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: Mismo resultado que utils.analizar_frecuencias sobre la columna
+        """
+        return frecuencias.tabla_frecuencias(self.conteos_columna(dimension), excluir_desconocido)
+
+    def tablas_doble_entrada(self, fila: str, columna: str) -> Dict[str, pd.DataFrame]:
+        """
+        Returns:
+            Dict[str, pd.DataFrame]: Mismo resultado que utils.crear_tablas_doble_entrada
+            (absoluta, porcentaje sobre el total y condicionales por filas y por columnas)
+        """
+        return frecuencias.tablas_doble_entrada(self.conteos_cruzados(fila, columna))
+
+    def memoria_kb(self) -> float:
+        """Memoria del arreglo de conteos en KB."""
+        return self.conteos.nbytes / 1024
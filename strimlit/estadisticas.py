@@ -0,0 +1,64 @@
+"""
+Conjunto de estadísticas con evaluación perezosa.
+
+Cada miembro (métricas básicas, estadísticas de edad, tasas por actividad, ...) se calcula la
+primera vez que se accede a él y queda memorizado en el objeto. El objeto se comporta como un
+diccionario de solo lectura, por lo que las páginas lo usan igual que el diccionario que
+devolvía utils.obtener_estadisticas_completas, pero solo pagan por los miembros que muestran.
+"""
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+
+class EstadisticasPerezosas(Mapping):
+    """
+    Diccionario de solo lectura cuyos valores se calculan al primer acceso.
+
+    El contador `materializaciones` registra cuántas veces se calculó cada miembro; con el
+    objeto en caché por versión de datos, cada miembro debería calcularse a lo sumo una vez.
+    """
+
+    def __init__(self, df: pd.DataFrame, calculos: Dict[str, Callable[[pd.DataFrame], Any]], version: str = ""):
+        """
+        Args:
+            df (pd.DataFrame): DataFrame limpio sobre el que se calculan los miembros
+            calculos (Dict[str, Callable]): Nombre del miembro y función que lo calcula a partir de df
+            version (str): Versión de los datos con la que se construyó el objeto
+        """
+        self.df = df
+        self.version = version
+        self._calculos = dict(calculos)
+        self._valores: Dict[str, Any] = {}
+        self.materializaciones = {nombre: 0 for nombre in self._calculos}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, nombre: str) -> Any:
+        if nombre not in self._calculos:
+            raise KeyError(nombre)
+        if nombre not in self._valores:
+            with self._lock:
+                if nombre not in self._valores:
+                    self._valores[nombre] = self._calculos[nombre](self.df)
+                    self.materializaciones[nombre] += 1
+        return self._valores[nombre]
+
+    def __iter__(self):
+        return iter(self._calculos)
+
+    def __len__(self) -> int:
+        return len(self._calculos)
+
+    def materializados(self) -> list:
+        """Nombres de los miembros ya calculados."""
+        return [nombre for nombre in self._calculos if nombre in self._valores]
+
+    def metricas(self) -> Dict[str, Any]:
+        """Versión de los datos, miembros calculados y número de cálculos por miembro."""
+        return {
+            'version': self.version,
+            'materializados': self.materializados(),
+            'materializaciones': dict(self.materializaciones)
+        }
@@ -0,0 +1,151 @@
+"""
+Índices de bitmaps para filtrar el DataFrame limpio por cualquier combinación de variables.
+
+Para cada columna categórica se guarda un bitmap por categoría (un bit por fila, empaquetado
+con np.packbits, 8 filas por byte). Para cada columna numérica (edad, año) se guarda un bitmap
+por valor distinto con codificación por rango: el bitmap k marca las filas con valor menor o
+igual al k-ésimo valor, de modo que un rango [desde, hasta] se resuelve con un AND y un NOT de
+dos bitmaps.
+
+Una selección combina los valores elegidos de una misma columna con OR y las distintas
+condiciones con AND (todas) u OR (cualquiera), operando sobre los bytes empaquetados; solo al
+final se desempaqueta una máscara booleana alineada con las filas del DataFrame.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import frecuencias
+
+COMBINACIONES = ('y', 'o')
+
+
+class IndiceBitmaps:
+    """Bitmaps por valor de varias columnas de un DataFrame, para construir máscaras de selección."""
+
+    def __init__(self, n_filas: int, bitmaps: Dict[str, np.ndarray], categorias: Dict[str, pd.Index],
+                 rangos: Dict[str, np.ndarray], valores_rango: Dict[str, np.ndarray]):
+        """
+        Args:
+            n_filas (int): Número de filas del DataFrame indexado
+            bitmaps (Dict[str, np.ndarray]): Por columna categórica, arreglo uint8 de forma
+                (categorías, bytes) con el bitmap empaquetado de cada categoría
+            categorias (Dict[str, pd.Index]): Categorías de cada columna categórica
+            rangos (Dict[str, np.ndarray]): Por columna numérica, arreglo uint8 de forma
+                (valores, bytes) con los bitmaps acumulados 'valor <= v'
+            valores_rango (Dict[str, np.ndarray]): Valores distintos (ordenados) de cada columna numérica
+        """
+        self.n_filas = n_filas
+        self.bitmaps = bitmaps
+        self.categorias = categorias
+        self.rangos = rangos
+        self.valores_rango = valores_rango
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, categoricas: Sequence[str],
+                        numericas: Sequence[str] = ()) -> 'IndiceBitmaps':
+        """
+        Construye los bitmaps de las columnas indicadas.
+
+        Args:
+            df (pd.DataFrame): DataFrame limpio; las máscaras quedan alineadas con sus filas
+            categoricas (Sequence[str]): Columnas categóricas (o de texto) con un bitmap por categoría
+            numericas (Sequence[str]): Columnas numéricas con bitmaps codificados por rango
+
+        Returns:
+            IndiceBitmaps: Índice listo para construir máscaras
+        """
+        bitmaps, categorias = {}, {}
+        for columna in categoricas:
+            codigos, cats = frecuencias.codigos_categoria(df[columna])
+            bitmaps[columna] = cls._empaquetar(codigos, len(cats))
+            categorias[columna] = cats
+
+        rangos, valores_rango = {}, {}
+        for columna in numericas:
+            x = df[columna].to_numpy(dtype=np.float64, na_value=np.nan)
+            validos = ~np.isnan(x)
+            valores = np.unique(x[validos])
+            codigos = np.full(len(x), -1, dtype=np.int64)
+            codigos[validos] = np.searchsorted(valores, x[validos])
+            # Codificacion por rango: cada bitmap acumula (OR) los de los valores menores
+            rangos[columna] = np.bitwise_or.accumulate(cls._empaquetar(codigos, len(valores)), axis=0)
+            valores_rango[columna] = valores
+
+        return cls(len(df), bitmaps, categorias, rangos, valores_rango)
+
+    @staticmethod
+    def _empaquetar(codigos: np.ndarray, n_valores: int) -> np.ndarray:
+        """Bitmap empaquetado de cada código entre 0 y n_valores - 1 (los códigos -1 no marcan ningún bit)."""
+        bitmaps = np.zeros((n_valores, (len(codigos) + 7) // 8), dtype=np.uint8)
+        for codigo in np.unique(codigos[codigos >= 0]):
+            bitmaps[codigo] = np.packbits(codigos == codigo)
+        return bitmaps
+
+    def valores(self, columna: str) -> list:
+        """Categorías de una columna categórica del índice."""
+        return list(self.categorias[columna])
+
+    def limites(self, columna: str) -> Optional[Tuple[float, float]]:
+        """Valor mínimo y máximo de una columna numérica del índice, o None si no tiene valores."""
+        valores = self.valores_rango[columna]
+        if not len(valores):
+            return None
+        return float(valores[0]), float(valores[-1])
+
+    def _bitmap_valores(self, columna: str, seleccion: Sequence) -> np.ndarray:
+        """OR de los bitmaps de las categorías seleccionadas de una columna."""
+        if columna not in self.categorias:
+            raise KeyError(f"{columna} no es una columna categórica del índice ({', '.join(self.categorias)})")
+        posiciones = self.categorias[columna].get_indexer(list(seleccion))
+        posiciones = posiciones[posiciones >= 0]
+        if not len(posiciones):
+            return np.zeros(self.bitmaps[columna].shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitmaps[columna][posiciones], axis=0)
+
+    def _bitmap_rango(self, columna: str, desde: float, hasta: float) -> np.ndarray:
+        """Bitmap de las filas con desde <= valor <= hasta: acumulado(hasta) AND NOT acumulado(< desde)."""
+        if columna not in self.rangos:
+            raise KeyError(f"{columna} no es una columna numérica del índice ({', '.join(self.rangos)})")
+        valores, acumulados = self.valores_rango[columna], self.rangos[columna]
+        alto = np.searchsorted(valores, hasta, side='right') - 1
+        bajo = np.searchsorted(valores, desde, side='left') - 1
+        if alto < 0 or alto <= bajo:
+            return np.zeros(acumulados.shape[1], dtype=np.uint8)
+        bitmap = acumulados[alto]
+        return bitmap & ~acumulados[bajo] if bajo >= 0 else bitmap.copy()
+
+    def mascara(self, valores: Optional[Dict[str, Sequence]] = None,
+                rangos: Optional[Dict[str, Tuple[float, float]]] = None,
+                combinar: str = 'y') -> Optional[np.ndarray]:
+        """
+        Máscara de las filas que cumplen la selección.
+
+        Args:
+            valores (Optional[Dict[str, Sequence]]): Categorías elegidas por columna categórica;
+                las categorías de una misma columna se combinan con OR. Las columnas con lista
+                vacía no filtran
+            rangos (Optional[Dict[str, Tuple[float, float]]]): Rango (desde, hasta), ambos
+                incluidos, por columna numérica; las filas con valor nulo no cumplen el rango
+            combinar (str): 'y' para exigir todas las condiciones (AND) u 'o' para cualquiera (OR)
+
+        Returns:
+            Optional[np.ndarray]: Arreglo booleano de longitud n_filas, o None si no hay
+            ninguna condición (sin filtro)
+        """
+        if combinar not in COMBINACIONES:
+            raise ValueError(f"combinacion de filtros desconocida: {combinar}")
+
+        condiciones = [self._bitmap_valores(c, v) for c, v in (valores or {}).items() if len(v)]
+        condiciones += [self._bitmap_rango(c, *r) for c, r in (rangos or {}).items()]
+        if not condiciones:
+            return None
+
+        operacion = np.bitwise_and if combinar == 'y' else np.bitwise_or
+        bitmap = operacion.reduce(condiciones, axis=0)
+        return np.unpackbits(bitmap, count=self.n_filas).astype(bool)
+
+    def memoria_kb(self) -> float:
+        """Memoria de todos los bitmaps en KB."""
+        return sum(b.nbytes for b in (*self.bitmaps.values(), *self.rangos.values())) / 1024
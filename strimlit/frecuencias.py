@@ -0,0 +1,288 @@
+"""
+Conteos de frecuencia sobre columnas categóricas y construcción de las tablas de frecuencia.
+
+Los conteos se hacen con np.bincount sobre los códigos de pd.Categorical, sin comparar texto
+fila a fila. La tabla de salida (Categoria, Frecuencia Absoluta, Frecuencia Relativa y
+Frecuencia Relativa %) se arma a partir de pares etiqueta-conteo, de modo que la misma función
+sirve tanto para un DataFrame completo como para conteos mantenidos de forma incremental.
+"""
+import numpy as np
+import pandas as pd
+
+
+def codigos_categoria(serie: pd.Series) -> tuple:
+    """
+    Devuelve los códigos enteros y las categorías de una columna. Si la columna ya es
+    categórica se reutilizan sus códigos sin copiar; si no, se convierte una sola vez.
+
+    Args:
+        serie (pd.Series): Columna categórica o de texto
+
+    Returns:
+        tuple: (np.ndarray de códigos con -1 para nulos, pd.Index de categorías)
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+    return serie.cat.codes.to_numpy(), serie.cat.categories
+
+
+def codigo_desconocido(categorias: pd.Index) -> int:
+    """Código de la categoría 'Desconocido', o -2 si la columna no la contiene."""
+    return categorias.get_loc('Desconocido') if 'Desconocido' in categorias else -2
+
+
+def conteos_columna(serie: pd.Series) -> pd.Series:
+    """
+    Cuenta las ocurrencias de cada categoría de una columna, incluidos los nulos (con
+    etiqueta NaN, en la última posición). Las categorías sin casos se conservan con 0.
+
+    Args:
+        serie (pd.Series): Columna categórica o de texto
+
+    Returns:
+        pd.Series: Conteos indexados por etiqueta (dtype object)
+    """
+    codigos, categorias = codigos_categoria(serie)
+
+    # El centinela -1 (nulos) se cuenta en la ultima posicion
+    conteos = np.roll(np.bincount(codigos + 1, minlength=len(categorias) + 1), -1)
+    etiquetas = np.append(categorias.to_numpy(dtype=object), np.nan)
+    return pd.Series(conteos, index=pd.Index(etiquetas, dtype=object))
+
+
+def tabla_frecuencias(conteos: pd.Series, excluir_desconocido: bool = True) -> pd.DataFrame:
+    """
+    Construye la tabla de frecuencias absoluta y relativa a partir de conteos por etiqueta.
+
+    Args:
+        conteos (pd.Series): Conteos indexados por etiqueta (ver conteos_columna)
+        excluir_desconocido (bool): Si True, excluye la categoría 'Desconocido'
+
+    Returns:
+        pd.DataFrame: DataFrame con columnas Categoria, Frecuencia Absoluta, Frecuencia
+        Relativa y Frecuencia Relativa %, ordenado por frecuencia descendente; vacío (con las
+        mismas columnas) si no hay casos
+    """
+    etiquetas = conteos.index.to_numpy(dtype=object)
+    valores = conteos.to_numpy(dtype=np.int64).copy()
+
+    if excluir_desconocido:
+        valores[etiquetas == 'Desconocido'] = 0
+
+    presentes = valores > 0
+
+    # Frecuencias basicas (sin casos la tabla queda vacia con sus columnas)
+    frecuencias = valores[presentes]
+    total = max(frecuencias.sum(), 1)
+
+    # Crear dataframe base
+    return pd.DataFrame({
+        'Categoria': etiquetas[presentes],
+        'Frecuencia Absoluta': frecuencias,
+        'Frecuencia Relativa': (frecuencias / total).round(4),
+        'Frecuencia Relativa %': (frecuencias / total * 100).round(2)
+    }).sort_values('Frecuencia Absoluta', ascending=False).reset_index(drop=True)
+
+
+def conteos_cruzados(fila: pd.Series, columna: pd.Series) -> pd.DataFrame:
+    """
+    Tabla de conteos de dos columnas categóricas (sin nulos ni 'Desconocido'), obtenida con un
+    único np.bincount sobre los códigos combinados (fila * n_columnas + columna). Las
+    categorías sin casos se conservan con 0.
+
+    Args:
+        fila (pd.Series): Variable de las filas; su nombre se usa como nombre del índice
+        columna (pd.Series): Variable de las columnas, alineada con `fila`
+
+    Returns:
+        pd.DataFrame: Conteos con las categorías de `fila` como índice y las de `columna`
+        como columnas
+    """
+    codigos_fila, categorias_fila = codigos_categoria(fila)
+    codigos_columna, categorias_columna = codigos_categoria(columna)
+
+    validos = (codigos_fila >= 0) & (codigos_columna >= 0)
+    validos &= codigos_fila != codigo_desconocido(categorias_fila)
+    validos &= codigos_columna != codigo_desconocido(categorias_columna)
+
+    n_filas, n_columnas = len(categorias_fila), len(categorias_columna)
+    combinados = codigos_fila[validos].astype(np.int64) * n_columnas + codigos_columna[validos]
+    conteos = np.bincount(combinados, minlength=n_filas * n_columnas).reshape(n_filas, n_columnas)
+
+    return pd.DataFrame(
+        conteos,
+        index=pd.Index(categorias_fila, name=fila.name),
+        columns=pd.Index(categorias_columna, name=columna.name)
+    )
+
+
+def _agregar_margenes(tabla: pd.DataFrame) -> pd.DataFrame:
+    """
+    Añade la fila y la columna 'Total' a una tabla de frecuencias absolutas, con el mismo
+    formato que pd.crosstab(..., margins=True, margins_name="Total").
+
+    Args:
+        tabla (pd.DataFrame): Tabla de conteos sin márgenes
+
+    Returns:
+        pd.DataFrame: Tabla con índices de texto y márgenes 'Total'
+    """
+    tabla = tabla.copy()
+    tabla.index = pd.Index(tabla.index.astype(object), name=tabla.index.name)
+    tabla.columns = pd.Index(tabla.columns.astype(object), name=tabla.columns.name)
+    tabla['Total'] = tabla.sum(axis=1)
+    tabla.loc['Total'] = tabla.sum(axis=0)
+    return tabla
+
+
+def tablas_doble_entrada(conteos: pd.DataFrame) -> dict:
+    """
+    Construye las tablas absoluta, de porcentaje sobre el total y condicionales por filas y
+    por columnas a partir de una tabla de conteos (ver conteos_cruzados). Las filas y
+    columnas sin casos se descartan.
+
+    Args:
+        conteos (pd.DataFrame): Conteos sin márgenes; los nombres del índice y de las
+            columnas son los nombres de las variables
+
+    Returns:
+        dict: Claves 'absoluta', 'porcentaje_total', 'condicional_filas',
+        'condicional_columnas' y 'explicacion'; vacío si no hay casos
+    """
+    fila, columna = conteos.index.name, conteos.columns.name
+    valores = conteos.to_numpy()
+    filas_presentes = valores.sum(axis=1) > 0
+    columnas_presentes = valores.sum(axis=0) > 0
+    if not filas_presentes.any():
+        return {}
+
+    # Tabla absoluta basica
+    tabla_absoluta = _agregar_margenes(conteos.loc[filas_presentes, columnas_presentes])
+    total_general = tabla_absoluta.loc['Total', 'Total']
+
+    # Distribuciones porcentuales
+    tabla_porcentaje_total = (tabla_absoluta / total_general * 100).round(2)
+
+    # Distribuciones condicionales por filas (cada fila suma 100%)
+    tabla_condicional_filas = tabla_absoluta.copy().drop('Total', axis=1).drop('Total', axis=0)
+    tabla_condicional_filas = tabla_condicional_filas.div(tabla_condicional_filas.sum(axis=1), axis=0) * 100
+    tabla_condicional_filas = tabla_condicional_filas.round(2)
+
+    # Distribuciones condicionales por columnas (cada columna suma 100%)
+    tabla_condicional_columnas = tabla_absoluta.copy().drop('Total', axis=1).drop('Total', axis=0)
+    tabla_condicional_columnas = tabla_condicional_columnas.div(tabla_condicional_columnas.sum(axis=0), axis=1) * 100
+    tabla_condicional_columnas = tabla_condicional_columnas.round(2)
+
+    # Agregar totales a las tablas condicionales
+    tabla_condicional_filas['Total'] = 100.0
+    tabla_condicional_columnas.loc['Total'] = 100.0
+
+    return {
+        'absoluta': tabla_absoluta,
+        'porcentaje_total': tabla_porcentaje_total,
+        'condicional_filas': tabla_condicional_filas,
+        'condicional_columnas': tabla_condicional_columnas,
+        'explicacion': {
+            'absoluta': "Frecuencias absolutas de casos",
+            'porcentaje_total': "Porcentaje sobre el total general (base: 100% = total de casos)",
+            'condicional_filas': f"Distribución condicional de {columna} dado {fila} - cada fila suma 100%",
+            'condicional_columnas': f"Distribución condicional de {fila} dado {columna} - cada columna suma 100%"
+        }
+    }
+
+
+class AcumuladorFrecuencias:
+    """
+    Acumula los conteos de una columna bloque a bloque, para obtener la misma tabla que
+    utils.analizar_frecuencias sin tener todo el conjunto de datos en memoria.
+
+    Los bloques deben venir ya limpios (ver limpieza.limpiar_columnas). Dos acumuladores de la
+    misma columna, por ejemplo de procesos distintos, se combinan con merge.
+    """
+
+    def __init__(self, columna: str):
+        self.columna = columna
+        self.filas = 0
+        self._conteos = pd.Series(dtype=np.int64, index=pd.Index([], dtype=object))
+
+    def update(self, bloque: pd.DataFrame) -> 'AcumuladorFrecuencias':
+        """Suma los conteos de un bloque."""
+        if self.columna in bloque.columns and len(bloque):
+            self._sumar(conteos_columna(bloque[self.columna]))
+            self.filas += len(bloque)
+        return self
+
+    def merge(self, otro: 'AcumuladorFrecuencias') -> 'AcumuladorFrecuencias':
+        """Suma los conteos de otro acumulador de la misma columna."""
+        if otro.columna != self.columna:
+            raise ValueError(f"no se pueden combinar acumuladores de {self.columna} y {otro.columna}")
+        self._sumar(otro._conteos)
+        self.filas += otro.filas
+        return self
+
+    def _sumar(self, conteos: pd.Series):
+        self._conteos = self._conteos.add(conteos, fill_value=0).astype(np.int64)
+
+    def conteos(self) -> pd.Series:
+        """Conteos por etiqueta en el orden de las categorías (orden alfabético, nulos al final)."""
+        return self._conteos.sort_index(na_position='last')
+
+    def result(self, excluir_desconocido: bool = True) -> pd.DataFrame:
+        """
+        Args:
+            excluir_desconocido (bool): Si True, excluye la categoría 'Desconocido'
+
+        Returns:
+            pd.DataFrame: Mismo formato que utils.analizar_frecuencias
+        """
+        return tabla_frecuencias(self.conteos(), excluir_desconocido)
+
+
+class AcumuladorContingencia:
+    """
+    Acumula la tabla de conteos de dos columnas bloque a bloque, para obtener las mismas
+    tablas que utils.crear_tablas_doble_entrada sin tener todo el conjunto en memoria.
+    """
+
+    def __init__(self, fila: str, columna: str):
+        self.fila = fila
+        self.columna = columna
+        self.filas = 0
+        self._conteos = pd.DataFrame(
+            index=pd.Index([], dtype=object, name=fila),
+            columns=pd.Index([], dtype=object, name=columna),
+            dtype=np.int64
+        )
+
+    def update(self, bloque: pd.DataFrame) -> 'AcumuladorContingencia':
+        """Suma la tabla de conteos de un bloque."""
+        if self.fila in bloque.columns and self.columna in bloque.columns and len(bloque):
+            self._sumar(conteos_cruzados(bloque[self.fila], bloque[self.columna]))
+            self.filas += len(bloque)
+        return self
+
+    def merge(self, otro: 'AcumuladorContingencia') -> 'AcumuladorContingencia':
+        """Suma la tabla de conteos de otro acumulador con las mismas variables."""
+        if (otro.fila, otro.columna) != (self.fila, self.columna):
+            raise ValueError(f"no se pueden combinar acumuladores de {self.fila}/{self.columna} "
+                             f"y {otro.fila}/{otro.columna}")
+        self._sumar(otro._conteos)
+        self.filas += otro.filas
+        return self
+
+    def _sumar(self, conteos: pd.DataFrame):
+        conteos = conteos.astype(np.int64)
+        conteos.index = pd.Index(conteos.index.astype(object), name=self.fila)
+        conteos.columns = pd.Index(conteos.columns.astype(object), name=self.columna)
+        self._conteos = self._conteos.add(conteos, fill_value=0).fillna(0).astype(np.int64)
+
+    def conteos(self) -> pd.DataFrame:
+        """Tabla de conteos sin márgenes, con filas y columnas en orden alfabético."""
+        return self._conteos.sort_index(axis=0).sort_index(axis=1)
+
+    def result(self) -> dict:
+        """
+        Returns:
+            dict: Mismo formato que utils.crear_tablas_doble_entrada
+        """
+        return tablas_doble_entrada(self.conteos())
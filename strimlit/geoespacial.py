@@ -0,0 +1,309 @@
+"""
+Índice espacial de los incidentes con coordenadas y agregación en clusters por nivel de zoom.
+
+Las coordenadas (latitud y longitud float32, ver la regla 'coordenada' de limpieza.py) se
+ordenan una sola vez por su código de Morton (curva Z) en la malla más fina. Con ese orden
+cada celda de cualquier nivel más grueso (un nodo del quadtree: en el nivel z la malla tiene
+2^z x 2^z celdas) es un tramo contiguo de puntos, de modo que los clusters de todos los
+niveles se obtienen con np.add.reduceat sobre los mismos arreglos ordenados.
+
+Las consultas de una ventana (viewport) no recorren todos los clusters ni todos los puntos: la
+ventana se cubre con celdas de la malla, cada celda es un tramo de códigos de Morton y
+np.searchsorted sobre los códigos ordenados da los clusters o puntos candidatos, que luego se
+filtran por sus coordenadas. Con una máscara de filtros solo se vuelven a agregar los puntos
+candidatos, con la máscara como peso y sin reordenar.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NIVELES = 10
+CELDAS_VENTANA = 32
+
+# Celdas como máximo para cubrir una ventana; si hacen falta más se usa un nivel más grueso
+CELDAS_CONSULTA = 1024
+
+# (latitud minima, latitud maxima, longitud minima, longitud maxima); si la longitud minima es
+# mayor que la maxima la ventana cruza el antimeridiano
+Ventana = Tuple[float, float, float, float]
+
+
+def _intercalar(v: np.ndarray) -> np.ndarray:
+    """Separa los bits de v (hasta 16 bits) dejando un cero entre cada uno."""
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def _celdas(latitud: np.ndarray, longitud: np.ndarray, nivel: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Columna y fila de la celda de cada punto en la malla de 2^nivel x 2^nivel."""
+    lado = 1 << nivel
+    columna = np.clip(((longitud.astype(np.float64) + 180) / 360 * lado).astype(np.int64), 0, lado - 1)
+    fila = np.clip(((latitud.astype(np.float64) + 90) / 180 * lado).astype(np.int64), 0, lado - 1)
+    return columna, fila
+
+
+def _codigos_celdas(columna: np.ndarray, fila: np.ndarray) -> np.ndarray:
+    """Código de Morton de cada celda (bits de la columna en las posiciones pares y de la fila en las impares)."""
+    return _intercalar(columna) | (_intercalar(fila) << np.uint64(1))
+
+
+def _inicios(codigos: np.ndarray, desplazamiento: int) -> np.ndarray:
+    """Posición del primer código de cada celda en unos códigos ordenados, agrupados por `codigos >> desplazamiento`."""
+    if not len(codigos):
+        return np.zeros(0, dtype=np.int64)
+    celdas = codigos >> np.uint64(desplazamiento)
+    return np.flatnonzero(np.r_[True, celdas[1:] != celdas[:-1]])
+
+
+def _tramos_ventana(ventana: Ventana, nivel: int, nivel_codigos: int,
+                    maximo: int = CELDAS_CONSULTA) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tramos [desde, hasta) de códigos de Morton del nivel `nivel_codigos` que cubren la ventana,
+    ampliada en una celda por lado para no perder centroides en el borde de una celda.
+
+    Args:
+        ventana (Ventana): Ventana visible
+        nivel (int): Nivel de las celdas con que se cubre la ventana; se usa uno más grueso
+            si hacen falta más de `maximo` celdas
+        nivel_codigos (int): Nivel de los códigos buscados (mayor o igual que `nivel`)
+        maximo (int): Número máximo de celdas
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Inicios y finales de los tramos, ordenados y sin solaparse
+    """
+    lat_min, lat_max, lon_min, lon_max = ventana
+    if lat_min > lat_max:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64)
+
+    for nivel in range(nivel, -1, -1):
+        lado = 1 << nivel
+        (col_min, col_max), (fila_min, fila_max) = _celdas(np.array([lat_min, lat_max]),
+                                                           np.array([lon_min, lon_max]), nivel)
+        if lon_min <= lon_max or col_max < col_min:
+            n_columnas = (col_max - col_min) % lado + 1
+        else:
+            # Cruza el antimeridiano con los dos bordes en la misma celda: casi todo el mundo
+            n_columnas = lado
+        n_columnas = min(n_columnas + 2, lado)
+        fila_min, fila_max = max(fila_min - 1, 0), min(fila_max + 1, lado - 1)
+        if n_columnas * (fila_max - fila_min + 1) <= maximo or nivel == 0:
+            break
+
+    columnas = (col_min - 1 + np.arange(n_columnas)) % lado
+    filas = np.arange(fila_min, fila_max + 1)
+    codigos = np.sort(_codigos_celdas(columnas[None, :], filas[:, None]).ravel())
+
+    desplazamiento = np.uint64(2 * (nivel_codigos - nivel))
+    desde, hasta = codigos << desplazamiento, (codigos + np.uint64(1)) << desplazamiento
+    # Une las celdas consecutivas en un solo tramo
+    nuevo = np.r_[True, desde[1:] != hasta[:-1]]
+    return desde[nuevo], hasta[np.r_[nuevo[1:], True]]
+
+
+def _candidatos(codigos: np.ndarray, ventana: Ventana, nivel: int, nivel_codigos: int) -> np.ndarray:
+    """
+    Posiciones, en unos códigos ordenados del nivel `nivel_codigos`, de los códigos que caen en
+    las celdas del nivel `nivel` que tocan la ventana (ver _tramos_ventana), como una
+    concatenación de np.arange(inicio, fin) por tramo sin bucle de Python.
+    """
+    desde, hasta = _tramos_ventana(ventana, nivel, nivel_codigos)
+    inicios, fines = np.searchsorted(codigos, desde), np.searchsorted(codigos, hasta)
+    largos = fines - inicios
+    return np.arange(largos.sum()) + np.repeat(inicios - (np.cumsum(largos) - largos), largos)
+
+
+def _en_ventana(latitud: np.ndarray, longitud: np.ndarray, ventana: Optional[Ventana]) -> np.ndarray:
+    """Puntos dentro de la ventana (todos si es None)."""
+    if ventana is None:
+        return np.ones(len(latitud), dtype=bool)
+    lat_min, lat_max, lon_min, lon_max = ventana
+    dentro = (latitud >= lat_min) & (latitud <= lat_max)
+    if lon_min <= lon_max:
+        return dentro & (longitud >= lon_min) & (longitud <= lon_max)
+    return dentro & ((longitud >= lon_min) | (longitud <= lon_max))
+
+
+class IndiceMalla:
+    """Quadtree implícito (orden de Morton) con clusters precalculados para cada nivel de zoom."""
+
+    def __init__(self, latitud: np.ndarray, longitud: np.ndarray, fatal: Optional[np.ndarray] = None,
+                 niveles: int = NIVELES):
+        """
+        Args:
+            latitud (np.ndarray): Latitud de cada fila (NaN si no tiene coordenadas)
+            longitud (np.ndarray): Longitud de cada fila (NaN si no tiene coordenadas)
+            fatal (Optional[np.ndarray]): Indicador booleano de ataque fatal de cada fila
+            niveles (int): Niveles de zoom precalculados (0 a niveles - 1, como máximo 16)
+        """
+        latitud = np.asarray(latitud, dtype=np.float32)
+        longitud = np.asarray(longitud, dtype=np.float32)
+        fatal = np.zeros(len(latitud), dtype=bool) if fatal is None else np.asarray(fatal, dtype=bool)
+
+        self.n_filas = len(latitud)
+        self.nivel_maximo = min(niveles, 16) - 1
+
+        validos = np.flatnonzero(np.isfinite(latitud) & np.isfinite(longitud))
+        columna, fila = _celdas(latitud[validos], longitud[validos], self.nivel_maximo)
+        codigos = _codigos_celdas(columna, fila)
+        orden = np.argsort(codigos, kind='stable')
+
+        # Puntos ordenados por codigo de Morton; `filas` guarda su posicion en el DataFrame
+        self.filas = validos[orden]
+        self.codigos = codigos[orden]
+        self.latitud = latitud[self.filas]
+        self.longitud = longitud[self.filas]
+        self.fatal = fatal[self.filas]
+        self._inicios = [_inicios(self.codigos, 2 * (self.nivel_maximo - z)) for z in range(self.nivel_maximo + 1)]
+        self.clusters_nivel = [self._agregar(z) for z in range(self.nivel_maximo + 1)]
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, latitud: str = 'latitud', longitud: str = 'longitud',
+                        fatal: str = 'is_fatal_cat', niveles: int = NIVELES) -> 'IndiceMalla':
+        """
+        Construye el índice con las coordenadas de un DataFrame limpio; los puntos conservan su
+        posición en el DataFrame para poder aplicar las máscaras del explorador de filtros.
+
+        Args:
+            df (pd.DataFrame): DataFrame limpio
+            latitud (str): Columna de latitud
+            longitud (str): Columna de longitud
+            fatal (str): Columna de fatalidad ('Fatal' cuenta como ataque fatal)
+            niveles (int): Niveles de zoom precalculados
+
+        Returns:
+            IndiceMalla: Índice espacial
+        """
+        es_fatal = df[fatal].eq('Fatal').to_numpy(dtype=bool) if fatal in df.columns else None
+        return cls(df[latitud].to_numpy(dtype=np.float32, na_value=np.nan),
+                   df[longitud].to_numpy(dtype=np.float32, na_value=np.nan), es_fatal, niveles)
+
+    @property
+    def n_puntos(self) -> int:
+        """Número de filas con coordenadas válidas."""
+        return len(self.filas)
+
+    def _agregar(self, nivel: int, pesos: Optional[np.ndarray] = None,
+                 posiciones: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Centroide, casos y casos fatales de cada celda ocupada del nivel, con pesos opcionales
+        por punto y solo con los puntos en `posiciones` (celdas completas, en orden) si se indican.
+        La columna 'celda' guarda el código de Morton de la celda en el nivel.
+        """
+        desplazamiento = 2 * (self.nivel_maximo - nivel)
+        if posiciones is None:
+            codigos, latitud, longitud, fatal = self.codigos, self.latitud, self.longitud, self.fatal
+            inicios = self._inicios[nivel]
+        else:
+            codigos, latitud, longitud, fatal = (a[posiciones] for a in (self.codigos, self.latitud,
+                                                                          self.longitud, self.fatal))
+            inicios = _inicios(codigos, desplazamiento)
+            pesos = None if pesos is None else pesos[posiciones]
+        if not len(inicios):
+            return pd.DataFrame({'latitud': [], 'longitud': [], 'casos': [], 'fatales': [], 'celda': []},
+                                dtype=np.float64).astype({'casos': np.int64, 'fatales': np.int64, 'celda': np.uint64})
+
+        pesos = np.ones(len(codigos)) if pesos is None else pesos.astype(np.float64)
+        casos = np.add.reduceat(pesos, inicios)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            clusters = pd.DataFrame({
+                'latitud': np.add.reduceat(latitud * pesos, inicios) / casos,
+                'longitud': np.add.reduceat(longitud * pesos, inicios) / casos,
+                'casos': casos.astype(np.int64),
+                'fatales': np.add.reduceat(fatal * pesos, inicios).astype(np.int64),
+                'celda': codigos[inicios] >> np.uint64(desplazamiento)
+            })
+        return clusters[clusters['casos'] > 0].reset_index(drop=True)
+
+    def nivel_para(self, ventana: Optional[Ventana], celdas: int = CELDAS_VENTANA) -> int:
+        """
+        Nivel de zoom con unas `celdas` celdas a lo ancho de la ventana.
+
+        Args:
+            ventana (Optional[Ventana]): Ventana visible; None es el mapa completo
+            celdas (int): Número aproximado de celdas a lo ancho de la ventana
+
+        Returns:
+            int: Nivel entre 0 y nivel_maximo
+        """
+        if ventana is None:
+            ancho = 360.0
+        else:
+            ancho = (ventana[3] - ventana[2]) % 360 or 360.0
+        # En el nivel z una celda mide 360 / 2^z grados de longitud
+        nivel = int(np.floor(np.log2(celdas * 360.0 / ancho)))
+        return int(np.clip(nivel, 0, self.nivel_maximo))
+
+    def clusters(self, nivel: Optional[int] = None, ventana: Optional[Ventana] = None,
+                 mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Clusters de un nivel de zoom cuyo centroide cae en la ventana.
+
+        Args:
+            nivel (Optional[int]): Nivel de zoom; por defecto nivel_para(ventana)
+            ventana (Optional[Ventana]): Ventana visible; None devuelve todos los clusters
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame (explorador de
+                filtros); los clusters se reagregan solo con las filas seleccionadas
+
+        Returns:
+            pd.DataFrame: Columnas 'latitud', 'longitud' (centroide), 'casos', 'fatales' y
+            'tasa_fatalidad' (%) de cada cluster
+        """
+        nivel = self.nivel_para(ventana) if nivel is None else int(np.clip(nivel, 0, self.nivel_maximo))
+        if mascara is None:
+            clusters = self.clusters_nivel[nivel]
+        else:
+            # Solo se reagregan los puntos de las celdas que tocan la ventana
+            posiciones = None if ventana is None else _candidatos(self.codigos, ventana, nivel, self.nivel_maximo)
+            clusters = self._agregar(nivel, np.asarray(mascara, dtype=bool)[self.filas], posiciones)
+
+        latitud, longitud, casos, fatales = (clusters[c].to_numpy()
+                                             for c in ('latitud', 'longitud', 'casos', 'fatales'))
+        if ventana is not None:
+            candidatos = _candidatos(clusters['celda'].to_numpy(), ventana, nivel, nivel)
+            candidatos = candidatos[_en_ventana(latitud[candidatos], longitud[candidatos], ventana)]
+            latitud, longitud, casos, fatales = (a[candidatos] for a in (latitud, longitud, casos, fatales))
+        return pd.DataFrame({
+            'latitud': latitud,
+            'longitud': longitud,
+            'casos': casos,
+            'fatales': fatales,
+            'tasa_fatalidad': np.round(fatales / casos * 100, 2)
+        })
+
+    def puntos(self, ventana: Optional[Ventana] = None, mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Puntos individuales dentro de la ventana, para los niveles de zoom más cercanos.
+
+        Args:
+            ventana (Optional[Ventana]): Ventana visible
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame
+
+        Returns:
+            pd.DataFrame: Columnas 'fila' (posición en el DataFrame), 'latitud', 'longitud' y 'fatal'
+        """
+        if ventana is None:
+            seleccion = np.ones(self.n_puntos, dtype=bool)
+            if mascara is not None:
+                seleccion &= np.asarray(mascara, dtype=bool)[self.filas]
+        else:
+            seleccion = _candidatos(self.codigos, ventana, self.nivel_maximo, self.nivel_maximo)
+            seleccion = seleccion[_en_ventana(self.latitud[seleccion], self.longitud[seleccion], ventana)]
+            if mascara is not None:
+                seleccion = seleccion[np.asarray(mascara, dtype=bool)[self.filas[seleccion]]]
+        return pd.DataFrame({
+            'fila': self.filas[seleccion],
+            'latitud': self.latitud[seleccion],
+            'longitud': self.longitud[seleccion],
+            'fatal': self.fatal[seleccion]
+        })
+
+    def memoria_kb(self) -> float:
+        """Memoria de los puntos ordenados y de los clusters precalculados en KB."""
+        puntos = sum(a.nbytes for a in (self.filas, self.codigos, self.latitud, self.longitud, self.fatal))
+        clusters = sum(c.memory_usage(index=False).sum() for c in self.clusters_nivel)
+        return (puntos + clusters) / 1024
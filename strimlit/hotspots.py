@@ -0,0 +1,138 @@
+"""
+Detección de zonas de concentración de ataques (hotspots) con un DBSCAN sobre la esfera.
+
+Las coordenadas se convierten a vectores unitarios en 3D, donde la distancia euclídea (la
+cuerda) es una función monótona de la distancia sobre la superficie terrestre, y se indexan
+en un KD-tree (scipy.spatial.cKDTree), de modo que nunca se calculan las n² distancias:
+    1. Puntos núcleo: los que tienen al menos `minimo` ataques a menos de `radio_km`
+       (query_ball_point con return_length, sin materializar las listas de vecinos)
+    2. Hotspots: componentes conexas del grafo de pares de núcleos a menos de `radio_km`
+       (query_pairs + scipy.sparse.csgraph.connected_components)
+    3. Puntos frontera: los no núcleo a menos de `radio_km` de un núcleo toman su hotspot
+       (una consulta del vecino más cercano acotada por el radio); el resto es ruido
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.spatial import cKDTree
+
+RADIO_TIERRA_KM = 6371.0
+
+
+def _unitarios(latitud: np.ndarray, longitud: np.ndarray) -> np.ndarray:
+    """Vectores unitarios (n x 3) de coordenadas en grados."""
+    lat, lon = np.radians(latitud.astype(np.float64)), np.radians(longitud.astype(np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _cuerda(radio_km: float) -> float:
+    """Distancia euclídea entre vectores unitarios equivalente a radio_km sobre la superficie."""
+    return 2 * np.sin(min(radio_km / RADIO_TIERRA_KM, np.pi) / 2)
+
+
+def dbscan_esferico(latitud: np.ndarray, longitud: np.ndarray, radio_km: float = 10.0, minimo: int = 5) -> np.ndarray:
+    """
+    Etiqueta cada punto con su hotspot (DBSCAN con distancia sobre la esfera).
+
+    Args:
+        latitud (np.ndarray): Latitud de cada punto en grados (sin nulos)
+        longitud (np.ndarray): Longitud de cada punto en grados (sin nulos)
+        radio_km (float): Radio de vecindad en kilómetros
+        minimo (int): Ataques dentro del radio (incluido el propio) para ser punto núcleo
+
+    Returns:
+        np.ndarray: Etiqueta de hotspot de cada punto (0, 1, ...) o -1 si es ruido
+    """
+    etiquetas = np.full(len(latitud), -1, dtype=np.int64)
+    if not len(latitud):
+        return etiquetas
+
+    puntos = _unitarios(latitud, longitud)
+    radio = _cuerda(radio_km)
+    arbol = cKDTree(puntos)
+
+    vecinos = arbol.query_ball_point(puntos, radio, return_length=True)
+    nucleos = np.flatnonzero(vecinos >= minimo)
+    if not len(nucleos):
+        return etiquetas
+
+    arbol_nucleos = cKDTree(puntos[nucleos])
+    pares = arbol_nucleos.query_pairs(radio, output_type='ndarray')
+    grafo = sparse.coo_matrix((np.ones(len(pares), dtype=bool), (pares[:, 0], pares[:, 1])),
+                              shape=(len(nucleos), len(nucleos)))
+    _, componentes = csgraph.connected_components(grafo, directed=False)
+    etiquetas[nucleos] = componentes
+
+    # Puntos frontera: el nucleo mas cercano dentro del radio les presta su etiqueta
+    otros = np.flatnonzero(vecinos < minimo)
+    if len(otros):
+        distancia, cercano = arbol_nucleos.query(puntos[otros], distance_upper_bound=radio)
+        frontera = np.isfinite(distancia)
+        etiquetas[otros[frontera]] = componentes[cercano[frontera]]
+    return etiquetas
+
+
+def _moda_por_grupo(grupos: np.ndarray, serie: pd.Series) -> pd.Series:
+    """Valor más frecuente de una columna en cada grupo (sin nulos)."""
+    conteos = pd.DataFrame({'grupo': grupos, 'valor': serie.to_numpy(dtype=object)}).dropna()
+    if conteos.empty:
+        return pd.Series(dtype=object)
+    tamanos = conteos.groupby(['grupo', 'valor']).size()
+    return tamanos.groupby(level='grupo').idxmax().map(lambda clave: clave[1])
+
+
+def resumir_hotspots(df: pd.DataFrame, etiquetas: np.ndarray, latitud: str = 'latitud', longitud: str = 'longitud',
+                     fatal: str = 'is_fatal_cat', lugares: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Una fila por hotspot con su centro, extensión, ataques, fatalidad y lugar más frecuente.
+
+    Args:
+        df (pd.DataFrame): Puntos etiquetados (mismas filas que etiquetas)
+        etiquetas (np.ndarray): Hotspot de cada punto (dbscan_esferico)
+        latitud (str): Columna de latitud
+        longitud (str): Columna de longitud
+        fatal (str): Columna de fatalidad ('Fatal' cuenta como ataque fatal)
+        lugares (Optional[dict]): Columnas de lugar a resumir con su valor más frecuente
+            (nombre de columna de salida -> columna de df)
+
+    Returns:
+        pd.DataFrame: Columnas 'hotspot', 'latitud', 'longitud', 'radio_km', 'casos',
+        'fatales', 'tasa_fatalidad' y las de `lugares`, ordenadas por casos (hotspot 1 es el
+        de más ataques)
+    """
+    columnas = ['hotspot', 'latitud', 'longitud', 'radio_km', 'casos', 'fatales', 'tasa_fatalidad', *(lugares or {})]
+    en_hotspot = etiquetas >= 0
+    if not en_hotspot.any():
+        return pd.DataFrame(columns=columnas)
+
+    grupos = etiquetas[en_hotspot]
+    puntos = _unitarios(df[latitud].to_numpy()[en_hotspot], df[longitud].to_numpy()[en_hotspot])
+    n_grupos = grupos.max() + 1
+
+    casos = np.bincount(grupos, minlength=n_grupos)
+    fatales = np.bincount(grupos, weights=df[fatal].eq('Fatal').to_numpy()[en_hotspot], minlength=n_grupos)
+    # Centro: media de los vectores unitarios, proyectada de nuevo sobre la esfera
+    centro = np.column_stack([np.bincount(grupos, weights=puntos[:, i], minlength=n_grupos) for i in range(3)])
+    centro /= np.linalg.norm(centro, axis=1, keepdims=True)
+    # Extension: mayor distancia (sobre la superficie) de un punto del hotspot a su centro
+    coseno = np.clip((puntos * centro[grupos]).sum(axis=1), -1, 1)
+    radio_km = np.zeros(n_grupos)
+    np.maximum.at(radio_km, grupos, np.arccos(coseno) * RADIO_TIERRA_KM)
+
+    resumen = pd.DataFrame({
+        'latitud': np.degrees(np.arcsin(centro[:, 2])),
+        'longitud': np.degrees(np.arctan2(centro[:, 1], centro[:, 0])),
+        'radio_km': radio_km,
+        'casos': casos,
+        'fatales': fatales.astype(np.int64),
+        'tasa_fatalidad': fatales / casos * 100
+    })
+    for salida, columna in (lugares or {}).items():
+        resumen[salida] = _moda_por_grupo(grupos, df[columna][en_hotspot]).reindex(resumen.index)
+
+    resumen = resumen.sort_values(['casos', 'fatales'], ascending=False, kind='stable').reset_index(drop=True)
+    resumen.insert(0, 'hotspot', np.arange(1, len(resumen) + 1))
+    return resumen[columnas].round({'latitud': 4, 'longitud': 4, 'radio_km': 2, 'tasa_fatalidad': 2})
@@ -0,0 +1,274 @@
+"""
+Carga incremental del DataFrame limpio a partir de una marca de agua.
+
+La marca de agua tiene dos partes:
+    - el mayor id de shark_attackdatos ya cargado (filas nuevas: id mayor a la marca)
+    - la última secuencia leída de registro_cambios, que los triggers de la migración 5
+      llenan con el id de cada fila actualizada o borrada
+
+En cada actualización solo se consultan y limpian las filas nuevas o modificadas; las filas
+modificadas o borradas se quitan del DataFrame en memoria y las nuevas versiones se agregan al
+final. Los conteos de frecuencia de las columnas indicadas se ajustan con el delta en lugar de
+recalcularse sobre todo el DataFrame.
+
+Si la base de datos no tiene registro_cambios (esquema anterior a la versión 5), cualquier
+cambio en el número de filas o en el mayor id provoca una recarga completa.
+
+La última secuencia se lee de sqlite_sequence, que no retrocede al borrar entradas, de modo
+que registro_cambios se puede podar: tras cada recarga completa se borran las entradas ya
+incorporadas (ver podar_registro). Si a una carga le faltan entradas posteriores a su marca
+(las podó otro proceso), hace una recarga completa.
+"""
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import frecuencias
+import limpieza
+
+TABLA_CAMBIOS = "registro_cambios"
+
+
+def _alinear_categorias(a: pd.Categorical, b: pd.Categorical) -> tuple:
+    """
+    Iguala el dtype de las categorías de dos categóricas para union_categoricals: una
+    columna toda nula trae categorías vacías de tipo object, y con pandas >= 3 las de texto
+    son de tipo str.
+    """
+    if a.categories.dtype == b.categories.dtype:
+        return a, b
+    if len(a.categories) == 0:
+        return pd.Categorical.from_codes(a.codes, categories=a.categories.astype(b.categories.dtype)), b
+    return a, pd.Categorical.from_codes(b.codes, categories=b.categories.astype(a.categories.dtype))
+
+
+def _concatenar(anterior: pd.DataFrame, nuevo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega las filas de `nuevo` al final de `anterior`. Las columnas categóricas se unen con
+    categorías ordenadas (mismo criterio que limpieza) para que no pasen a object.
+    """
+    if anterior.empty:
+        return nuevo.reset_index(drop=True)
+    if nuevo.empty:
+        return anterior
+
+    columnas = {}
+    for columna in anterior.columns:
+        a, b = anterior[columna], nuevo[columna]
+        if isinstance(a.dtype, pd.CategoricalDtype) and isinstance(b.dtype, pd.CategoricalDtype):
+            columnas[columna] = pd.Series(union_categoricals(list(_alinear_categorias(a.array, b.array)),
+                                                             sort_categories=True))
+        else:
+            columnas[columna] = pd.concat([a, b], ignore_index=True).astype(a.dtype)
+    return pd.DataFrame(columnas)
+
+
+def podar_registro(ruta: str, hasta: int) -> int:
+    """
+    Borra de registro_cambios las entradas con secuencia menor o igual a `hasta`, con una
+    conexión de escritura que se cierra al terminar (las del pool son de solo lectura).
+
+    Args:
+        ruta (str): Archivo de la base de datos
+        hasta (int): Última secuencia ya incorporada
+
+    Returns:
+        int: Entradas borradas (0 si la base de datos no admite escritura)
+    """
+    try:
+        conn = sqlite3.connect(ruta)
+    except sqlite3.Error:
+        return 0
+    try:
+        with conn:
+            return conn.execute(f"DELETE FROM {TABLA_CAMBIOS} WHERE seq <= ?", (hasta,)).rowcount
+    except sqlite3.Error:
+        return 0
+    finally:
+        conn.close()
+
+
+class CargaIncremental:
+    """
+    Mantiene en memoria el DataFrame limpio, los ids de sus filas (en el mismo orden) y los
+    conteos de frecuencia de algunas columnas, y los actualiza con el delta de la base de datos.
+
+    Las actualizaciones nunca modifican el DataFrame en su lugar: construyen uno nuevo y lo
+    reemplazan bajo un lock, por lo que una referencia obtenida con `df` sigue siendo válida.
+    """
+
+    def __init__(self, consulta: str, reglas: Dict[str, Dict], columnas_frecuencia: Iterable[str] = (),
+                 ruta_poda: Optional[str] = None):
+        """
+        Args:
+            consulta (str): SELECT que devuelve la columna id y las columnas a limpiar, con un
+                marcador {condicion} para el WHERE del delta y ordenado por id
+            reglas (Dict[str, Dict]): Reglas de limpieza (ver limpieza.limpiar_columnas)
+            columnas_frecuencia (Iterable[str]): Columnas cuyos conteos se mantienen al día
+            ruta_poda (Optional[str]): Archivo de la base de datos; si se indica, tras cada
+                recarga completa se podan las entradas de registro_cambios ya incorporadas
+        """
+        self.consulta = consulta
+        self.reglas = reglas
+        self.columnas_frecuencia = tuple(columnas_frecuencia)
+        self.ruta_poda = ruta_poda
+        # Identificador de la version de la fuente verificada por ultima vez (lo fija quien llama)
+        self.version_verificada = None
+        self.df = pd.DataFrame()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.max_id = None
+        self.ultima_secuencia = None
+        self.total_filas = None
+        self.conteos: Dict[str, pd.Series] = {}
+        self.actualizaciones = {'completas': 0, 'incrementales': 0, 'sin_cambios': 0, 'podadas': 0}
+        self._lock = threading.RLock()
+
+    def _marca_agua(self, conn: sqlite3.Connection) -> Dict[str, Optional[int]]:
+        """
+        Lee el mayor id, el número de filas y la última secuencia asignada en registro_cambios
+        (de sqlite_sequence, que se conserva aunque se poden las entradas).
+        """
+        max_id, total = conn.execute(
+            "SELECT MAX(id), COUNT(*) FROM shark_attackdatos"
+        ).fetchone()
+        try:
+            conn.execute(f"SELECT 1 FROM {TABLA_CAMBIOS} LIMIT 0")
+            fila = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (TABLA_CAMBIOS,)).fetchone()
+            secuencia = fila[0] if fila else 0
+        except sqlite3.OperationalError:
+            secuencia = None
+        return {'max_id': max_id or 0, 'total': total, 'secuencia': secuencia}
+
+    def _consultar(self, conn: sqlite3.Connection, condicion: str = "", parametros: tuple = ()) -> tuple:
+        """Ejecuta la consulta con la condición dada y devuelve (ids, DataFrame limpio)."""
+        df = pd.read_sql_query(self.consulta.format(condicion=condicion), conn, params=parametros)
+        ids = df.pop('id').to_numpy(dtype=np.int64)
+        if df.empty:
+            return ids, df
+        return ids, limpieza.limpiar_columnas(df, self.reglas)
+
+    def _fijar(self, df: pd.DataFrame, ids: np.ndarray, marca: Dict[str, Optional[int]]):
+        self.df = df
+        self.ids = ids
+        self.max_id = marca['max_id']
+        self.ultima_secuencia = marca['secuencia']
+        self.total_filas = marca['total']
+
+    def cargar_completo(self, conn: sqlite3.Connection, df: pd.DataFrame = None):
+        """
+        Carga todo el DataFrame y recalcula los conteos.
+
+        Args:
+            conn (sqlite3.Connection): Conexión a la base de datos
+            df (pd.DataFrame): DataFrame limpio ya disponible (por ejemplo, el snapshot) que
+                corresponde a la versión actual de la base; si se omite se consulta todo
+        """
+        with self._lock:
+            marca = self._marca_agua(conn)
+            if df is None:
+                ids, df = self._consultar(conn)
+            else:
+                ids = np.fromiter((fila[0] for fila in conn.execute(
+                    "SELECT id FROM shark_attackdatos ORDER BY id")), dtype=np.int64)
+            self._fijar(df, ids, marca)
+            self.conteos = {c: frecuencias.conteos_columna(df[c]) for c in self.columnas_frecuencia if c in df.columns}
+            self.actualizaciones['completas'] += 1
+            if self.ruta_poda and marca['secuencia'] and conn.execute(
+                    f"SELECT EXISTS(SELECT 1 FROM {TABLA_CAMBIOS} WHERE seq <= ?)", (marca['secuencia'],)).fetchone()[0]:
+                self.actualizaciones['podadas'] += podar_registro(self.ruta_poda, marca['secuencia'])
+
+    def actualizar(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """
+        Incorpora las filas nuevas, modificadas y borradas desde la última marca de agua.
+
+        Args:
+            conn (sqlite3.Connection): Conexión a la base de datos
+
+        Returns:
+            Dict[str, int]: filas 'nuevas', 'reemplazadas' (modificadas o borradas) y
+            'recarga_completa' (1 si no se pudo aplicar el delta)
+        """
+        with self._lock:
+            if self.max_id is None:
+                self.cargar_completo(conn)
+                return {'nuevas': len(self.df), 'reemplazadas': 0, 'recarga_completa': 1}
+
+            marca = self._marca_agua(conn)
+            sin_registro = marca['secuencia'] is None or self.ultima_secuencia is None
+            if marca['max_id'] == self.max_id and (
+                    marca['total'] == self.total_filas if sin_registro else marca['secuencia'] == self.ultima_secuencia):
+                self.actualizaciones['sin_cambios'] += 1
+                return {'nuevas': 0, 'reemplazadas': 0, 'recarga_completa': 0}
+
+            # Sin registro de cambios (o si se vacio) no se puede saber que filas cambiaron
+            if sin_registro or marca['secuencia'] < self.ultima_secuencia:
+                self.cargar_completo(conn)
+                return {'nuevas': len(self.df), 'reemplazadas': 0, 'recarga_completa': 1}
+
+            # Entradas posteriores a la marca podadas por otro proceso: el delta no es recuperable
+            if marca['secuencia'] > self.ultima_secuencia:
+                primera = conn.execute(f"SELECT MIN(seq) FROM {TABLA_CAMBIOS} WHERE seq > ?",
+                                       (self.ultima_secuencia,)).fetchone()[0]
+                if primera != self.ultima_secuencia + 1:
+                    self.cargar_completo(conn)
+                    return {'nuevas': len(self.df), 'reemplazadas': 0, 'recarga_completa': 1}
+
+            rango = (self.ultima_secuencia, marca['secuencia'])
+            cambiados = np.fromiter((fila[0] for fila in conn.execute(
+                f"SELECT DISTINCT id_ataque FROM {TABLA_CAMBIOS} WHERE seq > ? AND seq <= ?", rango)), dtype=np.int64)
+
+            # Quitar las versiones anteriores de las filas modificadas o borradas
+            quitar = np.isin(self.ids, cambiados)
+            df, ids = self.df, self.ids
+            if quitar.any():
+                for columna in self.conteos:
+                    self.conteos[columna] = self.conteos[columna].sub(
+                        frecuencias.conteos_columna(df.loc[quitar, columna]), fill_value=0).astype(np.int64)
+                df = df.loc[~quitar].reset_index(drop=True)
+                ids = ids[~quitar]
+
+            # Filas nuevas y versiones actuales de las modificadas (las borradas ya no aparecen)
+            ids_delta, delta = self._consultar(
+                conn,
+                f"WHERE a.id > ? OR a.id IN (SELECT id_ataque FROM {TABLA_CAMBIOS} WHERE seq > ? AND seq <= ?)",
+                (self.max_id, *rango)
+            )
+            if not delta.empty:
+                for columna in self.conteos:
+                    self.conteos[columna] = self.conteos[columna].add(
+                        frecuencias.conteos_columna(delta[columna]), fill_value=0).astype(np.int64)
+
+            nuevas = int((ids_delta > self.max_id).sum())
+            self._fijar(_concatenar(df, delta), np.concatenate([ids, ids_delta]), marca)
+            self.actualizaciones['incrementales'] += 1
+            return {'nuevas': nuevas, 'reemplazadas': int(quitar.sum()), 'recarga_completa': 0}
+
+    def frecuencias(self, columna: str, excluir_desconocido: bool = True) -> pd.DataFrame:
+        """
+        Tabla de frecuencias de una columna a partir de los conteos mantenidos; mismo
+        formato que utils.analizar_frecuencias.
+
+        Args:
+            columna (str): Una de las columnas de columnas_frecuencia
+            excluir_desconocido (bool): Si True, excluye la categoría 'Desconocido'
+
+        Returns:
+            pd.DataFrame: Tabla de frecuencias, o None si la columna no se mantiene
+        """
+        conteos = self.conteos.get(columna)
+        if conteos is None:
+            return None
+        return frecuencias.tabla_frecuencias(conteos, excluir_desconocido)
+
+    def metricas(self) -> Dict:
+        """Marca de agua actual y número de actualizaciones por tipo."""
+        return {
+            'filas': len(self.df),
+            'max_id': self.max_id,
+            'ultima_secuencia': self.ultima_secuencia,
+            **self.actualizaciones
+        }
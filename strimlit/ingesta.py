@@ -0,0 +1,202 @@
+"""
+Carga masiva de archivos CSV de incidentes en shark_attackdatos.
+
+Acepta los dos formatos de CSV del repositorio:
+    - shark_attackdatos.csv: mismas columnas que la tabla
+    - SharkAttacks.csv: columnas extra (country_code_ISO_3166_1, location, www_nc1), 'dow' en
+      lugar de 'day', is_fatal como 0/1 y year como número decimal
+
+El archivo se lee en lotes con pandas y cada lote se inserta con executemany en una tabla
+temporal de preparación, todo dentro de una sola transacción. Luego se descartan los
+case_number repetidos (dentro del archivo y contra la tabla), se eliminan temporalmente los
+índices secundarios y los triggers, se insertan las filas nuevas y se reconstruyen índices y
+resúmenes una sola vez.
+
+Uso:
+    python ingesta.py archivo.csv [--bd ruta_bd] [--lote 50000] [--sin-diferir-indices]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+import materializacion
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+RUTA_BD = os.path.join(current_dir, "bbdd", "shark_attacks.db")
+TABLA = "shark_attackdatos"
+LOTE = 50_000
+
+# PRAGMAs de la conexion de carga (se restauran journal_mode y synchronous al terminar)
+PRAGMAS_CARGA = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'cache_size': -262144,   # 256 MB
+    'temp_store': 'MEMORY',
+    'locking_mode': 'EXCLUSIVE'
+}
+
+# Formato SharkAttacks.csv -> columnas de shark_attackdatos
+RENOMBRES_SHARKATTACKS = {'dow': 'day'}
+FATAL_NUMERICO = {'0': 'N', '1': 'Y', '0.0': 'N', '1.0': 'Y'}
+
+
+def _columnas_tabla(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Columnas de la tabla destino (sin id) con su tipo declarado."""
+    return {fila[1]: (fila[2] or '').upper() for fila in conn.execute(f'PRAGMA table_info("{TABLA}")')
+            if fila[1] != 'id'}
+
+
+def mapear_lote(lote: pd.DataFrame, columnas: Dict[str, str]) -> pd.DataFrame:
+    """
+    Convierte un lote leído como texto al esquema de shark_attackdatos: renombra columnas,
+    descarta filas vacías y las columnas que no existen en la tabla, normaliza is_fatal a 'Y'/'N', completa month
+    desde year-month y convierte las columnas numéricas (nulos como None).
+
+    Args:
+        lote (pd.DataFrame): Lote del CSV con todas las columnas como texto
+        columnas (Dict[str, str]): Columnas de la tabla destino y su tipo declarado
+
+    Returns:
+        pd.DataFrame: Lote con exactamente las columnas de la tabla, en su orden
+    """
+    lote = lote.rename(columns=RENOMBRES_SHARKATTACKS)
+    # Filas vacias (SharkAttacks.csv termina con una fila que solo tiene id e is_fatal = 0)
+    lote = lote[lote.drop(columns=['id', 'is_fatal'], errors='ignore').ne('').any(axis=1)].copy()
+
+    for columna in columnas:
+        if columna not in lote.columns:
+            lote[columna] = ''
+
+    lote['is_fatal'] = lote['is_fatal'].map(lambda v: FATAL_NUMERICO.get(v, v))
+    sin_mes = lote['month'].eq('') & lote['year-month'].str.len().ge(7)
+    lote.loc[sin_mes, 'month'] = lote.loc[sin_mes, 'year-month'].str[5:7]
+
+    resultado = lote[list(columnas)].astype(object)
+    for columna, tipo in columnas.items():
+        if tipo in ('INTEGER', 'REAL'):
+            numeros = pd.to_numeric(resultado[columna], errors='coerce')
+            if tipo == 'INTEGER':
+                # is_fatal esta declarada INTEGER pero guarda 'Y'/'N': solo se convierte si es numerica
+                if numeros.isna().all() and resultado[columna].ne('').any():
+                    continue
+                numeros = numeros.round().astype('Int64')
+            resultado[columna] = numeros.astype(object).where(numeros.notna(), None)
+    return resultado
+
+
+def _objetos_secundarios(conn: sqlite3.Connection) -> List[tuple]:
+    """Índices (salvo el de case_number) y triggers de la tabla, con su SQL para recrearlos."""
+    return conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE tbl_name = ? AND sql IS NOT NULL AND type IN ('index', 'trigger') "
+        "AND name != 'idx_ataques_case_number'",
+        (TABLA,)
+    ).fetchall()
+
+
+def ingerir_csv(archivo: str, ruta_bd: str = RUTA_BD, lote: int = LOTE, diferir_indices: bool = True) -> Dict:
+    """
+    Carga un CSV de incidentes en shark_attackdatos en una sola transacción.
+
+    Args:
+        archivo (str): Ruta del CSV (formato shark_attackdatos.csv o SharkAttacks.csv)
+        ruta_bd (str): Ruta del archivo de base de datos
+        lote (int): Filas por lote de lectura e inserción
+        diferir_indices (bool): Si True, elimina índices secundarios y triggers durante la
+            inserción y los reconstruye al final
+
+    Returns:
+        Dict: filas leídas, insertadas y descartadas por duplicadas, segundos y filas/s
+    """
+    inicio = time.perf_counter()
+    conn = sqlite3.connect(ruta_bd, isolation_level=None)
+    modo_original = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    for pragma, valor in PRAGMAS_CARGA.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+
+    leidas = insertadas = 0
+    try:
+        columnas = _columnas_tabla(conn)
+        lista = ", ".join(f'"{c}"' for c in columnas)
+        marcadores = ", ".join("?" for _ in columnas)
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f'CREATE TEMP TABLE preparacion AS SELECT {lista} FROM "{TABLA}" WHERE 0')
+
+        insercion = f"INSERT INTO preparacion ({lista}) VALUES ({marcadores})"
+        for trozo in pd.read_csv(archivo, dtype=str, keep_default_na=False, chunksize=lote):
+            filas = mapear_lote(trozo, columnas)
+            conn.executemany(insercion, filas.itertuples(index=False, name=None))
+            leidas += len(filas)
+
+        # Deduplicacion por case_number: primero dentro del archivo, luego contra la tabla
+        conn.execute("CREATE INDEX temp.idx_preparacion_case ON preparacion(case_number)")
+        conn.execute(
+            "DELETE FROM preparacion WHERE case_number IS NOT NULL AND case_number != '' "
+            "AND rowid NOT IN (SELECT MIN(rowid) FROM preparacion GROUP BY case_number)"
+        )
+        conn.execute(f'DELETE FROM preparacion WHERE case_number IN (SELECT case_number FROM "{TABLA}")')
+
+        secundarios = _objetos_secundarios(conn) if diferir_indices else []
+        for tipo, nombre, _ in secundarios:
+            conn.execute(f'DROP {tipo.upper()} IF EXISTS "{nombre}"')
+
+        cursor = conn.execute(f'INSERT INTO "{TABLA}" ({lista}) SELECT {lista} FROM preparacion ORDER BY rowid')
+        insertadas = cursor.rowcount
+
+        for _, _, sql in secundarios:
+            conn.execute(sql)
+
+        tiene_control = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'control_datos'"
+        ).fetchone()
+        if diferir_indices and tiene_control and insertadas:
+            # Los triggers no se dispararon: se registra el cambio y se reconstruyen los resumenes
+            conn.execute("UPDATE control_datos SET version_datos = version_datos + ? WHERE id = 1", (insertadas,))
+            for sentencia in materializacion.sentencias_refresco():
+                conn.execute(sentencia)
+
+        conn.execute("DROP TABLE preparacion")
+        conn.execute("COMMIT")
+        if diferir_indices and insertadas:
+            conn.execute("ANALYZE")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute(f"PRAGMA journal_mode = {modo_original}")
+        conn.close()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'leidas': leidas,
+        'insertadas': insertadas,
+        'duplicadas': leidas - insertadas,
+        'segundos': segundos,
+        'filas_por_segundo': leidas / segundos if segundos else 0.0
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Carga masiva de un CSV de incidentes en shark_attacks.db.")
+    parser.add_argument('archivo')
+    parser.add_argument('--bd', default=RUTA_BD, help="ruta de la base de datos")
+    parser.add_argument('--lote', type=int, default=LOTE, help="filas por lote")
+    parser.add_argument('--sin-diferir-indices', action='store_true',
+                        help="mantener índices y triggers activos durante la inserción")
+    args = parser.parse_args(argumentos)
+
+    r = ingerir_csv(args.archivo, args.bd, args.lote, not args.sin_diferir_indices)
+    print(f"{r['leidas']} filas leidas, {r['insertadas']} insertadas, {r['duplicadas']} duplicadas "
+          f"en {r['segundos']:.2f} s ({r['filas_por_segundo']:,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
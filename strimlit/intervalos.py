@@ -0,0 +1,185 @@
+"""
+Intervalos de confianza para tasas de fatalidad (proporción de ataques fatales por categoría).
+
+Para cada categoría se calculan tres intervalos:
+    - Wilson: aproximación normal corregida, fiable también con pocos casos
+    - Clopper-Pearson: intervalo exacto a partir de cuantiles de la distribución beta
+    - Bootstrap percentil: cada réplica remuestrea los n casos de la tabla categoría x
+      fatalidad con una extracción multinomial sobre sus celdas, vectorizada con NumPy
+      (Generator.multinomial con size=réplicas)
+
+Las réplicas del bootstrap se reparten en un número fijo de fragmentos, cada uno con su propia
+semilla derivada de np.random.SeedSequence. Los fragmentos se ejecutan en un pool de procesos
+solo si se piden varios procesos y el trabajo (réplicas x categorías) llega a MINIMO_POOL; por
+debajo, arrancar los procesos cuesta más que el cálculo. Con una semilla fija el resultado es
+el mismo con cualquier número de procesos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+FRAGMENTOS = 8
+
+# Réplicas x categorías a partir de las cuales compensa repartir el bootstrap en procesos
+# (10.000 réplicas x 160 categorías tardan menos de un segundo en un solo proceso)
+MINIMO_POOL = 20_000_000
+
+
+def intervalo_wilson(fatales: np.ndarray, casos: np.ndarray, confianza: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intervalo de Wilson de la proporción fatales / casos, elemento a elemento.
+
+    Args:
+        fatales (np.ndarray): Casos fatales por categoría
+        casos (np.ndarray): Casos totales por categoría (mayores que cero)
+        confianza (float): Nivel de confianza
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Límites inferior y superior (proporciones entre 0 y 1)
+    """
+    fatales, casos = np.asarray(fatales, dtype=np.float64), np.asarray(casos, dtype=np.float64)
+    z = stats.norm.ppf(0.5 + confianza / 2)
+    p = fatales / casos
+    denominador = 1 + z ** 2 / casos
+    centro = (p + z ** 2 / (2 * casos)) / denominador
+    radio = z * np.sqrt(p * (1 - p) / casos + z ** 2 / (4 * casos ** 2)) / denominador
+    return np.clip(centro - radio, 0, 1), np.clip(centro + radio, 0, 1)
+
+
+def intervalo_clopper_pearson(fatales: np.ndarray, casos: np.ndarray,
+                              confianza: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intervalo exacto de Clopper-Pearson de la proporción fatales / casos, elemento a elemento.
+
+    Args:
+        fatales (np.ndarray): Casos fatales por categoría
+        casos (np.ndarray): Casos totales por categoría (mayores que cero)
+        confianza (float): Nivel de confianza
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Límites inferior y superior (proporciones entre 0 y 1)
+    """
+    fatales, casos = np.asarray(fatales, dtype=np.float64), np.asarray(casos, dtype=np.float64)
+    alfa = 1 - confianza
+    with np.errstate(invalid='ignore'):
+        inferior = stats.beta.ppf(alfa / 2, fatales, casos - fatales + 1)
+        superior = stats.beta.ppf(1 - alfa / 2, fatales + 1, casos - fatales)
+    # En los extremos (0 o todos fatales) el limite correspondiente es exacto
+    return np.where(fatales == 0, 0.0, inferior), np.where(fatales == casos, 1.0, superior)
+
+
+def _replicas_fragmento(tablas: List[np.ndarray], replicas: int, semilla: np.random.SeedSequence) -> List[np.ndarray]:
+    """
+    Tasas de fatalidad de `replicas` remuestreos de cada tabla (una fila por categoría con las
+    columnas fatales y no fatales). Se ejecuta en los procesos del pool.
+
+    Returns:
+        List[np.ndarray]: Por tabla, arreglo (réplicas, categorías) con NaN donde la categoría
+        no tiene casos en la réplica
+    """
+    generador = np.random.default_rng(semilla)
+    resultado = []
+    for tabla in tablas:
+        n = int(tabla.sum())
+        muestras = generador.multinomial(n, tabla.ravel() / n, size=replicas).reshape(replicas, *tabla.shape)
+        casos = muestras.sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado.append((muestras[:, :, 0] / casos).astype(np.float32))
+    return resultado
+
+
+def bootstrap_tasas(tablas: Sequence[np.ndarray], replicas: int = 10_000, confianza: float = 0.95,
+                    semilla: Optional[int] = None, procesos: Optional[int] = 1,
+                    fragmentos: int = FRAGMENTOS,
+                    minimo_pool: int = MINIMO_POOL) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Intervalos bootstrap percentil de las tasas de fatalidad de varias tablas a la vez.
+
+    Args:
+        tablas (Sequence[np.ndarray]): Tablas (categorías x 2) con los conteos fatales y no fatales
+        replicas (int): Número total de réplicas por tabla
+        confianza (float): Nivel de confianza
+        semilla (Optional[int]): Semilla para resultados reproducibles; None usa entropía del sistema
+        procesos (Optional[int]): Procesos del pool; None usa os.cpu_count() y 1 calcula en el
+            proceso actual, sin pool
+        fragmentos (int): Número de fragmentos en que se reparten las réplicas
+        minimo_pool (int): Réplicas x categorías por debajo de las cuales se calcula en el
+            proceso actual aunque se pidan varios procesos
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: Por tabla, límites inferior y superior por categoría
+    """
+    tablas = [np.asarray(t, dtype=np.int64) for t in tablas]
+    fragmentos = max(1, min(fragmentos, replicas))
+    tamanos = [len(r) for r in np.array_split(np.arange(replicas), fragmentos)]
+    semillas = np.random.SeedSequence(semilla).spawn(fragmentos)
+
+    procesos = min(procesos or os.cpu_count() or 1, fragmentos)
+    if replicas * sum(len(t) for t in tablas) < minimo_pool:
+        procesos = 1
+    if procesos > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            partes = list(pool.map(_replicas_fragmento, [tablas] * fragmentos, tamanos, semillas))
+    else:
+        partes = [_replicas_fragmento(tablas, tamano, s) for tamano, s in zip(tamanos, semillas)]
+
+    alfa = 1 - confianza
+    resultado = []
+    for i in range(len(tablas)):
+        tasas = np.concatenate([parte[i] for parte in partes])
+        inferior, superior = np.nanpercentile(tasas, [100 * alfa / 2, 100 * (1 - alfa / 2)], axis=0)
+        resultado.append((inferior.astype(np.float64), superior.astype(np.float64)))
+    return resultado
+
+
+def intervalos_fatalidad(tablas: Dict[str, pd.DataFrame], replicas: int = 10_000, confianza: float = 0.95,
+                         semilla: Optional[int] = None, procesos: Optional[int] = 1) -> Dict[str, pd.DataFrame]:
+    """
+    Tasa de fatalidad con sus intervalos de Wilson, Clopper-Pearson y bootstrap para cada
+    categoría de varias variables. El bootstrap de todas las variables se hace en una sola
+    llamada a bootstrap_tasas.
+
+    Args:
+        tablas (Dict[str, pd.DataFrame]): Por variable, conteos con una fila por categoría y
+            las columnas 'Fatal' y 'No Fatal'
+        replicas (int): Réplicas bootstrap
+        confianza (float): Nivel de confianza
+        semilla (Optional[int]): Semilla del bootstrap (None para no fijarla)
+        procesos (Optional[int]): Procesos del pool (ver bootstrap_tasas)
+
+    Returns:
+        Dict[str, pd.DataFrame]: Por variable, una fila por categoría con casos, tasa e
+        intervalos en porcentaje, ordenada por el límite inferior de Wilson (de mayor a menor),
+        de modo que las categorías con muy pocos casos no encabezan el ranking
+    """
+    conteos = {}
+    for variable, tabla in tablas.items():
+        tabla = tabla[['Fatal', 'No Fatal']]
+        conteos[variable] = tabla[tabla.sum(axis=1) > 0]
+
+    variables = [v for v in conteos if len(conteos[v])]
+    bootstrap = bootstrap_tasas([conteos[v].to_numpy() for v in variables], replicas, confianza, semilla, procesos)
+
+    resultado = {}
+    for variable, (boot_inf, boot_sup) in zip(variables, bootstrap):
+        fatales = conteos[variable]['Fatal'].to_numpy()
+        casos = conteos[variable].sum(axis=1).to_numpy()
+        wilson_inf, wilson_sup = intervalo_wilson(fatales, casos, confianza)
+        cp_inf, cp_sup = intervalo_clopper_pearson(fatales, casos, confianza)
+        tabla = pd.DataFrame({
+            'Casos': casos,
+            'Fatales': fatales,
+            'Tasa Fatalidad %': fatales / casos * 100,
+            'Wilson inf %': wilson_inf * 100,
+            'Wilson sup %': wilson_sup * 100,
+            'Clopper-Pearson inf %': cp_inf * 100,
+            'Clopper-Pearson sup %': cp_sup * 100,
+            'Bootstrap inf %': boot_inf * 100,
+            'Bootstrap sup %': boot_sup * 100
+        }, index=conteos[variable].index)
+        resultado[variable] = tabla.round(2).sort_values('Wilson inf %', ascending=False)
+    return resultado
@@ -0,0 +1,259 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Any
+
+
+def _normalizar_texto(serie: pd.Series, reglas: Dict[str, Any]) -> pd.Series:
+    """
+    Normaliza una columna de texto trabajando sobre sus valores únicos.
+
+    La columna se factoriza una sola vez (códigos enteros + valores únicos) y todas las
+    operaciones de texto (mayúsculas, strip, mapeo, desconocidos) se aplican solo a los
+    valores únicos. El resultado se reconstruye con un `take` vectorizado sobre los códigos,
+    por lo que el costo de las operaciones de texto no depende del número de filas.
+
+    Args:
+        serie (pd.Series): Columna original leída de la base de datos
+        reglas (Dict[str, Any]): Especificación de la columna (ver REGLAS en utils)
+
+    Returns:
+        pd.Series: Columna normalizada con el mismo índice que la original
+    """
+    defecto = reglas.get('defecto', 'Desconocido')
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+
+    valores = pd.Series(unicos, dtype=object)
+    if reglas.get('normalizar', False):
+        valores = valores.astype(str).str.upper().str.strip()
+
+    if 'mapeo' in reglas:
+        valores = valores.map(reglas['mapeo'])
+
+    desconocidos = {str(v).upper() for v in reglas.get('desconocidos', ())}
+    if desconocidos:
+        valores = valores.where(~valores.astype(str).str.upper().isin(desconocidos), defecto)
+
+    if defecto is not None:
+        valores = valores.fillna(defecto)
+
+    # El centinela -1 (valores nulos) apunta a la posicion extra con el valor por defecto
+    tabla = np.append(valores.to_numpy(dtype=object), defecto)
+
+    if reglas.get('categoria', False):
+        # Se traducen los codigos de los valores unicos a codigos de categorias ordenadas,
+        # sin materializar nunca la columna completa como cadenas de Python
+        codigos_tabla, categorias = pd.factorize(tabla, sort=True, use_na_sentinel=True)
+        categoria = pd.Categorical.from_codes(codigos_tabla[codigos], categories=categorias)
+        return pd.Series(categoria, index=serie.index, name=serie.name)
+
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name)
+
+
+def _normalizar_numero(serie: pd.Series, reglas: Dict[str, Any]) -> pd.Series:
+    """
+    Convierte una columna a numérica y reemplaza por NaN los valores fuera de rango.
+
+    Args:
+        serie (pd.Series): Columna original leída de la base de datos
+        reglas (Dict[str, Any]): Especificación de la columna con la clave opcional 'rango'
+
+    Returns:
+        pd.Series: Columna numérica con NaN en los valores inválidos
+    """
+    numeros = pd.to_numeric(serie, errors='coerce').astype(reglas.get('dtype', 'float64'))
+    if 'rango' in reglas:
+        minimo, maximo = reglas['rango']
+        numeros = numeros.where((numeros >= minimo) & (numeros <= maximo))
+    return numeros
+
+
+def _normalizar_coordenada(serie: pd.Series, reglas: Dict[str, Any]) -> pd.Series:
+    """
+    Extrae una componente numérica de una columna de texto con pares 'latitud, longitud'
+    (como geo_point). Igual que _normalizar_texto, el texto se separa solo sobre los valores
+    únicos y el resultado se reconstruye con un `take` sobre los códigos.
+
+    Args:
+        serie (pd.Series): Columna original leída de la base de datos
+        reglas (Dict[str, Any]): Especificación con 'componente' (0 latitud, 1 longitud) y
+            las claves opcionales 'rango' y 'dtype'
+
+    Returns:
+        pd.Series: Columna numérica con NaN en los valores vacíos, mal formados o fuera de rango
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    partes = pd.Series(unicos, dtype=object).astype(str).str.split(',', n=1, expand=True)
+    componente = reglas.get('componente', 0)
+    if componente in partes.columns:
+        valores = pd.to_numeric(partes[componente].str.strip(), errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        valores = np.full(len(unicos), np.nan)
+    if 'rango' in reglas:
+        minimo, maximo = reglas['rango']
+        valores = np.where((valores >= minimo) & (valores <= maximo), valores, np.nan)
+
+    tabla = np.append(valores, np.nan).astype(reglas.get('dtype', 'float64'))
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name)
+
+
+def _normalizar_fecha(serie: pd.Series, reglas: Dict[str, Any]) -> pd.Series:
+    """
+    Convierte una columna de texto con fechas a datetime64. Las fechas se interpretan solo
+    sobre los valores únicos y el resultado se reconstruye con un `take` sobre los códigos.
+    Con 'precision' = 'mes' solo se leen año y mes (los primeros 7 caracteres), de modo que
+    las fechas con día desconocido ('2007-02-00') conservan su mes.
+
+    Args:
+        serie (pd.Series): Columna original leída de la base de datos
+        reglas (Dict[str, Any]): Especificación con las claves opcionales 'formato' (por
+            defecto ISO 8601), 'precision', 'rango' (años mínimo y máximo) y 'dtype'
+
+    Returns:
+        pd.Series: Columna datetime64 con NaT en los valores vacíos, mal formados o fuera de rango
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    textos = pd.Series(unicos, dtype=object)
+    if reglas.get('precision') == 'mes':
+        textos = textos.astype(str).str[:7]
+        formato = reglas.get('formato', '%Y-%m')
+    else:
+        formato = reglas.get('formato', 'ISO8601')
+    fechas = pd.to_datetime(textos, format=formato, errors='coerce')
+    if 'rango' in reglas:
+        minimo, maximo = reglas['rango']
+        fechas = fechas.where((fechas.dt.year >= minimo) & (fechas.dt.year <= maximo))
+
+    dtype = reglas.get('dtype', 'datetime64[ns]')
+    tabla = np.append(fechas.to_numpy(dtype=dtype), np.datetime64('NaT')).astype(dtype)
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name)
+
+
+def _normalizar_hora(serie: pd.Series, reglas: Dict[str, Any]) -> pd.Series:
+    """
+    Extrae la hora del día (en horas decimales, 13h30 -> 13.5) de una columna de texto libre
+    como time ('13h30', '13:30', 'Shortly before 13h00'); se toma la primera hora escrita.
+    Igual que _normalizar_texto, el texto se analiza solo sobre los valores únicos.
+
+    Args:
+        serie (pd.Series): Columna original leída de la base de datos
+        reglas (Dict[str, Any]): Especificación con la clave opcional 'dtype'
+
+    Returns:
+        pd.Series: Columna numérica en [0, 24) con NaN donde el texto no contiene una hora válida
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    partes = pd.Series(unicos, dtype=object).astype(str).str.upper().str.extract(r'(\d{1,2})\s*[H:J]\s*(\d{2})')
+    horas = pd.to_numeric(partes[0], errors='coerce').to_numpy(dtype=np.float64)
+    minutos = pd.to_numeric(partes[1], errors='coerce').to_numpy(dtype=np.float64)
+    valores = np.where((horas < 24) & (minutos < 60), horas + minutos / 60, np.nan)
+
+    tabla = np.append(valores, np.nan).astype(reglas.get('dtype', 'float64'))
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name)
+
+
+def _literal_sql(valor: Any) -> str:
+    """Literal SQL de un valor de texto o nulo (comillas simples escapadas)."""
+    if valor is None:
+        return "NULL"
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def expresion_sql(origen: str, regla: Dict[str, Any]) -> str:
+    """
+    Traduce la regla de limpieza de una columna de texto a una expresión SQL equivalente, para
+    agrupar directamente en SQLite con el mismo tratamiento de mapeos, desconocidos y nulos
+    que _normalizar_texto.
+
+    Args:
+        origen (str): Expresión SQL de la columna cruda (por ejemplo 'a.activity')
+        regla (Dict[str, Any]): Especificación de la columna (ver limpiar_columnas)
+
+    Returns:
+        str: Expresión SQL con el valor limpio (NULL donde pandas dejaría un nulo)
+    """
+    if regla.get('tipo', 'texto') != 'texto':
+        raise ValueError("expresion_sql solo admite columnas de texto")
+
+    defecto = regla.get('defecto', 'Desconocido')
+    expresion = origen
+    if regla.get('normalizar', False):
+        expresion = f"UPPER(TRIM({expresion}))"
+
+    if 'mapeo' in regla:
+        casos = " ".join(f"WHEN {_literal_sql(k)} THEN {_literal_sql(v)}" for k, v in regla['mapeo'].items())
+        expresion = f"(CASE {expresion} {casos} END)"
+
+    desconocidos = sorted({str(v).upper() for v in regla.get('desconocidos', ())})
+    if desconocidos:
+        lista = ", ".join(_literal_sql(v) for v in desconocidos)
+        expresion = f"(CASE WHEN UPPER({expresion}) IN ({lista}) THEN {_literal_sql(defecto)} ELSE {expresion} END)"
+
+    if defecto is not None:
+        expresion = f"COALESCE({expresion}, {_literal_sql(defecto)})"
+    return expresion
+
+
+def limpiar_columnas(df: pd.DataFrame, reglas: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Aplica una tabla declarativa de reglas de limpieza sobre un DataFrame en una sola pasada.
+
+    Cada entrada de `reglas` describe una columna de salida:
+        - 'origen': columna de entrada (por defecto la misma columna de salida)
+        - 'tipo': 'texto', 'numero', 'coordenada' (componente de un texto 'latitud, longitud'),
+          'fecha' (texto a datetime64) u 'hora' (hora del día en horas decimales de un texto libre)
+        - 'normalizar': si True aplica mayúsculas y strip al texto
+        - 'mapeo': diccionario de valores crudos a categorías
+        - 'desconocidos': conjunto de valores que se reemplazan por 'defecto'
+        - 'defecto': valor para nulos, no mapeados y desconocidos (None conserva los nulos)
+        - 'categoria': si True la columna de texto se devuelve como pd.Categorical
+        - 'rango': tupla (minimo, maximo) para columnas numéricas (años para las fechas)
+        - 'dtype': dtype de salida para columnas numéricas y fechas
+        - 'componente': posición (0 o 1) de la coordenada a extraer
+        - 'formato': formato de las fechas (por defecto ISO 8601)
+        - 'precision': 'mes' para leer solo año y mes de las fechas
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos crudos
+        reglas (Dict[str, Dict[str, Any]]): Tabla de reglas por columna de salida
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame con las columnas de salida reemplazadas o añadidas
+    """
+    for columna, regla in reglas.items():
+        origen = regla.get('origen', columna)
+        if origen not in df.columns:
+            continue
+
+        if regla.get('tipo', 'texto') == 'numero':
+            df[columna] = _normalizar_numero(df[origen], regla)
+        elif regla.get('tipo') == 'coordenada':
+            df[columna] = _normalizar_coordenada(df[origen], regla)
+        elif regla.get('tipo') == 'fecha':
+            df[columna] = _normalizar_fecha(df[origen], regla)
+        elif regla.get('tipo') == 'hora':
+            df[columna] = _normalizar_hora(df[origen], regla)
+        else:
+            df[columna] = _normalizar_texto(df[origen], regla)
+
+    return df
+
+
+def memoria_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reporta la huella de memoria de un DataFrame por columna, incluyendo el contenido
+    real de las cadenas de texto (deep=True).
+
+    Args:
+        df (pd.DataFrame): DataFrame a medir
+
+    Returns:
+        pd.DataFrame: DataFrame con columnas 'Columna', 'Tipo' y 'Memoria (KB)', más una fila 'Total'
+    """
+    memoria = df.memory_usage(deep=True, index=False)
+    resultado = pd.DataFrame({
+        'Columna': memoria.index,
+        'Tipo': [str(df[c].dtype) for c in memoria.index],
+        'Memoria (KB)': (memoria.values / 1024).round(2)
+    })
+    total = pd.DataFrame({'Columna': ['Total'], 'Tipo': [''], 'Memoria (KB)': [round(memoria.sum() / 1024, 2)]})
+    return pd.concat([resultado, total], ignore_index=True)
@@ -0,0 +1,221 @@
+"""
+Análisis del ciclo lunar de los ataques: histograma de la iluminación (moon_phase_rate) y
+estadística circular sobre la posición de cada ataque en el ciclo.
+
+La posición en el ciclo es un ángulo θ en [0, 2π): 0 luna nueva, π luna llena. moon_phase_rate
+es el porcentaje iluminado, k = (1 - cos θ) / 2, que no distingue la fase creciente de la
+menguante: θ se obtiene de k y de la etiqueta moon_phase (WAXING / WANING). Solo una parte de
+los ataques trae moon_phase_rate; para el resto θ se calcula con la edad de la luna en la
+fecha del ataque (mes sinódico medio desde una luna nueva de referencia), de modo que el
+análisis cubre todos los ataques con fecha completa.
+
+Todo se resuelve en una pasada: cos θ y sen θ se calculan una vez y las sumas por grupo
+(fatal, no fatal) y los histogramas por intervalo se obtienen con np.bincount sobre un código
+combinado de intervalo y grupo.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+CICLO_SINODICO = 29.530588853
+# Luna nueva de referencia (UTC); las fechas sin hora se toman al mediodía
+LUNA_NUEVA_REFERENCIA = np.datetime64('2000-01-06T18:14', 'm')
+FASES = ('Luna nueva', 'Creciente', 'Cuarto creciente', 'Gibosa creciente',
+         'Luna llena', 'Gibosa menguante', 'Cuarto menguante', 'Menguante')
+INTERVALOS_ILUMINACION = 10
+GRUPOS = ('Fatal', 'No Fatal')
+NIVEL_SIGNIFICANCIA = 0.05
+
+
+def fase_desde_fecha(fechas: np.ndarray) -> np.ndarray:
+    """
+    Ángulo del ciclo lunar de cada fecha según el mes sinódico medio (error de hasta un día
+    frente a las efemérides).
+
+    Args:
+        fechas (np.ndarray): Fechas datetime64 (NaT si no se conocen)
+
+    Returns:
+        np.ndarray: Ángulo en radianes en [0, 2π), NaN donde la fecha es NaT
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[D]')
+    minutos = (fechas.astype('datetime64[m]') - LUNA_NUEVA_REFERENCIA).astype(np.float64) + 12 * 60
+    minutos[np.isnat(fechas)] = np.nan
+    return 2 * np.pi * np.mod(minutos / (1440 * CICLO_SINODICO), 1.0)
+
+
+def fase_desde_iluminacion(iluminacion: np.ndarray, menguante: np.ndarray) -> np.ndarray:
+    """
+    Ángulo del ciclo lunar a partir del porcentaje iluminado y del sentido de la fase.
+
+    Args:
+        iluminacion (np.ndarray): Porcentaje iluminado (0 a 100, NaN si no se conoce)
+        menguante (np.ndarray): Indicador booleano de fase menguante
+
+    Returns:
+        np.ndarray: Ángulo en radianes en [0, 2π) (en [0, π] si es creciente)
+    """
+    angulo = np.arccos(np.clip(1 - 2 * np.asarray(iluminacion, dtype=np.float64) / 100, -1, 1))
+    return np.where(np.asarray(menguante, dtype=bool), 2 * np.pi - angulo, angulo) % (2 * np.pi)
+
+
+def iluminacion_desde_fase(angulo: np.ndarray) -> np.ndarray:
+    """Porcentaje iluminado de cada ángulo del ciclo lunar."""
+    return (1 - np.cos(angulo)) / 2 * 100
+
+
+def rayleigh(n: int, longitud_media: float) -> float:
+    """
+    p valor de la prueba de Rayleigh (H0: ángulos uniformes en el círculo) con la
+    aproximación de Zar, p = exp(sqrt(1 + 4n + 4(n² - Rn²)) - (1 + 2n)).
+
+    Args:
+        n (int): Número de ángulos
+        longitud_media (float): Longitud del vector medio R̄ (0 a 1)
+
+    Returns:
+        float: p valor (NaN si n es 0)
+    """
+    if n == 0:
+        return float('nan')
+    resultante = n * longitud_media
+    return float(np.clip(np.exp(np.sqrt(1 + 4 * n + 4 * (n ** 2 - resultante ** 2)) - (1 + 2 * n)), 0, 1))
+
+
+def _resumen_circular(n: float, suma_cos: float, suma_sen: float) -> Dict[str, float]:
+    """Dirección media, longitud del vector medio y prueba de Rayleigh desde las sumas de cos y sen."""
+    n = int(n)
+    if n == 0:
+        return {'n': 0, 'direccion_media': np.nan, 'dia_ciclo': np.nan, 'fase_media': None,
+                'longitud_media': np.nan, 'desviacion_circular': np.nan, 'z_rayleigh': np.nan, 'p_rayleigh': np.nan}
+    direccion = float(np.arctan2(suma_sen, suma_cos) % (2 * np.pi))
+    longitud = float(np.hypot(suma_cos, suma_sen) / n)
+    return {
+        'n': n,
+        'direccion_media': np.degrees(direccion),
+        'dia_ciclo': direccion / (2 * np.pi) * CICLO_SINODICO,
+        'fase_media': FASES[int((direccion + np.pi / 8) // (np.pi / 4)) % len(FASES)],
+        'longitud_media': longitud,
+        'desviacion_circular': float(np.degrees(np.sqrt(-2 * np.log(longitud)))) if longitud > 0 else np.inf,
+        'z_rayleigh': n * longitud ** 2,
+        'p_rayleigh': rayleigh(n, longitud)
+    }
+
+
+def comparar_distribuciones(angulos: np.ndarray, grupos: np.ndarray) -> Dict[str, float]:
+    """
+    Prueba de Mardia-Watson-Wheeler de puntuaciones uniformes: ¿tienen los grupos la misma
+    distribución en el círculo? Los ángulos se reemplazan por sus rangos repartidos
+    uniformemente, β = 2π rango / N, y W = 2 Σ (C² + S²) / n sobre las sumas de cos β y sen β
+    de cada grupo sigue aproximadamente una chi-cuadrado con 2 (k - 1) grados de libertad.
+
+    Args:
+        angulos (np.ndarray): Ángulos en radianes (sin nulos)
+        grupos (np.ndarray): Código entero del grupo de cada ángulo (0 a k - 1)
+
+    Returns:
+        Dict[str, float]: 'w', 'gl' y 'p_valor' (NaN si algún grupo está vacío)
+    """
+    n_grupos = int(grupos.max()) + 1 if len(grupos) else 0
+    tamanos = np.bincount(grupos, minlength=n_grupos)
+    if n_grupos < 2 or (tamanos == 0).any():
+        return {'w': np.nan, 'gl': max(2 * (n_grupos - 1), 0), 'p_valor': np.nan}
+
+    beta = 2 * np.pi * stats.rankdata(angulos) / len(angulos)
+    suma_cos = np.bincount(grupos, weights=np.cos(beta), minlength=n_grupos)
+    suma_sen = np.bincount(grupos, weights=np.sin(beta), minlength=n_grupos)
+    w = float(2 * ((suma_cos ** 2 + suma_sen ** 2) / tamanos).sum())
+    gl = 2 * (n_grupos - 1)
+    return {'w': w, 'gl': gl, 'p_valor': float(stats.chi2.sf(w, gl))}
+
+
+def analizar_ciclo(iluminacion: np.ndarray, menguante: np.ndarray, fechas: np.ndarray, fatal: pd.Series,
+                   intervalos: int = INTERVALOS_ILUMINACION) -> Dict[str, object]:
+    """
+    Histograma de la iluminación y estadística circular del ciclo lunar de todos los ataques,
+    de los fatales y de los no fatales, en una sola pasada.
+
+    Args:
+        iluminacion (np.ndarray): moon_phase_rate de cada ataque (NaN si no se registró)
+        menguante (np.ndarray): Indicador booleano de fase menguante según moon_phase
+        fechas (np.ndarray): Fecha completa de cada ataque (datetime64, NaT si no se conoce)
+        fatal (pd.Series): Fatalidad de cada ataque ('Fatal', 'No Fatal' u otro valor)
+        intervalos (int): Intervalos del histograma de iluminación entre 0 y 100
+
+    Returns:
+        Dict[str, object]: Diccionario con:
+            - 'resumen': pd.DataFrame con n, dirección media (grados y día del ciclo), fase
+              media, R̄, desviación circular y prueba de Rayleigh por grupo ('Todos', 'Fatal', 'No Fatal')
+            - 'iluminacion': pd.DataFrame con ataques y fatales por intervalo de iluminación
+            - 'fases': pd.DataFrame con ataques y fatales en cada una de las 8 FASES
+            - 'comparacion': prueba de Mardia-Watson-Wheeler entre fatales y no fatales
+            - 'origen': número de ataques con la fase registrada y con la fase calculada por fecha
+    """
+    iluminacion = np.asarray(iluminacion, dtype=np.float64)
+    registrada = ~np.isnan(iluminacion)
+    angulos = np.where(registrada, fase_desde_iluminacion(iluminacion, menguante), fase_desde_fecha(fechas))
+    iluminacion = np.where(registrada, iluminacion, iluminacion_desde_fase(angulos))
+
+    # Grupo 0 fatal, 1 no fatal, 2 fatalidad desconocida; sin angulo no entran en el analisis
+    codigo = np.select([fatal.eq(GRUPOS[0]).to_numpy(dtype=bool), fatal.eq(GRUPOS[1]).to_numpy(dtype=bool)],
+                       [0, 1], 2)
+    validos = ~np.isnan(angulos)
+    angulos, iluminacion, codigo = angulos[validos], iluminacion[validos], codigo[validos]
+    n_grupos = len(GRUPOS) + 1
+
+    conteos = np.bincount(codigo, minlength=n_grupos)
+    suma_cos = np.bincount(codigo, weights=np.cos(angulos), minlength=n_grupos)
+    suma_sen = np.bincount(codigo, weights=np.sin(angulos), minlength=n_grupos)
+    resumen = pd.DataFrame([
+        _resumen_circular(conteos.sum(), suma_cos.sum(), suma_sen.sum()),
+        *(_resumen_circular(conteos[i], suma_cos[i], suma_sen[i]) for i in range(len(GRUPOS)))
+    ], index=pd.Index(['Todos', *GRUPOS], name='grupo'))
+    resumen['significativo'] = resumen['p_rayleigh'] < NIVEL_SIGNIFICANCIA
+
+    bordes = np.linspace(0, 100, intervalos + 1)
+    intervalo = np.clip(np.digitize(iluminacion, bordes[1:-1]), 0, intervalos - 1)
+    sector = (np.floor((angulos + np.pi / 8) / (np.pi / 4)).astype(np.int64)) % len(FASES)
+
+    def _tabla(claves: np.ndarray, n_claves: int, indice: pd.Index) -> pd.DataFrame:
+        por_grupo = np.bincount(claves * n_grupos + codigo, minlength=n_claves * n_grupos).reshape(n_claves, n_grupos)
+        tabla = pd.DataFrame({'ataques': por_grupo.sum(axis=1), 'fatales': por_grupo[:, 0],
+                              'no_fatales': por_grupo[:, 1]}, index=indice)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tabla['tasa_fatalidad'] = (tabla['fatales'] / (tabla['fatales'] + tabla['no_fatales']) * 100).round(2)
+        return tabla
+
+    etiquetas = [f"{a:g}-{b:g}%" for a, b in zip(bordes[:-1], bordes[1:])]
+    conocidos = codigo < len(GRUPOS)
+    return {
+        'resumen': resumen,
+        'iluminacion': _tabla(intervalo, intervalos, pd.Index(etiquetas, name='iluminacion')),
+        'fases': _tabla(sector, len(FASES), pd.CategoricalIndex(FASES, categories=FASES, ordered=True, name='fase')),
+        'comparacion': comparar_distribuciones(angulos[conocidos], codigo[conocidos]),
+        'origen': {'registrada': int(registrada[validos].sum()), 'por_fecha': int((~registrada[validos]).sum())}
+    }
+
+
+def analisis_desde_dataframe(df: pd.DataFrame, iluminacion: str = 'moon_phase_rate', fase: str = 'moon_phase',
+                             fecha: str = 'fecha', fatal: str = 'is_fatal_cat',
+                             intervalos: Optional[int] = None) -> Dict[str, object]:
+    """
+    analizar_ciclo sobre las columnas de un DataFrame limpio.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpio
+        iluminacion (str): Columna numérica con el porcentaje iluminado
+        fase (str): Columna con la etiqueta de la fase (las que empiezan por WANING o
+            LAST se toman como menguantes)
+        fecha (str): Columna datetime64 con la fecha completa del ataque
+        fatal (str): Columna de fatalidad
+        intervalos (Optional[int]): Intervalos del histograma (INTERVALOS_ILUMINACION por defecto)
+
+    Returns:
+        Dict[str, object]: Ver analizar_ciclo
+    """
+    menguante = df[fase].astype(str).str.upper().str.startswith(('WANING', 'LAST')).to_numpy(dtype=bool)
+    return analizar_ciclo(df[iluminacion].to_numpy(dtype=np.float64, na_value=np.nan), menguante,
+                          df[fecha].to_numpy(dtype='datetime64[ns]'), df[fatal],
+                          intervalos or INTERVALOS_ILUMINACION)
@@ -0,0 +1,169 @@
+"""
+Tablas de resumen materializadas que reemplazan la agregación en vivo de las vistas SQL.
+
+Cada vista tiene una tabla de conteos por clave (estación, fase lunar, actividad fatal, año
+fatal y especie). Los triggers sobre shark_attackdatos aplican el delta de cada INSERT,
+UPDATE o DELETE, y la tabla control_datos lleva dos contadores:
+    - version_datos: aumenta con cualquier cambio en shark_attackdatos
+    - version_resumenes: aumenta cuando los triggers de resumen aplican el delta
+Si ambos difieren (por ejemplo, tras una carga masiva con los triggers de resumen
+eliminados), los resúmenes están desactualizados hasta ejecutar refrescar_resumenes().
+
+Uso:
+    python materializacion.py [ruta_bd]   reconstruye todos los resúmenes
+"""
+import os
+import sqlite3
+import sys
+from typing import List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+RUTA_BD = os.path.join(current_dir, "bbdd", "shark_attacks.db")
+
+# Clave de agrupacion y condicion de cada resumen, con las mismas reglas que su vista
+RESUMENES = {
+    'resumen_estacion': {
+        'clave': "season",
+        'condicion': "{f}.season IS NOT NULL AND {f}.season != 'Desconocido'",
+        'valor': "{f}.season"
+    },
+    'resumen_fase_lunar': {
+        'clave': "fase_lunar",
+        'condicion': "1",
+        'valor': ("CASE WHEN {f}.moon_phase IS NULL OR {f}.moon_phase = '' OR {f}.moon_phase = 'Desconocido' "
+                  "THEN 'Desconocido' ELSE {f}.moon_phase END")
+    },
+    'resumen_actividad_fatal': {
+        'clave': "activity",
+        'condicion': ("{f}.is_fatal = 'Y' AND {f}.activity IS NOT NULL "
+                      "AND {f}.activity != 'Desconocido' AND {f}.activity != ''"),
+        'valor': "{f}.activity"
+    },
+    'resumen_fatales_anio': {
+        'clave': "year",
+        'condicion': "{f}.is_fatal = 'Y' AND {f}.year IS NOT NULL",
+        'valor': "{f}.year"
+    },
+    'resumen_especie': {
+        'clave': "species",
+        'condicion': "{f}.species IS NOT NULL AND {f}.species != 'Desconocido' AND {f}.species != ''",
+        'valor': "{f}.species"
+    }
+}
+
+
+def sentencias_creacion() -> List[str]:
+    """Sentencias que crean las tablas de resumen, la tabla de control y los triggers."""
+    sentencias = [
+        "CREATE TABLE IF NOT EXISTS control_datos ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), "
+        "version_datos INTEGER NOT NULL, "
+        "version_resumenes INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO control_datos (id, version_datos, version_resumenes) VALUES (1, 0, 0)"
+    ]
+    for tabla, r in RESUMENES.items():
+        sentencias.append(
+            f"CREATE TABLE IF NOT EXISTS {tabla} (clave PRIMARY KEY, cantidad INTEGER NOT NULL) WITHOUT ROWID"
+        )
+
+    # Contador de version: se dispara siempre, aunque se eliminen los triggers de resumen
+    for evento in ("INSERT", "UPDATE", "DELETE"):
+        sentencias.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_version_{evento.lower()} AFTER {evento} ON shark_attackdatos "
+            f"BEGIN UPDATE control_datos SET version_datos = version_datos + 1 WHERE id = 1; END"
+        )
+
+    sentencias.extend(sentencias_triggers_resumen())
+    return sentencias
+
+
+def sentencias_triggers_resumen() -> List[str]:
+    """Triggers que aplican el delta de cada fila insertada, borrada o actualizada a los resúmenes."""
+    def sumar(fila: str, signo: str) -> str:
+        pasos = []
+        for tabla, r in RESUMENES.items():
+            valor = r['valor'].format(f=fila)
+            condicion = r['condicion'].format(f=fila)
+            if signo == "+":
+                pasos.append(
+                    f"INSERT INTO {tabla} (clave, cantidad) SELECT {valor}, 1 WHERE {condicion} "
+                    f"ON CONFLICT(clave) DO UPDATE SET cantidad = cantidad + 1;"
+                )
+            else:
+                pasos.append(
+                    f"UPDATE {tabla} SET cantidad = cantidad - 1 WHERE {condicion} AND clave = {valor};"
+                )
+        return " ".join(pasos)
+
+    marca = "UPDATE control_datos SET version_resumenes = version_resumenes + 1 WHERE id = 1;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_resumen_insert AFTER INSERT ON shark_attackdatos "
+        f"BEGIN {sumar('NEW', '+')} {marca} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_resumen_delete AFTER DELETE ON shark_attackdatos "
+        f"BEGIN {sumar('OLD', '-')} {marca} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_resumen_update AFTER UPDATE ON shark_attackdatos "
+        f"BEGIN {sumar('OLD', '-')} {sumar('NEW', '+')} {marca} END"
+    ]
+
+
+def sentencias_eliminar_triggers_resumen() -> List[str]:
+    """Elimina los triggers de resumen (p. ej. antes de una carga masiva); el contador de versión sigue activo."""
+    return [f"DROP TRIGGER IF EXISTS trg_resumen_{evento}" for evento in ("insert", "delete", "update")]
+
+
+def sentencias_refresco() -> List[str]:
+    """Reconstruye todos los resúmenes desde shark_attackdatos y los marca como vigentes."""
+    sentencias = []
+    for tabla, r in RESUMENES.items():
+        sentencias.append(f"DELETE FROM {tabla}")
+        sentencias.append(
+            f"INSERT INTO {tabla} (clave, cantidad) "
+            f"SELECT {r['valor'].format(f='a')}, COUNT(*) FROM shark_attackdatos a "
+            f"WHERE {r['condicion'].format(f='a')} GROUP BY 1"
+        )
+    sentencias.append("UPDATE control_datos SET version_resumenes = version_datos WHERE id = 1")
+    return sentencias
+
+
+def resumenes_vigentes(conn: sqlite3.Connection) -> bool:
+    """
+    Verifica que las tablas de resumen existan y correspondan a la versión actual de los datos.
+
+    Returns:
+        bool: True si los resúmenes se pueden leer en lugar de las vistas
+    """
+    try:
+        fila = conn.execute("SELECT version_datos, version_resumenes FROM control_datos WHERE id = 1").fetchone()
+    except sqlite3.Error:
+        return False
+    return fila is not None and fila[0] == fila[1]
+
+
+def refrescar_resumenes(ruta: str = RUTA_BD, reinstalar_triggers: bool = True):
+    """
+    Reconstruye todos los resúmenes en una sola transacción y, opcionalmente, vuelve a
+    instalar los triggers de resumen.
+
+    Args:
+        ruta (str): Ruta del archivo de base de datos
+        reinstalar_triggers (bool): Si True, crea los triggers de resumen si no existen
+    """
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if reinstalar_triggers:
+            for sentencia in sentencias_triggers_resumen():
+                conn.execute(sentencia)
+        for sentencia in sentencias_refresco():
+            conn.execute(sentencia)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    refrescar_resumenes(sys.argv[1] if len(sys.argv) > 1 else RUTA_BD)
+    print("resumenes reconstruidos")
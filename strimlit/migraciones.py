@@ -0,0 +1,287 @@
+"""
+Migraciones versionadas del esquema de shark_attacks.db.
+
+La versión del esquema se guarda en PRAGMA user_version. Cada migración tiene una lista de
+sentencias para aplicar y otra para revertir, y se ejecuta dentro de una transacción.
+
+La aplicación aplica las migraciones pendientes una vez por proceso al arrancar (app.py y las
+páginas que consultan la base de datos llaman a utils.preparar_bd), por lo que el archivo de
+la base de datos del repositorio puede quedarse en cualquier versión anterior. Importar utils
+no lo modifica; fuera de la aplicación se migra con este script.
+
+Uso:
+    python migraciones.py [ruta_bd]            aplica las migraciones pendientes
+    python migraciones.py [ruta_bd] --planes   muestra EXPLAIN QUERY PLAN de las vistas
+"""
+import os
+import sqlite3
+import sys
+from typing import Dict, List
+
+import materializacion
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+RUTA_BD = os.path.join(current_dir, "bbdd", "shark_attacks.db")
+
+VISTA_DECADAS = """
+CREATE VIEW vista_ataques_fatales_por_decada AS
+SELECT 
+    ((year / 10) * 10) || '-' || ((year / 10) * 10 + 9) as decada,
+    COUNT(*) as ataques_fatales
+FROM shark_attackdatos 
+WHERE is_fatal = 'Y' 
+    AND year IS NOT NULL
+GROUP BY (year / 10)
+ORDER BY MIN(year)
+"""
+
+VISTA_DECADAS_CASE = """
+CREATE VIEW vista_ataques_fatales_por_decada AS
+SELECT 
+    CASE 
+        WHEN year BETWEEN 1900 AND 1909 THEN '1900-1909'
+        WHEN year BETWEEN 1910 AND 1919 THEN '1910-1919'
+        WHEN year BETWEEN 1920 AND 1929 THEN '1920-1929'
+        WHEN year BETWEEN 1930 AND 1939 THEN '1930-1939'
+        WHEN year BETWEEN 1940 AND 1949 THEN '1940-1949'
+        WHEN year BETWEEN 1950 AND 1959 THEN '1950-1959'
+        WHEN year BETWEEN 1960 AND 1969 THEN '1960-1969'
+        WHEN year BETWEEN 1970 AND 1979 THEN '1970-1979'
+        WHEN year BETWEEN 1980 AND 1989 THEN '1980-1989'
+        WHEN year BETWEEN 1990 AND 1999 THEN '1990-1999'
+        WHEN year BETWEEN 2000 AND 2009 THEN '2000-2009'
+        WHEN year BETWEEN 2010 AND 2019 THEN '2010-2019'
+        WHEN year BETWEEN 2020 AND 2025 THEN '2020-2025'
+        ELSE 'Otra'
+    END as decada,
+    COUNT(*) as ataques_fatales
+FROM shark_attackdatos 
+WHERE is_fatal = 'Y' 
+    AND year IS NOT NULL
+GROUP BY decada
+ORDER BY MIN(year)
+"""
+
+MIGRACIONES = [
+    {
+        'version': 1,
+        'descripcion': "indices sobre shark_attackdatos para las vistas y el join de especies",
+        'aplicar': [
+            # Cubren por completo las vistas por estacion y por fase lunar (GROUP BY sobre el indice)
+            "CREATE INDEX IF NOT EXISTS idx_ataques_season ON shark_attackdatos(season)",
+            "CREATE INDEX IF NOT EXISTS idx_ataques_moon_phase ON shark_attackdatos(moon_phase)",
+            # Cubre la vista de top 5 actividades fatales (WHERE is_fatal + GROUP BY activity)
+            "CREATE INDEX IF NOT EXISTS idx_ataques_fatal_activity ON shark_attackdatos(is_fatal, activity)",
+            # Cubre la vista de ataques fatales por decada (WHERE is_fatal + year)
+            "CREATE INDEX IF NOT EXISTS idx_ataques_fatal_year ON shark_attackdatos(is_fatal, year)",
+            "CREATE INDEX IF NOT EXISTS idx_ataques_year ON shark_attackdatos(year)",
+            # Join con SHARKS y conservation_status
+            "CREATE INDEX IF NOT EXISTS idx_ataques_species ON shark_attackdatos(species)",
+            "CREATE INDEX IF NOT EXISTS idx_conservacion_id_long ON conservation_status(id_long)",
+            "ANALYZE"
+        ],
+        'revertir': [
+            "DROP INDEX IF EXISTS idx_ataques_season",
+            "DROP INDEX IF EXISTS idx_ataques_moon_phase",
+            "DROP INDEX IF EXISTS idx_ataques_fatal_activity",
+            "DROP INDEX IF EXISTS idx_ataques_fatal_year",
+            "DROP INDEX IF EXISTS idx_ataques_year",
+            "DROP INDEX IF EXISTS idx_ataques_species",
+            "DROP INDEX IF EXISTS idx_conservacion_id_long"
+        ]
+    },
+    {
+        'version': 2,
+        'descripcion': "tablas de resumen materializadas, contador de version y triggers incrementales",
+        'aplicar': materializacion.sentencias_creacion() + materializacion.sentencias_refresco(),
+        'revertir': (
+            materializacion.sentencias_eliminar_triggers_resumen()
+            + [f"DROP TRIGGER IF EXISTS trg_version_{evento}" for evento in ("insert", "update", "delete")]
+            + [f"DROP TABLE IF EXISTS {tabla}" for tabla in materializacion.RESUMENES]
+            + ["DROP TABLE IF EXISTS control_datos"]
+        )
+    },
+    {
+        'version': 3,
+        'descripcion': "vista de decadas con aritmetica entera en lugar del CASE de 13 ramas",
+        'aplicar': [
+            "DROP VIEW IF EXISTS vista_ataques_fatales_por_decada",
+            VISTA_DECADAS
+        ],
+        'revertir': [
+            "DROP VIEW IF EXISTS vista_ataques_fatales_por_decada",
+            VISTA_DECADAS_CASE
+        ]
+    },
+    {
+        'version': 4,
+        'descripcion': "indice sobre case_number para la deduplicacion de la carga masiva (ingesta.py)",
+        'aplicar': [
+            # No es UNIQUE: la tabla ya tiene case_number repetidos
+            "CREATE INDEX IF NOT EXISTS idx_ataques_case_number ON shark_attackdatos(case_number)"
+        ],
+        'revertir': [
+            "DROP INDEX IF EXISTS idx_ataques_case_number"
+        ]
+    },
+    {
+        'version': 5,
+        'descripcion': "registro de filas actualizadas o borradas para la carga incremental (incremental.py)",
+        'aplicar': [
+            "CREATE TABLE IF NOT EXISTS registro_cambios ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "id_ataque INTEGER NOT NULL)",
+            # Las inserciones no se registran: se detectan por id mayor a la marca de agua
+            "CREATE TRIGGER IF NOT EXISTS trg_registro_update AFTER UPDATE ON shark_attackdatos "
+            "BEGIN INSERT INTO registro_cambios (id_ataque) VALUES (OLD.id); "
+            "INSERT INTO registro_cambios (id_ataque) SELECT NEW.id WHERE NEW.id != OLD.id; END",
+            "CREATE TRIGGER IF NOT EXISTS trg_registro_delete AFTER DELETE ON shark_attackdatos "
+            "BEGIN INSERT INTO registro_cambios (id_ataque) VALUES (OLD.id); END"
+        ],
+        'revertir': [
+            "DROP TRIGGER IF EXISTS trg_registro_update",
+            "DROP TRIGGER IF EXISTS trg_registro_delete",
+            "DROP TABLE IF EXISTS registro_cambios"
+        ]
+    }
+]
+
+VISTAS = [
+    "vista_ataques_por_estacion",
+    "vista_top5_actividades_fatales",
+    "vista_ataques_por_fase_lunar",
+    "vista_especies_conservacion",
+    "vista_ataques_fatales_por_decada"
+]
+
+
+def version_actual(conn: sqlite3.Connection) -> int:
+    """Devuelve la versión de esquema registrada en PRAGMA user_version."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _ejecutar(conn: sqlite3.Connection, sentencias: List[str], version: int, anterior: int) -> bool:
+    """
+    Ejecuta una lista de sentencias y fija la nueva versión en una sola transacción. La
+    transacción toma el lock de escritura al empezar y vuelve a leer la versión, de modo que
+    si otro proceso ya aplicó el paso no se repite.
+
+    Returns:
+        bool: True si se ejecutó, False si la versión ya no era `anterior`
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if version_actual(conn) != anterior:
+            conn.execute("ROLLBACK")
+            return False
+        for sentencia in sentencias:
+            conn.execute(sentencia)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.execute("COMMIT")
+        return True
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def aplicar_migraciones(ruta: str = RUTA_BD, hasta: int = None) -> int:
+    """
+    Aplica en orden las migraciones con versión mayor a la actual (y menor o igual a `hasta`).
+
+    Args:
+        ruta (str): Ruta del archivo de base de datos
+        hasta (int): Versión objetivo; por defecto la última migración disponible
+
+    Returns:
+        int: Versión de esquema final
+    """
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        actual = version_actual(conn)
+        for migracion in MIGRACIONES:
+            if migracion['version'] <= actual or (hasta is not None and migracion['version'] > hasta):
+                continue
+            if not _ejecutar(conn, migracion['aplicar'], migracion['version'], actual):
+                actual = version_actual(conn)
+                continue
+            actual = migracion['version']
+        return actual
+    finally:
+        conn.close()
+
+
+def revertir_migraciones(ruta: str = RUTA_BD, hasta: int = 0) -> int:
+    """
+    Revierte en orden inverso las migraciones con versión mayor a `hasta`.
+
+    Args:
+        ruta (str): Ruta del archivo de base de datos
+        hasta (int): Versión a la que se quiere volver
+
+    Returns:
+        int: Versión de esquema final
+    """
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        actual = version_actual(conn)
+        for migracion in reversed(MIGRACIONES):
+            if migracion['version'] > actual or migracion['version'] <= hasta:
+                continue
+            if not _ejecutar(conn, migracion['revertir'], migracion['version'] - 1, migracion['version']):
+                actual = version_actual(conn)
+                continue
+            actual = migracion['version'] - 1
+        return actual
+    finally:
+        conn.close()
+
+
+def plan_consulta(conn: sqlite3.Connection, consulta: str) -> List[str]:
+    """Devuelve el detalle de EXPLAIN QUERY PLAN de una consulta, una línea por paso."""
+    return [fila[-1] for fila in conn.execute(f"EXPLAIN QUERY PLAN {consulta}")]
+
+
+def verificar_planes(conn: sqlite3.Connection) -> Dict[str, Dict]:
+    """
+    Revisa el plan de cada vista y del join de load_and_clean_data, indicando si usan índices
+    y qué pasos recorren una tabla completa sin índice.
+
+    Returns:
+        Dict[str, Dict]: Por consulta, las líneas del plan, el booleano 'usa_indices' y la
+        lista 'recorridos_completos'
+    """
+    consultas = {vista: f"SELECT * FROM {vista}" for vista in VISTAS}
+    consultas['join_especies'] = (
+        "SELECT a.species, s.conservation_status, cs.cat FROM shark_attackdatos a "
+        "LEFT JOIN SHARKS s ON a.species = s.id "
+        "LEFT JOIN conservation_status cs ON s.conservation_status = cs.id_long"
+    )
+
+    resultado = {}
+    for nombre, consulta in consultas.items():
+        plan = plan_consulta(conn, consulta)
+        resultado[nombre] = {
+            'plan': plan,
+            'usa_indices': any("INDEX" in paso for paso in plan),
+            'recorridos_completos': [
+                paso for paso in plan
+                if paso.startswith("SCAN") and "INDEX" not in paso and "vista_" not in paso
+            ]
+        }
+    return resultado
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    ruta = argumentos[0] if argumentos else RUTA_BD
+
+    version = aplicar_migraciones(ruta)
+    print(f"esquema en version {version}")
+
+    if "--planes" in sys.argv:
+        conn = sqlite3.connect(ruta)
+        for nombre, info in verificar_planes(conn).items():
+            print(f"\n{nombre} (usa indices: {info['usa_indices']}, recorridos completos: {len(info['recorridos_completos'])})")
+            for paso in info['plan']:
+                print(f"    {paso}")
+        conn.close()
@@ -0,0 +1,156 @@
+"""
+Estadísticos descriptivos por grupo en una sola pasada vectorizada.
+
+Para cada grupo se acumulan con np.bincount el conteo y las sumas de potencias 1 a 4 de los
+valores desplazados por la media global (el desplazamiento evita la cancelación numérica), y
+de ellas se obtienen los momentos centrales 2, 3 y 4. Media, desviación (ddof=1), asimetría
+y curtosis (de Fisher, sesgadas, como scipy.stats.skew y scipy.stats.kurtosis) se derivan de
+esos momentos.
+
+Mediana y moda salen de un histograma por grupo sobre los valores enteros del rango (por
+ejemplo, edades 0-100); si hay valores no enteros o fuera de rango se usa un ordenamiento por
+grupo.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ESTADISTICOS = ['Media', 'Mediana', 'Moda', 'Desviacion', 'Asimetria', 'Curtosis']
+
+
+def momentos_agrupados(valores: np.ndarray, grupos: np.ndarray, n_grupos: int) -> dict:
+    """
+    Conteo, media y sumas de momentos centrales 2, 3 y 4 por grupo.
+
+    Args:
+        valores (np.ndarray): Valores sin nulos (float64)
+        grupos (np.ndarray): Código de grupo de cada valor, entre 0 y n_grupos - 1
+        n_grupos (int): Número de grupos
+
+    Returns:
+        dict: Arreglos de longitud n_grupos 'n', 'media', 'm2', 'm3' y 'm4' (sumas, no promedios)
+    """
+    desplazamiento = valores.mean() if len(valores) else 0.0
+    d = valores - desplazamiento
+    d2 = d * d
+
+    n = np.bincount(grupos, minlength=n_grupos).astype(np.float64)
+    s1 = np.bincount(grupos, weights=d, minlength=n_grupos)
+    s2 = np.bincount(grupos, weights=d2, minlength=n_grupos)
+    s3 = np.bincount(grupos, weights=d2 * d, minlength=n_grupos)
+    s4 = np.bincount(grupos, weights=d2 * d2, minlength=n_grupos)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mu = s1 / n
+    # Sumas de potencias -> sumas de momentos centrales
+    m2 = s2 - n * mu ** 2
+    m3 = s3 - 3 * mu * s2 + 2 * n * mu ** 3
+    m4 = s4 - 4 * mu * s3 + 6 * mu ** 2 * s2 - 3 * n * mu ** 4
+    return {'n': n, 'media': mu + desplazamiento, 'm2': m2, 'm3': m3, 'm4': m4}
+
+
+def _derivar(momentos: dict) -> dict:
+    """Media, desviación, asimetría y curtosis a partir de los momentos por grupo."""
+    n, m2, m3, m4 = momentos['n'], momentos['m2'], momentos['m3'], momentos['m4']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        varianza_poblacional = m2 / n
+        desviacion = np.sqrt(m2 / (n - 1))
+        asimetria = (m3 / n) / varianza_poblacional ** 1.5
+        curtosis = (m4 / n) / varianza_poblacional ** 2 - 3.0
+
+    media = np.where(n > 0, momentos['media'], np.nan)
+    desviacion = np.where(n > 1, desviacion, np.nan)
+    asimetria = np.where(n > 2, asimetria, np.nan)
+    curtosis = np.where(n > 3, curtosis, np.nan)
+    return {'Media': media, 'Desviacion': desviacion, 'Asimetria': asimetria, 'Curtosis': curtosis}
+
+
+def _mediana_moda_histograma(enteros: np.ndarray, grupos: np.ndarray, n_grupos: int,
+                             minimo: int, maximo: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mediana y moda por grupo desde un histograma (n_grupos x valores del rango)."""
+    ancho = maximo - minimo + 1
+    histograma = np.bincount(grupos * ancho + (enteros - minimo), minlength=n_grupos * ancho)
+    histograma = histograma.reshape(n_grupos, ancho)
+
+    n = histograma.sum(axis=1)
+    acumulado = histograma.cumsum(axis=1)
+    # Posiciones (base 0) de los dos valores centrales de cada grupo
+    bajo = (acumulado <= ((n - 1) // 2)[:, None]).sum(axis=1)
+    alto = (acumulado <= (n // 2)[:, None]).sum(axis=1)
+
+    mediana = np.where(n > 0, (bajo + alto) / 2 + minimo, np.nan)
+    # argmax devuelve el primer maximo: el valor mas pequeño entre los empatados, como Series.mode
+    moda = np.where(n > 0, histograma.argmax(axis=1) + minimo, np.nan).astype(np.float64)
+    return mediana, moda
+
+
+def _mediana_moda_ordenada(valores: np.ndarray, grupos: np.ndarray, n_grupos: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mediana y moda por grupo ordenando los valores (para valores no enteros)."""
+    orden = np.lexsort((valores, grupos))
+    valores, grupos = valores[orden], grupos[orden]
+    limites = np.searchsorted(grupos, np.arange(n_grupos + 1))
+
+    mediana = np.full(n_grupos, np.nan)
+    moda = np.full(n_grupos, np.nan)
+    for g in range(n_grupos):
+        tramo = valores[limites[g]:limites[g + 1]]
+        if len(tramo):
+            mediana[g] = np.median(tramo)
+            unicos, conteos = np.unique(tramo, return_counts=True)
+            moda[g] = unicos[conteos.argmax()]
+    return mediana, moda
+
+
+def estadisticas_agrupadas(valores: pd.Series, grupos: Optional[pd.Series] = None, rango: Tuple[int, int] = (0, 100),
+                           total: Optional[str] = 'Total') -> pd.DataFrame:
+    """
+    Media, mediana, moda, desviación, asimetría y curtosis de una variable numérica para cada
+    categoría de una variable de agrupación, en una sola pasada.
+
+    Args:
+        valores (pd.Series): Variable numérica (por ejemplo, la edad); los nulos se ignoran
+        grupos (Optional[pd.Series]): Variable de agrupación alineada con `valores` (sexo,
+            estación, país, fatalidad, ...). Las filas con grupo nulo se ignoran
+        rango (Tuple[int, int]): Rango de enteros del histograma para mediana y moda
+        total (Optional[str]): Nombre de la columna con todos los casos; None para omitirla
+
+    Returns:
+        pd.DataFrame: Una fila por estadístico (ESTADISTICOS) y una columna por categoría
+        (en el orden de las categorías), más la columna total si se pidió
+    """
+    x = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    if grupos is None:
+        codigos, etiquetas = np.full(len(x), -1, dtype=np.int64), []
+    else:
+        serie = grupos if isinstance(grupos.dtype, pd.CategoricalDtype) else grupos.astype('category')
+        codigos = serie.cat.codes.to_numpy().astype(np.int64)
+        etiquetas = list(serie.cat.categories)
+
+    validos = ~np.isnan(x) & (codigos >= 0)
+    x, codigos = x[validos], codigos[validos]
+    n_grupos = len(etiquetas)
+
+    # El total se calcula como un grupo adicional con todos los valores validos
+    columnas = list(etiquetas)
+    if total is not None:
+        columnas.append(total)
+        todos = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+        todos = todos[~np.isnan(todos)]
+        x = np.concatenate([x, todos])
+        codigos = np.concatenate([codigos, np.full(len(todos), n_grupos, dtype=np.int64)])
+        n_grupos += 1
+
+    resultado = _derivar(momentos_agrupados(x, codigos, n_grupos))
+
+    minimo, maximo = rango
+    enteros = np.rint(x)
+    if len(x) and (enteros == x).all() and enteros.min() >= minimo and enteros.max() <= maximo:
+        mediana, moda = _mediana_moda_histograma(enteros.astype(np.int64), codigos, n_grupos, minimo, maximo)
+    else:
+        mediana, moda = _mediana_moda_ordenada(x, codigos, n_grupos)
+    resultado['Mediana'] = mediana
+    resultado['Moda'] = moda
+
+    return pd.DataFrame({e: resultado[e] for e in ESTADISTICOS}, index=columnas).T
@@ -0,0 +1,187 @@
+import numpy as np
+import streamlit as st
+import plotly.graph_objects as go
+import stilez
+import utils
+import utilsg
+
+st.set_page_config(
+    page_title="Mapa de Incidentes - Ataques de Tiburón",
+    page_icon="🦈",
+    layout="wide"
+)
+
+utils.preparar_bd()
+
+stilez.aplicar_estilos_globales()
+
+# titulo principal
+st.title("Mapa de Incidentes")
+st.markdown("---")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+Ubicación de los ataques registrados según la columna geo_point. Los incidentes cercanos se agrupan en
+clusters precalculados para cada nivel de detalle: el mapa recibe solo los clusters de la región visible
+y no un marcador por ataque. El tamaño de cada cluster indica el número de ataques y el color su tasa
+de fatalidad.
+
+</div>
+""", unsafe_allow_html=True)
+
+# Seleccion del explorador de filtros de la barra lateral (None si no hay filtros activos)
+mascara = utils.explorador_filtros()
+
+# Regiones predefinidas: (latitud minima, latitud maxima, longitud minima, longitud maxima)
+REGIONES = {
+    "Mundo": None,
+    "Norteamérica": (10.0, 60.0, -130.0, -55.0),
+    "Australia y Oceanía": (-50.0, 0.0, 110.0, 180.0),
+    "Sudáfrica": (-40.0, -20.0, 10.0, 40.0),
+    "Personalizada": "personalizada"
+}
+
+# Por debajo de este numero de ataques en la region se muestran los puntos individuales
+MAXIMO_PUNTOS = 500
+
+indice = utils.obtener_indice_geografico()
+df = utils.load_and_clean_data()
+
+
+def parametros_hotspots():
+    """Controles de los hotspots: radio, mínimo de ataques, especies y fatalidad."""
+    radio_km = st.number_input("Radio (km)", min_value=1.0, max_value=500.0, value=10.0, step=1.0, key="hotspot_radio")
+    minimo = st.number_input("Mínimo de ataques", min_value=2, max_value=500, value=5, step=1, key="hotspot_minimo")
+    especies = st.multiselect("Especies", list(df['species'].cat.categories), key="hotspot_especies")
+    fatalidad = st.selectbox("Fatalidad", ["Todos", "Fatal", "No Fatal"], key="hotspot_fatalidad")
+    return radio_km, minimo, especies, None if fatalidad == "Todos" else fatalidad
+
+
+if indice.n_puntos == 0:
+    st.info("La base de datos actual no tiene coordenadas en geo_point; el mapa se mostrará cuando se "
+            "ingieran registros con coordenadas. Mientras tanto se muestra la distribución por ubicación.")
+
+    col1, col2, col3 = st.columns(3)
+    for col, columna, titulo in ((col1, 'country', "País"), (col2, 'province', "Provincia"), (col3, 'coast', "Costa")):
+        with col:
+            st.subheader(titulo)
+            tabla = utils.analizar_frecuencias(df, columna, excluir_desconocido=True, mascara=mascara)
+            if not tabla.empty:
+                st.dataframe(tabla[['Categoria', 'Frecuencia Absoluta']], use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+    st.header("Comunas con Más Ataques")
+    st.caption("Sin coordenadas no se pueden calcular hotspots por distancia; se listan las comunas con más ataques.")
+
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        _, _, especies, fatalidad = parametros_hotspots()
+    seleccion = df
+    if especies:
+        seleccion = seleccion[seleccion['species'].isin(especies)]
+    if fatalidad:
+        seleccion = seleccion[seleccion['is_fatal_cat'].eq(fatalidad)]
+    tabla_comunas = utils.analizar_frecuencias(seleccion, 'commune_nom', excluir_desconocido=True)
+    with col1:
+        if not tabla_comunas.empty:
+            st.dataframe(tabla_comunas.sort_values('Frecuencia Absoluta', ascending=False).head(20),
+                         use_container_width=True, hide_index=True)
+else:
+    col1, col2 = st.columns([3, 1])
+
+    with col2:
+        region = st.selectbox("Región", list(REGIONES), key="mapa_region")
+        ventana = REGIONES[region]
+        if ventana == "personalizada":
+            latitudes = st.slider("Latitud", -90.0, 90.0, (-60.0, 60.0), key="mapa_latitud")
+            longitudes = st.slider("Longitud", -180.0, 180.0, (-180.0, 180.0), key="mapa_longitud")
+            ventana = (*latitudes, *longitudes)
+
+        automatico = indice.nivel_para(ventana)
+        nivel = st.select_slider("Nivel de detalle", options=list(range(indice.nivel_maximo + 1)),
+                                 value=automatico, key=f"mapa_nivel_{region}")
+        
+        mostrar_hotspots = st.checkbox("Capa de hotspots", key="mapa_hotspots")
+        with st.expander("Parámetros de hotspots"):
+            radio_km, minimo, especies, fatalidad = parametros_hotspots()
+
+    tabla_hotspots = utils.obtener_hotspots(radio_km, minimo, especies, fatalidad)
+
+    clusters = indice.clusters(nivel, ventana, mascara)
+    total = int(clusters['casos'].sum())
+
+    fig = go.Figure()
+    if 0 < total <= MAXIMO_PUNTOS:
+        puntos = indice.puntos(ventana, mascara)
+        fig.add_trace(go.Scattergeo(
+            lat=puntos['latitud'],
+            lon=puntos['longitud'],
+            mode='markers',
+            marker=dict(size=7, color=np.where(puntos['fatal'], utilsg.COLORES['fatal'], utilsg.COLORES['no_fatal'])),
+            hovertemplate='%{lat:.3f}, %{lon:.3f}<extra></extra>'
+        ))
+    elif total:
+        fig.add_trace(go.Scattergeo(
+            lat=clusters['latitud'],
+            lon=clusters['longitud'],
+            mode='markers',
+            marker=dict(
+                size=np.sqrt(clusters['casos']) / np.sqrt(clusters['casos'].max()) * 40 + 5,
+                color=clusters['tasa_fatalidad'],
+                colorscale=utilsg.PALETA_SECUENCIAL,
+                cmin=0, cmax=100,
+                colorbar=dict(title="Fatalidad %"),
+                line=dict(width=0.5, color='white')
+            ),
+            customdata=clusters[['casos', 'fatales', 'tasa_fatalidad']],
+            hovertemplate='<b>%{customdata[0]} ataques</b><br>%{customdata[1]} fatales '
+                          '(%{customdata[2]}%)<extra></extra>'
+        ))
+
+    if mostrar_hotspots and not tabla_hotspots.empty:
+        fig.add_trace(go.Scattergeo(
+            lat=tabla_hotspots['latitud'],
+            lon=tabla_hotspots['longitud'],
+            mode='markers+text',
+            text=tabla_hotspots['hotspot'].astype(str),
+            textposition='top center',
+            marker=dict(size=18, symbol='circle-open', color=utilsg.COLORES['acento'], line=dict(width=3)),
+            customdata=tabla_hotspots[['hotspot', 'casos', 'radio_km', 'comuna']],
+            hovertemplate='<b>Hotspot %{customdata[0]}</b><br>%{customdata[1]} ataques en %{customdata[2]} km'
+                          '<br>%{customdata[3]}<extra></extra>',
+            name="Hotspots"
+        ))
+
+    geo = dict(showland=True, landcolor=utilsg.COLORES['fondo'], showcountries=True, projection_type='natural earth')
+    if ventana is not None and ventana[2] <= ventana[3]:
+        geo.update(lataxis_range=[ventana[0], ventana[1]], lonaxis_range=[ventana[2], ventana[3]])
+    fig.update_layout(geo=geo, margin=dict(t=40, b=20, l=0, r=0), height=550,
+                      title=f"{total} ataques en {len(clusters)} clusters (nivel {nivel})")
+
+    with col1:
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.metric("Ataques en la región", total)
+        st.metric("Clusters enviados al mapa", len(clusters))
+        st.caption(f"{indice.n_puntos} de {indice.n_filas} ataques tienen coordenadas")
+
+    st.markdown("---")
+    st.header("Zonas de Concentración (Hotspots)")
+    st.markdown(f"""
+    <div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+    Un hotspot es un grupo de al menos {minimo} ataques a menos de {radio_km:g} km unos de otros (agrupamiento
+    por densidad sobre la superficie terrestre). Para cada hotspot se muestra su centro, su extensión, el número
+    de ataques, su tasa de fatalidad y la comuna, provincia y país más frecuentes.
+
+    </div>
+    """, unsafe_allow_html=True)
+    if tabla_hotspots.empty:
+        st.info("no se encontraron hotspots con estos parámetros")
+    else:
+        st.dataframe(tabla_hotspots, use_container_width=True, hide_index=True)
+
+st.markdown("---")
+st.caption("Análisis Descriptivo de Ataques de Tiburón | Mapa de Incidentes")
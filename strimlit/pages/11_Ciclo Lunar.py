@@ -0,0 +1,154 @@
+import numpy as np
+import streamlit as st
+import plotly.graph_objects as go
+import stilez
+import lunar
+import utils
+import utilsg
+
+st.set_page_config(
+    page_title="Ciclo Lunar - Ataques de Tiburón",
+    page_icon="🦈",
+    layout="wide"
+)
+
+utils.preparar_bd()
+
+stilez.aplicar_estilos_globales()
+
+# titulo principal
+st.title("Ciclo Lunar")
+st.markdown("---")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+Posición de cada ataque en el ciclo lunar (0° luna nueva, 180° luna llena). Cuando el registro trae el
+porcentaje iluminado (moon_phase_rate) la posición se obtiene de ese porcentaje y del sentido de la fase
+(moon_phase); para los demás ataques con fecha completa se calcula la edad de la luna en esa fecha. Sobre
+esos ángulos se calcula la dirección media, la concentración (R̄, de 0 a 1) y la prueba de Rayleigh, que
+indica si los ataques se concentran en alguna parte del ciclo, y se comparan los ataques fatales con los
+no fatales.
+
+</div>
+""", unsafe_allow_html=True)
+
+# Seleccion del explorador de filtros de la barra lateral (None si no hay filtros activos)
+mascara = utils.explorador_filtros()
+
+analisis = utils.analisis_lunar(mascara)
+resumen = analisis['resumen']
+origen = analisis['origen']
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Ataques analizados", int(resumen.loc['Todos', 'n']))
+with col2:
+    st.metric("Con moon_phase_rate", origen['registrada'])
+with col3:
+    st.metric("Fase calculada por fecha", origen['por_fecha'])
+
+if resumen.loc['Todos', 'n'] == 0:
+    st.warning("no hay ataques con fase lunar para esta selección")
+else:
+    st.markdown("---")
+    st.header("Distribución en el Ciclo")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fases = analisis['fases']
+        angulos = np.arange(len(lunar.FASES)) * 360 / len(lunar.FASES)
+        fig = go.Figure()
+        fig.add_trace(go.Barpolar(
+            name="No fatales",
+            r=fases['no_fatales'],
+            theta=angulos,
+            width=360 / len(lunar.FASES),
+            marker_color=utilsg.COLORES['no_fatal'],
+            customdata=fases.index.astype(str),
+            hovertemplate='<b>%{customdata}</b><br>%{r} ataques no fatales<extra></extra>'
+        ))
+        fig.add_trace(go.Barpolar(
+            name="Fatales",
+            r=fases['fatales'],
+            theta=angulos,
+            width=360 / len(lunar.FASES),
+            marker_color=utilsg.COLORES['fatal'],
+            customdata=fases.index.astype(str),
+            hovertemplate='<b>%{customdata}</b><br>%{r} ataques fatales<extra></extra>'
+        ))
+        fig.update_layout(
+            title="Ataques por Fase Lunar",
+            polar=dict(angularaxis=dict(direction='counterclockwise', rotation=90, tickmode='array',
+                                        tickvals=angulos, ticktext=list(lunar.FASES))),
+            margin=dict(t=80, b=40),
+            height=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        iluminacion = analisis['iluminacion']
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            name="No fatales",
+            x=iluminacion.index,
+            y=iluminacion['no_fatales'],
+            marker_color=utilsg.COLORES['no_fatal'],
+            hovertemplate='<b>%{x}</b><br>%{y} ataques no fatales<extra></extra>'
+        ))
+        fig.add_trace(go.Bar(
+            name="Fatales",
+            x=iluminacion.index,
+            y=iluminacion['fatales'],
+            marker_color=utilsg.COLORES['fatal'],
+            hovertemplate='<b>%{x}</b><br>%{y} ataques fatales<extra></extra>'
+        ))
+        fig.update_layout(
+            title="Ataques por Porcentaje Iluminado",
+            xaxis_title="Iluminación de la luna",
+            yaxis_title="Número de Ataques",
+            barmode='stack',
+            margin=dict(t=80, b=80),
+            height=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("---")
+    st.header("Estadística Circular")
+
+    tabla = resumen.reset_index().rename(columns={
+        'grupo': 'Grupo', 'n': 'Ataques', 'direccion_media': 'Dirección media (°)', 'dia_ciclo': 'Día del ciclo',
+        'fase_media': 'Fase media', 'longitud_media': 'R̄', 'desviacion_circular': 'Desviación circular (°)',
+        'z_rayleigh': 'Z de Rayleigh', 'p_rayleigh': 'p valor', 'significativo': 'Significativo (5%)'
+    })
+    st.dataframe(tabla.round(4), use_container_width=True, hide_index=True)
+
+    comparacion = analisis['comparacion']
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("W de Mardia-Watson-Wheeler (fatales vs no fatales)",
+                  "-" if np.isnan(comparacion['w']) else f"{comparacion['w']:.3f}")
+    with col2:
+        st.metric("p valor", "-" if np.isnan(comparacion['p_valor']) else f"{comparacion['p_valor']:.4f}")
+
+    concentrados = resumen.index[resumen['significativo']].tolist()
+    if concentrados:
+        st.markdown(f"""
+        - La prueba de Rayleigh rechaza la distribución uniforme en el ciclo para: {', '.join(concentrados)}
+          (p < {lunar.NIVEL_SIGNIFICANCIA}).""")
+    else:
+        st.markdown(f"""
+        - Ningún grupo muestra concentración significativa en alguna parte del ciclo lunar
+          (prueba de Rayleigh, p ≥ {lunar.NIVEL_SIGNIFICANCIA}).""")
+    if not np.isnan(comparacion['p_valor']):
+        diferencia = "difieren" if comparacion['p_valor'] < lunar.NIVEL_SIGNIFICANCIA else "no difieren significativamente"
+        st.markdown(f"""
+        - Las distribuciones en el ciclo de los ataques fatales y no fatales {diferencia}
+          (Mardia-Watson-Wheeler, {comparacion['gl']} gl).""")
+
+    st.caption(f"Fases calculadas con el mes sinódico medio de {lunar.CICLO_SINODICO} días; "
+               "la fase por fecha puede diferir en un día de las efemérides.")
+
+st.markdown("---")
+st.caption("Análisis Descriptivo de Ataques de Tiburón | Ciclo Lunar")
@@ -1,6 +1,5 @@
 import streamlit as st
 import utils
-import pandas as pd
 import stilez 
 
 st.set_page_config(
@@ -9,6 +8,8 @@ st.set_page_config(
     layout="wide"
 )
 
+utils.preparar_bd()
+
 stilez.aplicar_estilos_globales()
 
 # titulo principal
@@ -18,13 +19,24 @@ st.markdown("---")
 # Cargar datos 
 df, estadisticas = utils.cargar_datos_y_estadisticas()
 
-metricas = estadisticas['metricas_basicas']
+# Seleccion del explorador de filtros de la barra lateral (None si no hay filtros activos)
+mascara = utils.explorador_filtros()
+if mascara is not None:
+    st.info("Las tablas muestran solo los casos seleccionados en el explorador de filtros.")
+
+# Cubo de conteos de la version actual: las tablas de doble entrada se obtienen sin recorrer filas
+cubo = utils.obtener_cubo(mascara)
+
+if mascara is None:
+    metricas = estadisticas['metricas_basicas']
+else:
+    metricas = utils.calcular_metricas_basicas(utils.aplicar_mascara(df, mascara))
 
 st.header("Análisis de Fatalidad")
 
 st.subheader("Tabla de Fatalidad")
 
-tabla_fatalidad = utils.analizar_frecuencias(df, 'is_fatal_cat', excluir_desconocido=True)
+tabla_fatalidad = utils.frecuencias_actuales('is_fatal_cat', excluir_desconocido=True, mascara=mascara)
 
 if not tabla_fatalidad.empty:
     st.dataframe(tabla_fatalidad, use_container_width=True)
@@ -58,7 +70,7 @@ condicionar_fatalidad_act = st.checkbox("Condicionar por Fatalidad", key="activi
 
 if condicionar_fatalidad_act:
     # Mostrar tabla de doble entrada
-    tablas_actividad_fatalidad = utils.crear_tablas_doble_entrada(df, 'activity', 'is_fatal_cat')
+    tablas_actividad_fatalidad = utils.tablas_doble_entrada_actuales('activity', 'is_fatal_cat', mascara)
     
     if tablas_actividad_fatalidad:
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -75,7 +87,7 @@ if condicionar_fatalidad_act:
         with tab4:
             st.dataframe(tablas_actividad_fatalidad['condicional_columnas'], use_container_width=True)
 else:
-    tabla_actividades = utils.analizar_frecuencias(df, 'activity', excluir_desconocido=True)
+    tabla_actividades = utils.frecuencias_actuales('activity', excluir_desconocido=True, mascara=mascara)
     if not tabla_actividades.empty:
         st.dataframe(tabla_actividades, use_container_width=True)
 
@@ -107,7 +119,7 @@ condicionar_fatalidad_paises = st.checkbox("Condicionar por Fatalidad", key="pai
 
 if condicionar_fatalidad_paises:
     # Mostrar tabla de doble entrada
-    tablas_paises_fatalidad = utils.crear_tablas_doble_entrada(df, 'country', 'is_fatal_cat')
+    tablas_paises_fatalidad = utils.tablas_doble_entrada_actuales('country', 'is_fatal_cat', mascara)
     
     if tablas_paises_fatalidad:
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -124,7 +136,7 @@ if condicionar_fatalidad_paises:
         with tab4:
             st.dataframe(tablas_paises_fatalidad['condicional_columnas'], use_container_width=True)
 else:
-    tabla_paises = utils.analizar_frecuencias(df, 'country', excluir_desconocido=True)
+    tabla_paises = utils.frecuencias_actuales('country', excluir_desconocido=True, mascara=mascara)
     if not tabla_paises.empty:
         st.dataframe(tabla_paises, use_container_width=True)
 
@@ -154,14 +166,9 @@ st.subheader("Tabla de Edad de Víctimas")
 # Botón para condicionar por fatalidad
 condicionar_fatalidad_edad = st.checkbox("Condicionar por Fatalidad", key="edad")
 
-df_edad_grupos = df.copy()
-bins = [0, 18, 30, 45, 60, 100]
-labels = ['0-18', '19-30', '31-45', '46-60', '60+']
-df_edad_grupos['grupo_edad'] = pd.cut(df_edad_grupos['age'], bins=bins, labels=labels, right=False)
-
 if condicionar_fatalidad_edad:
     # Mostrar tabla de doble entrada
-    tablas_edad = utils.crear_tablas_doble_entrada(df_edad_grupos, 'grupo_edad', 'is_fatal_cat')
+    tablas_edad = cubo.tablas_doble_entrada('grupo_edad', 'is_fatal_cat')
     
     if tablas_edad:
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -179,14 +186,27 @@ if condicionar_fatalidad_edad:
             st.dataframe(tablas_edad['condicional_columnas'], use_container_width=True)
 else:
     # Mostrar tabla simple de grupos de edad
-    tabla_edad_simple = utils.analizar_frecuencias(df_edad_grupos, 'grupo_edad', excluir_desconocido=True)
+    tabla_edad_simple = cubo.frecuencias('grupo_edad', excluir_desconocido=True)
     if not tabla_edad_simple.empty:
         st.dataframe(tabla_edad_simple, use_container_width=True)
 
 st.subheader("Estadísticas Descriptivas de la Edad")
 
-if not estadisticas['estadisticas_edad'].empty:
-    st.dataframe(estadisticas['estadisticas_edad'], use_container_width=True)
+agrupar_edad = st.selectbox("Agrupar por", ["Fatalidad", "Sexo", "Estación", "País"], key="agrupar_edad")
+
+if agrupar_edad == "Fatalidad":
+    if mascara is None:
+        tabla_edad_fatalidad = estadisticas['estadisticas_edad']
+    else:
+        tabla_edad_fatalidad = utils.calcular_estadisticas_edad(utils.aplicar_mascara(df, mascara))
+    if not tabla_edad_fatalidad.empty:
+        st.dataframe(tabla_edad_fatalidad, use_container_width=True)
+else:
+    columna_grupo = {"Sexo": 'sex', "Estación": 'season', "País": 'country'}[agrupar_edad]
+    tabla_edad_grupo = utils.estadisticas_edad_por(df, columna_grupo, mascara=mascara)
+    if not tabla_edad_grupo.empty:
+        # Una fila por categoría: hay grupos (como país) con demasiadas categorías para columnas
+        st.dataframe(tabla_edad_grupo.T, use_container_width=True)
 
 st.markdown("""
 <div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
@@ -218,7 +238,7 @@ condicionar_fatalidad_estaciones = st.checkbox("Condicionar por Fatalidad", key=
 
 if condicionar_fatalidad_estaciones:
     # Mostrar tabla de doble entrada
-    tablas_estaciones_fatalidad = utils.crear_tablas_doble_entrada(df, 'season', 'is_fatal_cat')
+    tablas_estaciones_fatalidad = utils.tablas_doble_entrada_actuales('season', 'is_fatal_cat', mascara)
     
     if tablas_estaciones_fatalidad:
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -235,7 +255,7 @@ if condicionar_fatalidad_estaciones:
         with tab4:
             st.dataframe(tablas_estaciones_fatalidad['condicional_columnas'], use_container_width=True)
 else:
-    tabla_estaciones = utils.analizar_frecuencias(df, 'season', excluir_desconocido=True)
+    tabla_estaciones = utils.frecuencias_actuales('season', excluir_desconocido=True, mascara=mascara)
     if not tabla_estaciones.empty:
         st.dataframe(tabla_estaciones, use_container_width=True)
 
@@ -256,5 +276,56 @@ st.markdown("""
     </div>
     """, unsafe_allow_html=True)
 
+st.markdown("---")
+
+st.header("Intervalos de Confianza de la Tasa de Fatalidad")
+
+st.markdown("""
+    <div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+    
+    Las categorías con muy pocos casos pueden mostrar tasas de fatalidad extremas (por ejemplo, 3 de 4 ataques). Por eso cada tasa se acompaña de intervalos de confianza al 95% de Wilson, Clopper-Pearson (exacto) y bootstrap, y las categorías se ordenan por el límite inferior del intervalo de Wilson.
+    
+    </div>
+    """, unsafe_allow_html=True)
+
+variable_intervalos = st.selectbox("Variable", ["Actividad", "País", "Estación", "Grupo de edad"], key="variable_intervalos")
+columna_intervalos = {"Actividad": 'activity', "País": 'country', "Estación": 'season', "Grupo de edad": 'grupo_edad'}[variable_intervalos]
+
+if mascara is None:
+    intervalos_fatalidad = estadisticas['intervalos_fatalidad']
+else:
+    intervalos_fatalidad = utils.intervalos_seleccion(mascara)
+
+if columna_intervalos in intervalos_fatalidad:
+    st.dataframe(intervalos_fatalidad[columna_intervalos], use_container_width=True)
+
+st.markdown("---")
+
+st.header("Pruebas de Independencia")
+
+st.markdown("""
+    <div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+    
+    Para cada par de variables se contrasta la hipótesis de independencia con la prueba chi-cuadrado y se mide la intensidad de la asociación con la V de Cramér (0 sin asociación, 1 asociación perfecta). Cuando la tabla tiene celdas con muy pocos casos esperados se usa en su lugar la prueba exacta de Fisher.
+    
+    </div>
+    """, unsafe_allow_html=True)
+
+resultados_pruebas = utils.pruebas_independencia(mascara)
+resumen_pruebas = resultados_pruebas['resumen']
+
+if not resumen_pruebas.empty:
+    st.dataframe(
+        resumen_pruebas.round({'Chi-cuadrado': 2, 'V de Cramer': 3, 'Celdas esperado < 5 %': 1}),
+        use_container_width=True, hide_index=True
+    )
+    
+    par_residuos = st.selectbox("Residuos estandarizados de", list(resultados_pruebas['residuos']), key="par_residuos")
+    st.dataframe(resultados_pruebas['residuos'][par_residuos].round(2), use_container_width=True)
+    st.caption("Un residuo mayor que 1,96 en valor absoluto indica una celda significativamente por encima (positivo) "
+               "o por debajo (negativo) de lo esperado si las variables fueran independientes (nivel del 5%).")
+
+utils.mostrar_metricas_estadisticas()
+
 st.markdown("---")
 st.caption("Análisis Descriptivo de Ataques de Tiburón | Estadísticas Descriptivas")
\ No newline at end of file
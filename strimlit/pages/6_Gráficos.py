@@ -10,6 +10,8 @@ st.set_page_config(
     page_icon="🦈",
     layout="wide")
 
+utils.preparar_bd()
+
 stilez.aplicar_estilos_globales()
 
 # título principal
@@ -19,13 +21,24 @@ st.markdown("---")
 # Cargar datos
 df = utilsg.load_and_clean_data1()
 
+# Construir por adelantado las figuras que aún no están en caché para esta versión de datos
+utilsg.precalentar_figuras()
+
+# Seleccion del explorador de filtros de la barra lateral (None si no hay filtros activos)
+mascara = utils.explorador_filtros()
+if mascara is not None:
+    if not mascara.any():
+        st.warning("no hay ataques para esta selección")
+        st.stop()
+    st.info("Los gráficos muestran solo los casos seleccionados en el explorador de filtros.")
+
 # 1. FATALIDAD 
 st.header("1. Análisis de Fatalidad 💀")
 
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    st.plotly_chart(utilsg.grafico_fatalidad_interactivo(), use_container_width=True)
+    st.plotly_chart(utilsg.obtener_figura('fatalidad', mascara=mascara), use_container_width=True)
 
 with col2:
     st.markdown("""
@@ -46,7 +59,7 @@ with col2:
     cond_act = st.checkbox("Condicionar por Fatalidad", key="actividad")
 
 with col1:
-    fig_act = utilsg.grafico_actividad_interactivo(condicionar_fatalidad=cond_act)
+    fig_act = utilsg.obtener_figura('actividad', condicionar_fatalidad=cond_act, mascara=mascara)
     st.plotly_chart(fig_act, use_container_width=True)
 
 # Interpretación condicional
@@ -64,6 +77,25 @@ else:
     - Distribución refleja popularidad de actividades en zonas costeras
     """)
 
+with st.expander("Cobertura de la normalización de actividades"):
+    cobertura = utilsg.cobertura_actividades()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Filas clasificadas", f"{cobertura['cobertura_filas']:.1%}")
+    with col2:
+        st.metric("Valores únicos clasificados", f"{cobertura['cobertura_valores']:.1%}")
+    with col3:
+        st.metric("Tiempo de normalización", f"{cobertura['segundos'] * 1000:.0f} ms")
+    st.dataframe(cobertura['metodos'].rename(columns={'filas': 'Filas', 'valores_unicos': 'Valores únicos'}),
+                 use_container_width=True)
+    st.caption(f"{cobertura['valores_unicos']} valores distintos de activity; sobre las filas con actividad "
+               f"conocida. Con la memoria por valor llena, la recodificación tarda "
+               f"{cobertura['segundos_memoria'] * 1000:.1f} ms.")
+    if len(cobertura['sin_clasificar']):
+        st.markdown("**Actividades sin categoría más frecuentes** (quedan en 'Otras actividades')")
+        st.dataframe(cobertura['sin_clasificar'].head(15).rename_axis('Actividad').rename('Filas'),
+                     use_container_width=True)
+
 st.markdown("---")
 
 # 3. EDAD 
@@ -74,7 +106,7 @@ with col2:
     cond_edad = st.checkbox("Condicionar por Fatalidad", key="edad")
 
 with col1:
-    fig_edad = utilsg.grafico_edad_interactivo(condicionar_fatalidad=cond_edad)
+    fig_edad = utilsg.obtener_figura('edad', condicionar_fatalidad=cond_edad, mascara=mascara)
     st.plotly_chart(fig_edad, use_container_width=True)
 
 # Interpretación condicional
@@ -108,7 +140,7 @@ with col2:
     cond_grupo_edad = st.checkbox("Condicionar por Fatalidad", key="grupo_edad")
 
 with col1:
-    fig_grupo_edad = utilsg.grafico_grupo_edad_interactivo(condicionar_fatalidad=cond_grupo_edad)
+    fig_grupo_edad = utilsg.obtener_figura('grupo_edad', condicionar_fatalidad=cond_grupo_edad, mascara=mascara)
     st.plotly_chart(fig_grupo_edad, use_container_width=True)
 
 # Interpretación condicional
@@ -119,7 +151,7 @@ if cond_grupo_edad:
     - **0-18 años**: Tasa de fatalidad moderada 
     - **31-45 años**: Segunda en fatalidades absolutas 
     - Distribución proporcional a la frecuencia por grupo
-    - No hay grupo de edad con riesgo significativamente mayor
+    - La prueba de independencia (ver Estadísticas Descriptivas) indica qué grupos se apartan significativamente de la tasa esperada
     - Factores como condición física pueden influir en la supervivencia
     """)
 else:
@@ -144,7 +176,7 @@ with col2:
     cond_temp = st.checkbox("Condicionar por Fatalidad", key="temporada")
 
 with col1:
-    fig_temp = utilsg.grafico_temporada_interactivo(condicionar_fatalidad=cond_temp)
+    fig_temp = utilsg.obtener_figura('temporada', condicionar_fatalidad=cond_temp, mascara=mascara)
     st.plotly_chart(fig_temp, use_container_width=True)
 
 # Interpretación condicional
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 import stilez 
+import utils
 import utilsql 
 
 st.set_page_config(
@@ -10,6 +11,8 @@ st.set_page_config(
     layout="wide"
 )
 
+utils.preparar_bd()
+
 # Crear columnas 
 col1, col2 = st.columns([3, 1])
 
@@ -103,34 +106,19 @@ utilsql.mostrar_consulta(
 # consulta 5: ataques fatales por decada
 codigo5 = """
 SELECT 
-    CASE 
-        WHEN year BETWEEN 1900 AND 1909 THEN '1900-1909'
-        WHEN year BETWEEN 1910 AND 1919 THEN '1910-1919'
-        WHEN year BETWEEN 1920 AND 1929 THEN '1920-1929'
-        WHEN year BETWEEN 1930 AND 1939 THEN '1930-1939'
-        WHEN year BETWEEN 1940 AND 1949 THEN '1940-1949'
-        WHEN year BETWEEN 1950 AND 1959 THEN '1950-1959'
-        WHEN year BETWEEN 1960 AND 1969 THEN '1960-1969'
-        WHEN year BETWEEN 1970 AND 1979 THEN '1970-1979'
-        WHEN year BETWEEN 1980 AND 1989 THEN '1980-1989'
-        WHEN year BETWEEN 1990 AND 1999 THEN '1990-1999'
-        WHEN year BETWEEN 2000 AND 2009 THEN '2000-2009'
-        WHEN year BETWEEN 2010 AND 2019 THEN '2010-2019'
-        WHEN year BETWEEN 2020 AND 2025 THEN '2020-2025'
-        ELSE 'Otra'
-    END as decada,
+    ((year / 10) * 10) || '-' || ((year / 10) * 10 + 9) as decada,
     COUNT(*) as ataques_fatales
 FROM shark_attackdatos 
 WHERE is_fatal = 'Y' 
     AND year IS NOT NULL
-GROUP BY decada
+GROUP BY (year / 10)
 ORDER BY MIN(year);
 """
 
 utilsql.mostrar_consulta(
     utilsql.obtener_ataques_fatales_por_decada,
     "5. Ataques fatales por decada",
-    "Cuenta el número de ataques fatales por década, usando la columna year. Crea una nueva columna llamada década que agrupe los años desde 1900 hasta 2025.",
+    "Cuenta el número de ataques fatales por década, usando la columna year. La década se calcula con aritmética entera (year / 10) * 10, por lo que se incluyen todos los años registrados.",
     codigo5
 )
 
@@ -165,6 +153,7 @@ with col3:
         "En ataques"
     )
 
+utilsql.mostrar_metricas_pool()
 
 st.markdown("---")
 st.caption("Análisis Descriptivo de Ataques de Tiburón | Consultas SQL")
@@ -1,4 +1,5 @@
 import streamlit as st
+import utils
 import stilez 
 
 st.set_page_config(
@@ -7,6 +8,8 @@ st.set_page_config(
     layout="wide"
 )
 
+utils.preparar_bd()
+
 stilez.aplicar_estilos_globales()
 
 # titulo principal
@@ -123,6 +126,24 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+st.markdown("#### Significancia de la asociación con la fatalidad")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+    
+Las tablas de contingencia se contrastan con la prueba chi-cuadrado de independencia (o la prueba exacta de Fisher cuando hay celdas con pocos casos esperados). Un p valor menor a 0,05 indica que la proporción de ataques fatales difiere significativamente entre las categorías de la variable.
+
+</div>
+""", unsafe_allow_html=True)
+
+resumen_pruebas = utils.pruebas_independencia()['resumen']
+if not resumen_pruebas.empty:
+    pruebas_fatalidad = resumen_pruebas[resumen_pruebas['Variable 2'] == 'is_fatal_cat']
+    st.dataframe(
+        pruebas_fatalidad[['Variable 1', 'Prueba', 'p valor', 'V de Cramer', 'Significativo']].round({'V de Cramer': 3}),
+        use_container_width=True, hide_index=True
+    )
+
 st.markdown("#### Conclusión general")
 
 st.markdown("""
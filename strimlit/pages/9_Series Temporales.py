@@ -0,0 +1,249 @@
+import streamlit as st
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import stilez
+import temporal
+import utils
+import utilsql
+import utilsg
+
+st.set_page_config(
+    page_title="Series Temporales - Ataques de Tiburón",
+    page_icon="🦈",
+    layout="wide"
+)
+
+utils.preparar_bd()
+
+stilez.aplicar_estilos_globales()
+
+# titulo principal
+st.title("Series Temporales de Ataques")
+st.markdown("---")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+Evolución de los ataques registrados a lo largo del tiempo. Los años se agrupan en periodos de ancho
+fijo (lustros, décadas, siglos o un ancho personalizado) calculados directamente en SQL con aritmética
+entera sobre la columna year.
+
+</div>
+""", unsafe_allow_html=True)
+
+col1, col2 = st.columns([3, 1])
+
+with col2:
+    opcion = st.selectbox("Periodo", ["Década", "Lustro", "Siglo", "Personalizado"])
+    if opcion == "Personalizado":
+        ancho = st.number_input("Ancho del periodo (años)", min_value=1, max_value=200, value=20, step=1)
+    else:
+        ancho = {"Década": 'decada', "Lustro": 'lustro', "Siglo": 'siglo'}[opcion]
+    solo_fatales = st.checkbox("Solo ataques fatales", key="serie_fatales")
+
+totales = utilsql.obtener_ataques_por_periodo(ancho)
+fatales = utilsql.obtener_ataques_por_periodo(ancho, solo_fatales=True)
+
+with col1:
+    if totales.empty:
+        st.warning("no se encontraron datos para esta consulta")
+    else:
+        fig = go.Figure()
+        if not solo_fatales:
+            fig.add_trace(go.Bar(
+                name="Total de ataques",
+                x=totales['periodo'],
+                y=totales['ataques'],
+                marker_color=utilsg.COLORES['no_fatal'],
+                hovertemplate='<b>%{x}</b><br>%{y} ataques<extra></extra>'
+            ))
+        fig.add_trace(go.Bar(
+            name="Ataques fatales",
+            x=fatales['periodo'],
+            y=fatales['ataques'],
+            marker_color=utilsg.COLORES['fatal'],
+            hovertemplate='<b>%{x}</b><br>%{y} ataques fatales<extra></extra>'
+        ))
+        fig.update_layout(
+            title="Ataques por Periodo",
+            xaxis_title="Periodo",
+            yaxis_title="Número de Ataques",
+            barmode='overlay',
+            margin=dict(t=80, b=80),
+            height=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+if not totales.empty:
+    tabla = totales.merge(fatales[['inicio', 'ataques']], on='inicio', how='left', suffixes=('', '_fatales'))
+    tabla['ataques_fatales'] = tabla['ataques_fatales'].fillna(0).astype(int)
+    tabla['tasa_fatalidad %'] = (tabla['ataques_fatales'] / tabla['ataques'] * 100).round(2)
+    st.dataframe(tabla.drop(columns='inicio'), use_container_width=True)
+
+st.markdown("---")
+st.header("Evolución Mensual y Anual")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+A partir de la fecha de cada ataque (columna date) se cuentan los ataques por mes y por año, incluidos los
+periodos sin ataques, y se suaviza la serie con una media móvil centrada. Los ataques con día desconocido
+se cuentan en su mes. Estas secciones responden a los filtros de la barra lateral.
+
+</div>
+""", unsafe_allow_html=True)
+
+# Seleccion del explorador de filtros de la barra lateral (None si no hay filtros activos)
+mascara = utils.explorador_filtros()
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+MESES = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
+
+col1, col2 = st.columns([3, 1])
+
+with col2:
+    frecuencia = st.radio("Frecuencia", ["Anual", "Mensual"], key="serie_frecuencia")
+    ventana = st.slider("Media móvil (periodos)", min_value=2, max_value=36, value=12 if frecuencia == "Mensual" else 5,
+                        key=f"serie_ventana_{frecuencia}")
+    desde = st.number_input("Desde el año", min_value=1900, max_value=2100, value=1950, step=5, key="serie_desde")
+
+series = utils.series_temporales(ventana, int(desde), mascara)
+serie = series['anual'] if frecuencia == "Anual" else series['mensual']
+
+with col1:
+    if serie['ataques'].sum() == 0:
+        st.warning("no hay ataques con fecha para esta selección")
+    else:
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            name="Ataques",
+            x=serie.index,
+            y=serie['ataques'],
+            marker_color=utilsg.COLORES['no_fatal'],
+            hovertemplate='<b>%{x}</b><br>%{y} ataques<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            name=f"Media móvil ({ventana})",
+            x=serie.index,
+            y=serie['media_movil'],
+            mode='lines',
+            line=dict(color=utilsg.COLORES['fatal'], width=3),
+            hovertemplate='<b>%{x}</b><br>%{y:.2f} ataques<extra></extra>'
+        ))
+        fig.update_layout(
+            title=f"Ataques por {'Año' if frecuencia == 'Anual' else 'Mes'}",
+            xaxis_title="Año" if frecuencia == "Anual" else "Mes",
+            yaxis_title="Número de Ataques",
+            margin=dict(t=80, b=80),
+            height=450
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+with col2:
+    st.metric("Ataques con fecha", int(serie['ataques'].sum()))
+    if serie['ataques'].sum():
+        st.metric(f"{'Año' if frecuencia == 'Anual' else 'Mes'} con más ataques",
+                  str(serie['ataques'].idxmax())[:4 if frecuencia == "Anual" else 7])
+
+st.markdown("---")
+st.header("Descomposición Estacional")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+La serie mensual se descompone de forma aditiva en tendencia (media móvil centrada de 12 meses),
+componente estacional (desviación promedio de cada mes del año respecto de la tendencia) y residuo.
+La fuerza estacional va de 0 (sin patrón anual) a 1 (el ciclo anual domina la variación).
+
+</div>
+""", unsafe_allow_html=True)
+
+descomposicion = series['descomposicion']
+if descomposicion.empty:
+    st.info("se necesitan al menos dos años de datos mensuales para la descomposición")
+else:
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        fig = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                            subplot_titles=["Observado", "Tendencia", "Estacional", "Residuo"])
+        for fila, componente in enumerate(['observado', 'tendencia', 'estacional', 'residuo'], start=1):
+            fig.add_trace(go.Scatter(
+                x=descomposicion.index,
+                y=descomposicion[componente],
+                mode='lines',
+                line=dict(color=utilsg.PALETA_AZULES[fila - 1 if fila > 1 else 0], width=1.5),
+                hovertemplate='%{x|%Y-%m}: %{y:.2f}<extra></extra>',
+                showlegend=False
+            ), row=fila, col=1)
+        fig.update_layout(height=700, margin=dict(t=60, b=40))
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.metric("Fuerza estacional", f"{series['fuerza_estacional']:.2f}")
+        perfil = descomposicion.groupby(descomposicion.index.month)['estacional'].first()
+        fig = go.Figure(go.Bar(
+            x=[MESES[m - 1] for m in perfil.index],
+            y=perfil.round(2),
+            marker_color=utilsg.COLORES['principal'],
+            hovertemplate='<b>%{x}</b><br>%{y:+.2f} ataques<extra></extra>'
+        ))
+        fig.update_layout(title="Componente estacional por mes", height=350, margin=dict(t=60, b=40))
+        st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("---")
+st.header("Hora del Día")
+
+st.markdown("""
+<div style='text-align: justify; line-height: 1.6; font-size: 16px;'>
+
+La hora se extrae de la columna time ('13h30', '13:30', 'Shortly before 13h00'). La franja horaria usa
+la hora cuando existe y, si no, el momento del día escrito en time ('Afternoon', 'Dusk', ...) o day_part.
+
+</div>
+""", unsafe_allow_html=True)
+
+horas = series['horas']
+col1, col2 = st.columns([3, 2])
+
+with col1:
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name="Ataques",
+        x=horas.index,
+        y=horas['ataques'],
+        marker_color=utilsg.COLORES['no_fatal'],
+        hovertemplate='<b>%{x}h</b><br>%{y} ataques<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        name="Ataques fatales",
+        x=horas.index,
+        y=horas['fatales'],
+        marker_color=utilsg.COLORES['fatal'],
+        hovertemplate='<b>%{x}h</b><br>%{y} ataques fatales<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Ataques por Hora del Día ({int(horas['ataques'].sum())} ataques con hora)",
+        xaxis=dict(title="Hora", tickmode='linear', dtick=2),
+        yaxis_title="Número de Ataques",
+        barmode='overlay',
+        margin=dict(t=80, b=80),
+        height=450
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+with col2:
+    st.subheader("Por franja horaria")
+    franjas = series['franjas'].reset_index().rename(columns={'franja': 'Franja', 'ataques': 'Ataques',
+                                                              'fatales': 'Fatales', 'tasa_fatalidad': 'Tasa Fatalidad %'})
+    st.dataframe(franjas, use_container_width=True, hide_index=True)
+
+    st.subheader("Por día de la semana")
+    dias = series['dias_semana']
+    dias = dias.set_axis(DIAS_SEMANA).rename_axis('Día').reset_index().rename(
+        columns={'ataques': 'Ataques', 'fatales': 'Fatales', 'tasa_fatalidad': 'Tasa Fatalidad %'})
+    st.dataframe(dias, use_container_width=True, hide_index=True)
+
+st.caption(f"Franjas: {', '.join(f'{f} [{a}h, {b}h)' for f, a, b in zip(temporal.FRANJAS, temporal.LIMITES_FRANJAS, temporal.LIMITES_FRANJAS[1:]))}")
+
+st.markdown("---")
+st.caption("Análisis Descriptivo de Ataques de Tiburón | Series Temporales")
@@ -0,0 +1,151 @@
+"""
+Pruebas de independencia sobre las tablas de contingencia de conteos.
+
+Para cada tabla (sin filas ni columnas vacías) se calculan con NumPy los conteos esperados
+bajo independencia, el estadístico chi-cuadrado, la V de Cramér y los residuos estandarizados
+ajustados de cada celda, (O - E) / sqrt(E (1 - fila/n) (1 - columna/n)), que siguen
+aproximadamente una normal estándar: |residuo| > 1.96 señala una celda significativamente
+por encima o por debajo de lo esperado.
+
+Si la tabla no cumple la regla de Cochran (algún esperado menor que 1 o más del 20% de las
+celdas con esperado menor que 5) el p valor de la tabla se toma de la prueba exacta de
+Fisher: exacta para tablas 2x2 y por Monte Carlo para tablas mayores, comparando en escala
+logarítmica la probabilidad de la tabla observada con la de tablas aleatorias con los mismos
+márgenes (scipy.stats.random_table).
+"""
+from itertools import combinations
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+NIVEL_SIGNIFICANCIA = 0.05
+MINIMO_ESPERADO = 5
+SIMULACIONES_FISHER = 2000
+SEMILLA = 0
+
+
+def _recortar(tabla: pd.DataFrame) -> pd.DataFrame:
+    """Quita las filas y columnas sin casos (categorías vacías o excluidas como 'Desconocido')."""
+    return tabla.loc[tabla.sum(axis=1) > 0, tabla.sum(axis=0) > 0]
+
+
+def _fisher_monte_carlo(observada: np.ndarray, simulaciones: int, semilla: int) -> float:
+    """
+    p valor de Fisher para tablas r x c: proporción de tablas aleatorias con los mismos
+    márgenes cuya probabilidad es menor o igual que la de la observada. La probabilidad de una
+    tabla con márgenes fijos es proporcional a 1 / prod(celda!), por lo que basta comparar
+    sum(log(celda!)).
+    """
+    aleatorias = stats.random_table(observada.sum(axis=1), observada.sum(axis=0), seed=semilla).rvs(size=simulaciones)
+    estadistico = special.gammaln(observada + 1).sum()
+    estadisticos = special.gammaln(aleatorias + 1).sum(axis=(1, 2))
+    extremas = np.count_nonzero(estadisticos >= estadistico - 1e-7 * abs(estadistico))
+    return (extremas + 1) / (simulaciones + 1)
+
+
+def prueba_independencia(tabla: pd.DataFrame, simulaciones: int = SIMULACIONES_FISHER,
+                         semilla: int = SEMILLA) -> Dict[str, object]:
+    """
+    Prueba de independencia entre las dos variables de una tabla de conteos.
+
+    Args:
+        tabla (pd.DataFrame): Conteos absolutos (sin fila ni columna 'Total'), por ejemplo
+            cubo.CuboConteos.conteos_cruzados o frecuencias.conteos_cruzados
+        simulaciones (int): Tablas aleatorias de la prueba de Fisher por Monte Carlo
+        semilla (int): Semilla del generador aleatorio, para resultados reproducibles
+
+    Returns:
+        Dict[str, object]: 'n', 'chi2', 'gl', 'p_chi2', 'v_cramer', 'min_esperado',
+        'celdas_pequenas' (proporción de celdas con esperado < MINIMO_ESPERADO), 'prueba'
+        (la prueba de la que sale 'p_valor'), 'p_valor', 'esperados' y 'residuos'
+        (DataFrames con las filas y columnas de la tabla recortada). Con menos de dos filas o
+        columnas con casos los estadísticos son NaN
+    """
+    tabla = _recortar(tabla)
+    observada = tabla.to_numpy(dtype=np.float64)
+    filas, columnas = observada.shape
+    n = observada.sum()
+
+    resultado = {
+        'n': int(n), 'chi2': np.nan, 'gl': 0, 'p_chi2': np.nan, 'v_cramer': np.nan, 'min_esperado': np.nan,
+        'celdas_pequenas': np.nan, 'prueba': 'sin datos', 'p_valor': np.nan,
+        'esperados': pd.DataFrame(index=tabla.index, columns=tabla.columns, dtype=float),
+        'residuos': pd.DataFrame(index=tabla.index, columns=tabla.columns, dtype=float)
+    }
+    if filas < 2 or columnas < 2:
+        return resultado
+
+    total_filas = observada.sum(axis=1, keepdims=True)
+    total_columnas = observada.sum(axis=0, keepdims=True)
+    esperados = total_filas * total_columnas / n
+    diferencia = observada - esperados
+
+    chi2 = float((diferencia ** 2 / esperados).sum())
+    gl = (filas - 1) * (columnas - 1)
+    residuos = diferencia / np.sqrt(esperados * (1 - total_filas / n) * (1 - total_columnas / n))
+    celdas_pequenas = float((esperados < MINIMO_ESPERADO).mean())
+
+    resultado.update({
+        'chi2': chi2,
+        'gl': gl,
+        'p_chi2': float(stats.chi2.sf(chi2, gl)),
+        'v_cramer': float(np.sqrt(chi2 / (n * (min(filas, columnas) - 1)))),
+        'min_esperado': float(esperados.min()),
+        'celdas_pequenas': celdas_pequenas,
+        'prueba': 'chi-cuadrado',
+        'esperados': pd.DataFrame(esperados, index=tabla.index, columns=tabla.columns),
+        'residuos': pd.DataFrame(residuos, index=tabla.index, columns=tabla.columns)
+    })
+    resultado['p_valor'] = resultado['p_chi2']
+
+    # Regla de Cochran: con esperados pequeños la aproximacion chi-cuadrado no es fiable
+    if esperados.min() < 1 or celdas_pequenas > 0.2:
+        enteros = observada.astype(np.int64)
+        if (filas, columnas) == (2, 2):
+            resultado['prueba'] = 'fisher exacta'
+            resultado['p_valor'] = float(stats.fisher_exact(enteros).pvalue)
+        else:
+            resultado['prueba'] = 'fisher monte carlo'
+            resultado['p_valor'] = float(_fisher_monte_carlo(enteros, simulaciones, semilla))
+    return resultado
+
+
+def pruebas_por_pares(cubo_conteos, dimensiones: Optional[Sequence[str]] = None,
+                      simulaciones: int = SIMULACIONES_FISHER, semilla: int = SEMILLA) -> Dict[str, object]:
+    """
+    Pruebas de independencia de todos los pares de dimensiones de un cubo de conteos. Las
+    tablas salen de sumar el cubo (cubo.CuboConteos.conteos_cruzados, sin nulos ni
+    'Desconocido'), por lo que no se recorre ninguna fila.
+
+    Args:
+        cubo_conteos (cubo.CuboConteos): Cubo con las variables a cruzar
+        dimensiones (Optional[Sequence[str]]): Dimensiones a cruzar; por defecto todas las del cubo
+        simulaciones (int): Tablas aleatorias de la prueba de Fisher por Monte Carlo
+        semilla (int): Semilla del generador aleatorio
+
+    Returns:
+        Dict[str, object]: 'resumen' (pd.DataFrame con una fila por par) y 'residuos'
+        (diccionario 'variable 1 x variable 2' -> residuos estandarizados ajustados)
+    """
+    dimensiones = list(dimensiones or cubo_conteos.dimensiones)
+    filas, residuos = [], {}
+    for fila, columna in combinations(dimensiones, 2):
+        prueba = prueba_independencia(cubo_conteos.conteos_cruzados(fila, columna), simulaciones, semilla)
+        filas.append({
+            'Variable 1': fila,
+            'Variable 2': columna,
+            'N': prueba['n'],
+            'Chi-cuadrado': prueba['chi2'],
+            'gl': prueba['gl'],
+            'p chi-cuadrado': prueba['p_chi2'],
+            'V de Cramer': prueba['v_cramer'],
+            'Celdas esperado < 5 %': prueba['celdas_pequenas'] * 100,
+            'Prueba': prueba['prueba'],
+            'p valor': prueba['p_valor'],
+            'Significativo': bool(prueba['p_valor'] < NIVEL_SIGNIFICANCIA)
+        })
+        residuos[f"{fila} x {columna}"] = prueba['residuos']
+
+    return {'resumen': pd.DataFrame(filas), 'residuos': residuos}
@@ -0,0 +1,110 @@
+"""
+Snapshot columnar (Arrow IPC) del DataFrame limpio y unido, guardado junto a shark_attacks.db.
+
+El archivo se escribe sin compresión y se abre con memory map: la tabla Arrow se lee sin copia
+ni descompresión, y la conversión a pandas (to_pandas) hace una sola copia de cada columna, sin
+consultar SQLite ni volver a aplicar las reglas de limpieza. En los metadatos del esquema se
+guarda una clave de la versión de la base de datos (mtime y tamaño del archivo, ver
+utils.version_datos) y de las reglas de limpieza; si no coincide con la actual, el snapshot se
+ignora y se vuelve a cargar desde SQLite. La clave no lee el archivo de la base de datos, de
+modo que su costo no crece con el tamaño de la bbdd.
+
+pyarrow es opcional: sin él, leer_snapshot devuelve None y escribir_snapshot no hace nada.
+
+Uso:
+    python snapshot.py    construye (o reconstruye) el snapshot de la base de datos actual
+"""
+import hashlib
+import os
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+CLAVE_HASH = b'hash_origen'
+
+
+def hash_origen(version: str, etiqueta: str = "") -> str:
+    """
+    Calcula el hash SHA-256 de la versión de la base de datos más una etiqueta (por ejemplo,
+    la representación de las reglas de limpieza). No lee el archivo de la base de datos.
+
+    Args:
+        version (str): Versión de la base de datos (por ejemplo, 'mtime-tamaño' del archivo)
+        etiqueta (str): Texto adicional que también invalida el snapshot si cambia
+
+    Returns:
+        str: Hash hexadecimal
+    """
+    return hashlib.sha256(f"{version}\0{etiqueta}".encode("utf-8")).hexdigest()
+
+
+def leer_snapshot(ruta: str, hash_esperado: str) -> Optional[pd.DataFrame]:
+    """
+    Lee el snapshot con memory map si existe y su hash coincide con el esperado. La tabla
+    Arrow no se copia; to_pandas copia cada columna una vez al construir el DataFrame.
+
+    Args:
+        ruta (str): Ruta del archivo .arrow
+        hash_esperado (str): Hash actual del origen (ver hash_origen)
+
+    Returns:
+        Optional[pd.DataFrame]: DataFrame del snapshot, o None si no existe, está
+        desactualizado, está dañado o pyarrow no está disponible
+    """
+    if pa is None or not os.path.exists(ruta):
+        return None
+    try:
+        with pa.memory_map(ruta, "r") as fuente:
+            lector = ipc.open_file(fuente)
+            metadatos = lector.schema.metadata or {}
+            if metadatos.get(CLAVE_HASH, b"").decode("utf-8") != hash_esperado:
+                return None
+            return lector.read_all().to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def escribir_snapshot(df: pd.DataFrame, ruta: str, hash_actual: str) -> bool:
+    """
+    Escribe el DataFrame como Arrow IPC sin compresión, con el hash del origen en los
+    metadatos. Se escribe a un archivo temporal y se renombra para que los lectores nunca
+    vean un archivo a medio escribir.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpio a guardar
+        ruta (str): Ruta del archivo .arrow
+        hash_actual (str): Hash del origen con el que se generó el DataFrame
+
+    Returns:
+        bool: True si el snapshot se escribió
+    """
+    if pa is None:
+        return False
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), CLAVE_HASH: hash_actual.encode("utf-8")})
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(temporal, "wb") as destino:
+            with ipc.new_file(destino, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+        os.replace(temporal, ruta)
+        return True
+    except OSError:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return False
+
+
+if __name__ == "__main__":
+    import utils
+
+    if utils.construir_snapshot():
+        print(f"snapshot escrito en {utils.RUTA_SNAPSHOT}")
+    else:
+        print("no se pudo escribir el snapshot (¿pyarrow instalado?)")
@@ -0,0 +1,281 @@
+"""
+Series temporales de los ataques a partir de las columnas date y time ya limpias.
+
+Las fechas se convierten una sola vez (reglas 'fecha' de limpieza.py) y SerieTemporal las
+guarda como enteros: el mes de cada ataque contado desde el primer mes de los datos y su día
+de la semana. Con eso
+los remuestreos mensual y anual son un np.bincount sobre esos enteros (con la máscara del
+explorador de filtros como peso) y no hace falta agrupar fechas con pandas en cada consulta.
+La hora del día (regla 'hora') y la franja horaria se agregan igual.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Franjas horarias: [0, 6) Madrugada, [6, 12) Mañana, [12, 18) Tarde, [18, 24) Noche
+FRANJAS = ('Madrugada', 'Mañana', 'Tarde', 'Noche')
+LIMITES_FRANJAS = (0, 6, 12, 18, 24)
+PERIODO_ESTACIONAL = 12
+
+
+def franja_dia(hora: pd.Series, momento: Optional[pd.Series] = None, parte: Optional[pd.Series] = None) -> pd.Series:
+    """
+    Franja horaria de cada ataque: la de su hora si la tiene, si no la del momento del día
+    descrito en texto ('Afternoon', 'Dusk', ...) y por último la de day_part (AM / PM).
+
+    Args:
+        hora (pd.Series): Hora del día en horas decimales (NaN si no se conoce)
+        momento (Optional[pd.Series]): Franja deducida del texto de time (nulo si no se conoce)
+        parte (Optional[pd.Series]): Franja deducida de day_part (nulo si no se conoce)
+
+    Returns:
+        pd.Series: Columna categórica ordenada con las categorías FRANJAS
+    """
+    franja = pd.cut(hora, bins=LIMITES_FRANJAS, labels=FRANJAS, right=False).astype(object)
+    for respaldo in (momento, parte):
+        if respaldo is not None:
+            franja = franja.fillna(respaldo.astype(object))
+    return franja.astype(pd.CategoricalDtype(FRANJAS, ordered=True))
+
+
+def media_movil(serie: pd.Series, ventana: int) -> pd.Series:
+    """
+    Media móvil centrada de una serie regular, con sumas acumuladas (sin recorrer ventanas).
+
+    Args:
+        serie (pd.Series): Serie con un valor por periodo (sin huecos)
+        ventana (int): Número de periodos de la ventana
+
+    Returns:
+        pd.Series: Media de cada ventana, NaN donde la ventana no cabe completa
+    """
+    valores = serie.to_numpy(dtype=np.float64)
+    resultado = np.full(len(valores), np.nan)
+    if 0 < ventana <= len(valores):
+        acumulado = np.r_[0.0, np.cumsum(valores)]
+        medias = (acumulado[ventana:] - acumulado[:-ventana]) / ventana
+        inicio = ventana // 2
+        resultado[inicio:inicio + len(medias)] = medias
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+
+def descomponer(serie: pd.Series, periodo: int = PERIODO_ESTACIONAL) -> pd.DataFrame:
+    """
+    Descomposición clásica aditiva: observado = tendencia + estacional + residuo.
+
+    La tendencia es una media móvil centrada de `periodo` valores (2 x periodo si es par),
+    la componente estacional es el promedio de (observado - tendencia) en cada posición del
+    ciclo, centrado en cero, y el residuo es lo que queda.
+
+    Args:
+        serie (pd.Series): Serie regular (por ejemplo ataques por mes)
+        periodo (int): Longitud del ciclo estacional (12 para datos mensuales)
+
+    Returns:
+        pd.DataFrame: Columnas 'observado', 'tendencia', 'estacional' y 'residuo' con el
+        índice de la serie; vacío si la serie no cubre dos ciclos completos
+    """
+    columnas = ['observado', 'tendencia', 'estacional', 'residuo']
+    if len(serie) < 2 * periodo:
+        return pd.DataFrame(columns=columnas)
+
+    observado = serie.astype(np.float64)
+    pesos = np.ones(periodo) if periodo % 2 else np.r_[0.5, np.ones(periodo - 1), 0.5]
+    mitad = len(pesos) // 2
+    tendencia = np.full(len(observado), np.nan)
+    tendencia[mitad:len(observado) - mitad] = np.convolve(observado.to_numpy(), pesos / periodo, 'valid')
+    tendencia = pd.Series(tendencia, index=observado.index)
+
+    posicion = np.arange(len(observado)) % periodo
+    desviacion = (observado - tendencia).to_numpy()
+    validos = ~np.isnan(desviacion)
+    promedio = (np.bincount(posicion[validos], weights=desviacion[validos], minlength=periodo)
+                / np.bincount(posicion[validos], minlength=periodo))
+    estacional = pd.Series((promedio - promedio.mean())[posicion], index=observado.index)
+
+    return pd.DataFrame({
+        'observado': observado,
+        'tendencia': tendencia,
+        'estacional': estacional,
+        'residuo': observado - tendencia - estacional
+    }, columns=columnas)
+
+
+def fuerza_estacional(descomposicion: pd.DataFrame) -> float:
+    """
+    Fuerza de la estacionalidad, max(0, 1 - Var(residuo) / Var(estacional + residuo)):
+    0 sin patrón estacional, cercana a 1 si el ciclo domina la variación sin tendencia.
+
+    Args:
+        descomposicion (pd.DataFrame): Resultado de descomponer
+
+    Returns:
+        float: Fuerza entre 0 y 1 (NaN si la descomposición está vacía)
+    """
+    validos = descomposicion.dropna()
+    if validos.empty:
+        return float('nan')
+    total = (validos['estacional'] + validos['residuo']).var()
+    return float(max(0.0, 1 - validos['residuo'].var() / total)) if total > 0 else 0.0
+
+
+def _tabla_conteos(indice: pd.Index, casos: np.ndarray, fatales: np.ndarray) -> pd.DataFrame:
+    """Ataques, fatales y tasa de fatalidad (%) por periodo."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tasa = np.round(fatales / casos * 100, 2)
+    return pd.DataFrame({'ataques': casos.astype(np.int64), 'fatales': fatales.astype(np.int64),
+                         'tasa_fatalidad': tasa}, index=indice)
+
+
+class SerieTemporal:
+    """Fechas, horas y franjas de los ataques codificadas como enteros para agregarlas con bincount."""
+
+    def __init__(self, meses: np.ndarray, fatal: Optional[np.ndarray] = None, hora: Optional[np.ndarray] = None,
+                 franja: Optional[pd.Series] = None, fechas: Optional[np.ndarray] = None):
+        """
+        Args:
+            meses (np.ndarray): Mes de cada fila (datetime64, se ignora el día; NaT si no se conoce)
+            fatal (Optional[np.ndarray]): Indicador booleano de ataque fatal de cada fila
+            hora (Optional[np.ndarray]): Hora del día en horas decimales (NaN si no se conoce)
+            franja (Optional[pd.Series]): Franja horaria categórica (ver franja_dia)
+            fechas (Optional[np.ndarray]): Fecha completa de cada fila, para el día de la
+                semana (NaT si el día no se conoce)
+        """
+        meses = np.asarray(meses, dtype='datetime64[M]')
+        self.n_filas = len(meses)
+        self.fatal = np.zeros(self.n_filas, dtype=bool) if fatal is None else np.asarray(fatal, dtype=bool)
+
+        validos = ~np.isnat(meses)
+        numeros = meses[validos].astype(np.int64)
+        self.primer_mes = np.datetime64(int(numeros.min()), 'M') if len(numeros) else np.datetime64('1970-01', 'M')
+        self.n_meses = int(numeros.max() - numeros.min() + 1) if len(numeros) else 0
+
+        # Mes de cada fila contado desde primer_mes (-1 sin fecha) y dia de la semana (0 lunes)
+        self.mes = np.full(self.n_filas, -1, dtype=np.int32)
+        self.mes[validos] = numeros - self.primer_mes.astype(np.int64)
+        self.dia_semana = np.full(self.n_filas, -1, dtype=np.int8)
+        if fechas is not None:
+            fechas = np.asarray(fechas, dtype='datetime64[D]')
+            validas = ~np.isnat(fechas)
+            self.dia_semana[validas] = (fechas[validas].astype(np.int64) + 3) % 7
+
+        hora = np.full(self.n_filas, np.nan) if hora is None else np.asarray(hora, dtype=np.float64)
+        self.hora = np.where(np.isnan(hora), -1, np.floor(hora)).astype(np.int8)
+        self.franja = (np.full(self.n_filas, -1, dtype=np.int8) if franja is None
+                       else np.asarray(pd.Categorical(franja, categories=FRANJAS).codes, dtype=np.int8))
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, mes: str = 'mes', fecha: str = 'fecha', fatal: str = 'is_fatal_cat',
+                        hora: str = 'hora', franja: str = 'franja_dia') -> 'SerieTemporal':
+        """
+        Construye la serie con las columnas de un DataFrame limpio; las filas conservan su
+        posición para poder aplicar las máscaras del explorador de filtros.
+
+        Args:
+            df (pd.DataFrame): DataFrame limpio
+            mes (str): Columna datetime64 con el mes del ataque
+            fecha (str): Columna datetime64 con la fecha completa del ataque
+            fatal (str): Columna de fatalidad ('Fatal' cuenta como ataque fatal)
+            hora (str): Columna con la hora del día en horas decimales
+            franja (str): Columna con la franja horaria
+
+        Returns:
+            SerieTemporal: Serie temporal de los ataques
+        """
+        return cls(df[mes].to_numpy(dtype='datetime64[ns]'),
+                   df[fatal].eq('Fatal').to_numpy(dtype=bool) if fatal in df.columns else None,
+                   df[hora].to_numpy(dtype=np.float64, na_value=np.nan) if hora in df.columns else None,
+                   df[franja] if franja in df.columns else None,
+                   df[fecha].to_numpy(dtype='datetime64[ns]') if fecha in df.columns else None)
+
+    @property
+    def n_fechas(self) -> int:
+        """Número de filas con mes válido."""
+        return int((self.mes >= 0).sum())
+
+    def _conteos(self, claves: np.ndarray, n_claves: int, mascara: Optional[np.ndarray]):
+        """Ataques y fatales por clave entera (se ignoran las claves negativas)."""
+        seleccion = claves >= 0
+        if mascara is not None:
+            seleccion &= np.asarray(mascara, dtype=bool)
+        claves = claves[seleccion]
+        return (np.bincount(claves, minlength=n_claves),
+                np.bincount(claves, weights=self.fatal[seleccion], minlength=n_claves))
+
+    def mensual(self, mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Ataques por mes, con todos los meses entre el primero y el último (ceros incluidos).
+
+        Args:
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame (explorador de filtros)
+
+        Returns:
+            pd.DataFrame: Columnas 'ataques', 'fatales' y 'tasa_fatalidad' (%) con un índice
+            de fechas (primer día de cada mes)
+        """
+        casos, fatales = self._conteos(self.mes, self.n_meses, mascara)
+        meses = self.primer_mes + np.arange(self.n_meses)
+        return _tabla_conteos(pd.DatetimeIndex(meses.astype('datetime64[ns]'), name='mes'), casos, fatales)
+
+    def anual(self, mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Ataques por año, con todos los años entre el primero y el último.
+
+        Args:
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame
+
+        Returns:
+            pd.DataFrame: Columnas 'ataques', 'fatales' y 'tasa_fatalidad' (%) indexadas por año
+        """
+        desfase = int(self.primer_mes.astype(np.int64) % 12)
+        anios = np.where(self.mes >= 0, (self.mes + desfase) // 12, -1)
+        n_anios = (self.n_meses + desfase + 11) // 12
+        casos, fatales = self._conteos(anios, n_anios, mascara)
+        primero = int(self.primer_mes.astype('datetime64[Y]').astype(np.int64)) + 1970
+        return _tabla_conteos(pd.RangeIndex(primero, primero + n_anios, name='año'), casos, fatales)
+
+    def por_hora(self, mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Histograma de la hora del día (24 intervalos de una hora) de los ataques con hora.
+
+        Args:
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame
+
+        Returns:
+            pd.DataFrame: Columnas 'ataques', 'fatales' y 'tasa_fatalidad' (%) indexadas por hora (0 a 23)
+        """
+        casos, fatales = self._conteos(self.hora.astype(np.int64), 24, mascara)
+        return _tabla_conteos(pd.RangeIndex(24, name='hora'), casos, fatales)
+
+    def por_franja(self, mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Ataques por franja horaria (ver franja_dia).
+
+        Args:
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame
+
+        Returns:
+            pd.DataFrame: Columnas 'ataques', 'fatales' y 'tasa_fatalidad' (%) indexadas por franja
+        """
+        casos, fatales = self._conteos(self.franja.astype(np.int64), len(FRANJAS), mascara)
+        return _tabla_conteos(pd.CategoricalIndex(FRANJAS, categories=FRANJAS, ordered=True, name='franja'),
+                              casos, fatales)
+
+    def por_dia_semana(self, mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Ataques por día de la semana de la fecha.
+
+        Args:
+            mascara (Optional[np.ndarray]): Máscara de filas del DataFrame
+
+        Returns:
+            pd.DataFrame: Columnas 'ataques', 'fatales' y 'tasa_fatalidad' (%) indexadas por
+            día de la semana (0 lunes a 6 domingo)
+        """
+        casos, fatales = self._conteos(self.dia_semana.astype(np.int64), 7, mascara)
+        return _tabla_conteos(pd.RangeIndex(7, name='dia_semana'), casos, fatales)
+
+    def memoria_kb(self) -> float:
+        """Memoria de los arreglos codificados en KB."""
+        return sum(a.nbytes for a in (self.mes, self.dia_semana, self.hora, self.franja, self.fatal)) / 1024
@@ -0,0 +1,118 @@
+"""
+Equivalencia entre la carga incremental (incremental.CargaIncremental) y una recarga completa
+sobre una copia migrada de bbdd/shark_attacks.db a la que se le insertan, actualizan y borran
+filas.
+
+Uso:
+    python -m pytest tests
+"""
+import os
+import shutil
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import incremental  # noqa: E402
+import migraciones  # noqa: E402
+from utils import CONSULTA_DATOS, REGLAS_LIMPIEZA, COLUMNAS_FRECUENCIA  # noqa: E402
+
+RUTA_ORIGEN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bbdd", "shark_attacks.db")
+
+
+@pytest.fixture
+def ruta_bd(tmp_path):
+    ruta = str(tmp_path / "shark_attacks.db")
+    shutil.copyfile(RUTA_ORIGEN, ruta)
+    migraciones.aplicar_migraciones(ruta)
+    return ruta
+
+
+def _carga(ruta: str, ruta_poda: str = None) -> incremental.CargaIncremental:
+    carga = incremental.CargaIncremental(CONSULTA_DATOS, REGLAS_LIMPIEZA, COLUMNAS_FRECUENCIA, ruta_poda=ruta_poda)
+    with sqlite3.connect(ruta) as conn:
+        carga.cargar_completo(conn)
+    return carga
+
+
+def _actualizar(carga: incremental.CargaIncremental, ruta: str) -> dict:
+    with sqlite3.connect(ruta) as conn:
+        return carga.actualizar(conn)
+
+
+def _modificar(ruta: str, desde: int):
+    """Actualiza 5 filas (una con especie nula), borra 3 y agrega 2 filas, una casi vacía."""
+    conn = sqlite3.connect(ruta)
+    with conn:
+        ids = [fila[0] for fila in conn.execute(
+            "SELECT id FROM shark_attackdatos WHERE id > ? ORDER BY id LIMIT 8", (desde,))]
+        conn.execute(f"UPDATE shark_attackdatos SET activity = 'Kayaking', species = NULL "
+                     f"WHERE id IN ({','.join(map(str, ids[:5]))})")
+        conn.execute(f"DELETE FROM shark_attackdatos WHERE id IN ({','.join(map(str, ids[5:]))})")
+        columnas = [c[1] for c in conn.execute("PRAGMA table_info(shark_attackdatos)") if c[1] != 'id']
+        lista = ", ".join(f'"{c}"' for c in columnas)
+        conn.execute(f"INSERT INTO shark_attackdatos ({lista}) SELECT {lista} FROM shark_attackdatos "
+                     f"WHERE id = ?", (ids[0],))
+        # Todas las columnas categoricas de esta fila quedan nulas o por defecto en el delta
+        conn.execute("INSERT INTO shark_attackdatos (case_number, activity) VALUES ('prueba', 'Rowing')")
+    conn.close()
+
+
+def _comparar(carga: incremental.CargaIncremental, referencia: incremental.CargaIncremental):
+    """Mismas filas (por id), mismos valores y mismos conteos de frecuencia que la recarga completa."""
+    def ordenado(c):
+        orden = np.argsort(c.ids, kind='stable')
+        df = c.df.iloc[orden].reset_index(drop=True)
+        categoricas = {col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}
+        return c.ids[orden], df.astype(categoricas)
+
+    ids, df = ordenado(carga)
+    ids_ref, df_ref = ordenado(referencia)
+    np.testing.assert_array_equal(ids, ids_ref)
+    pd.testing.assert_frame_equal(df, df_ref)
+    for columna in COLUMNAS_FRECUENCIA:
+        conteos = carga.conteos[columna]
+        conteos_ref = referencia.conteos[columna]
+        assert {str(k): v for k, v in conteos[conteos > 0].items()} == \
+               {str(k): v for k, v in conteos_ref[conteos_ref > 0].items()}
+
+
+def test_delta_igual_a_recarga_completa(ruta_bd):
+    carga = _carga(ruta_bd)
+    _modificar(ruta_bd, desde=0)
+
+    resultado = _actualizar(carga, ruta_bd)
+    assert resultado == {'nuevas': 2, 'reemplazadas': 8, 'recarga_completa': 0}
+    _comparar(carga, _carga(ruta_bd))
+
+    # Sin cambios en la bbdd la siguiente actualizacion no hace nada
+    assert _actualizar(carga, ruta_bd)['reemplazadas'] == 0
+    assert carga.actualizaciones['sin_cambios'] == 1
+
+
+def test_poda_del_registro(ruta_bd):
+    atrasada = _carga(ruta_bd)
+    _modificar(ruta_bd, desde=0)
+
+    # La recarga completa poda las entradas ya incorporadas
+    podadora = _carga(ruta_bd, ruta_poda=ruta_bd)
+    with sqlite3.connect(ruta_bd) as conn:
+        assert conn.execute(f"SELECT COUNT(*) FROM {incremental.TABLA_CAMBIOS}").fetchone()[0] == 0
+    assert podadora.actualizaciones['podadas'] > 0
+
+    # Tras la poda la marca de agua no retrocede: sin cambios no hay recarga
+    assert _actualizar(podadora, ruta_bd)['recarga_completa'] == 0
+    assert podadora.actualizaciones['sin_cambios'] == 1
+
+    # Una carga con la marca anterior a la poda detecta el hueco y recarga todo
+    assert _actualizar(atrasada, ruta_bd)['recarga_completa'] == 1
+    _comparar(atrasada, _carga(ruta_bd))
+
+    # Los cambios posteriores a la poda se siguen aplicando como delta
+    _modificar(ruta_bd, desde=100)
+    assert _actualizar(podadora, ruta_bd)['recarga_completa'] == 0
+    _comparar(podadora, _carga(ruta_bd))
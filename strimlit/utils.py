@@ -1,20 +1,50 @@
-import sqlite3
 import streamlit as st
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Any
+from contextlib import contextmanager, nullcontext
+import functools
+import hashlib
+import inspect
+import json
 import os
 from scipy import stats
+import limpieza
+import conexiones
+import migraciones
+import snapshot
+import frecuencias
+import incremental
+import estadisticas
+import momentos
+import cubo
+import filtros
+import pruebas
+import intervalos
+import geoespacial
+import hotspots
+import temporal
+import lunar
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(current_dir, "bbdd", "shark_attacks.db")
+RUTA_SNAPSHOT = os.path.join(current_dir, "bbdd", "shark_attacks.arrow")
 
 CONFIG = {
     "base_de_datos": db_path,
     "tabla_ataques": "shark_attackdatos",
     "tabla_tiburones": "SHARKS", 
-    "tabla_conservacion": "conservation_status"
+    "tabla_conservacion": "conservation_status",
+    # Tablas sin filtros de la tabla completa: 'pandas' (conteos en memoria) o 'sql' (GROUP BY
+    # en SQLite, ver frecuencias_sql); con filtros siempre se cuenta en pandas
+    "motor_agregacion": "pandas",
+    # Bootstrap de las tasas de fatalidad: semilla fija (None para no fijarla) y procesos del
+    # pool (1 calcula sin pool, None usa todos los nucleos; el pool solo se usa con trabajos
+    # grandes, ver intervalos.MINIMO_POOL)
+    "replicas_bootstrap": 10_000,
+    "semilla_bootstrap": 0,
+    "procesos_bootstrap": 1
 }
 
 FATAL_MAPPING = {
@@ -31,101 +61,800 @@ SEX_MAPPING = {
 
 UNKNOWN_VALUES = {'nan', 'none', 'unknown', 'desconocido', ''}
 
-def _conectar_bd() -> Optional[sqlite3.Connection]:
+# Momentos del dia escritos en texto en la columna time (en mayusculas) y franja horaria de
+# cada uno (ver temporal.FRANJAS); se usan cuando time no trae una hora
+MOMENTO_MAPPING = {
+    'MIDNIGHT': 'Madrugada', 'AFTER MIDNIGHT': 'Madrugada', 'SHORTLY AFTER MIDNIGHT': 'Madrugada',
+    'DAWN': 'Madrugada', 'DAYBREAK': 'Madrugada',
+    'MORNING': 'Mañana', 'EARLY MORNING': 'Mañana', 'MID-MORNING': 'Mañana', 'LATE MORNING': 'Mañana',
+    'A.M.': 'Mañana', 'AM': 'Mañana', 'JUST BEFORE NOON': 'Mañana',
+    'NOON': 'Tarde', 'MIDDAY': 'Tarde', 'MIDDAY.': 'Tarde', 'LUNCHTIME': 'Tarde', 'AFTER NOON': 'Tarde',
+    'AFTERNOON': 'Tarde', 'EARLY AFTERNOON': 'Tarde', 'MID AFTERNOON': 'Tarde', 'LATE AFTERNOON': 'Tarde',
+    'LATE AFTERNON': 'Tarde', 'P.M.': 'Tarde',
+    'EVENING': 'Noche', '"EVENING"': 'Noche', '"EARLY EVENING"': 'Noche', 'DUSK': 'Noche', 'AFTER DUSK': 'Noche',
+    '"SHORTLY BEFORE DUSK"': 'Noche', 'SUNSET': 'Noche', 'JUST BEFORE SUNDOWN': 'Noche', 'NIGHTFALL': 'Noche',
+    'NIGHT': 'Noche', '"NIGHT"': 'Noche', 'LATE NIGHT': 'Noche', 'DARK': 'Noche', '"AFTER DARK"': 'Noche'
+}
+
+# Codigos de day_part (E = early, L = late) y franja horaria de cada uno
+PARTE_DIA_MAPPING = {'EAM': 'Madrugada', 'AM': 'Mañana', 'PM': 'Tarde', 'EPM': 'Tarde', 'LPM': 'Noche'}
+
+# Tabla declarativa de limpieza: una regla por columna de salida (ver limpieza.limpiar_columnas).
+# Las columnas de texto se emiten como pd.Categorical (codigos int8), la edad y el año como float32
+# y geo_point ('latitud, longitud') se separa una sola vez en latitud y longitud float32.
+# date se convierte una sola vez a datetime64 (mes: solo año y mes, para no perder las fechas con
+# dia desconocido) y time a la hora del dia en horas decimales. Las reglas que leen una columna
+# cruda van antes de la que la reemplaza
+REGLAS_LIMPIEZA = {
+    'is_fatal_cat': {'origen': 'is_fatal', 'mapeo': FATAL_MAPPING, 'defecto': 'Desconocido', 'categoria': True},
+    'is_fatal': {'defecto': None, 'categoria': True},
+    'sex': {'mapeo': SEX_MAPPING, 'defecto': 'Desconocido', 'categoria': True},
+    'activity': {'normalizar': True, 'desconocidos': UNKNOWN_VALUES, 'defecto': 'Desconocido', 'categoria': True},
+    'moon_phase': {'normalizar': True, 'desconocidos': UNKNOWN_VALUES, 'defecto': 'Desconocido', 'categoria': True},
+    'season': {'normalizar': True, 'desconocidos': UNKNOWN_VALUES, 'defecto': 'Desconocido', 'categoria': True},
+    'country': {'defecto': None, 'categoria': True},
+    'species': {'defecto': None, 'categoria': True},
+    'conservation_status': {'defecto': None, 'categoria': True},
+    'conservation_description': {'defecto': None, 'categoria': True},
+    'age': {'tipo': 'numero', 'rango': (0, 100), 'dtype': 'float32'},
+    'year': {'tipo': 'numero', 'dtype': 'float32'},
+    'moon_phase_rate': {'tipo': 'numero', 'rango': (0, 100), 'dtype': 'float32'},
+    'latitud': {'origen': 'geo_point', 'tipo': 'coordenada', 'componente': 0, 'rango': (-90, 90), 'dtype': 'float32'},
+    'longitud': {'origen': 'geo_point', 'tipo': 'coordenada', 'componente': 1, 'rango': (-180, 180), 'dtype': 'float32'},
+    'geo_point': {'desconocidos': {''}, 'defecto': None, 'categoria': True},
+    'commune_nom': {'desconocidos': {''}, 'defecto': None, 'categoria': True},
+    'province': {'desconocidos': {''}, 'defecto': None, 'categoria': True},
+    'coast': {'desconocidos': {''}, 'defecto': None, 'categoria': True},
+    'mes': {'origen': 'fecha', 'tipo': 'fecha', 'precision': 'mes', 'rango': (1000, 2100)},
+    'fecha': {'tipo': 'fecha', 'rango': (1000, 2100)},
+    'hora': {'origen': 'time', 'tipo': 'hora', 'dtype': 'float32'},
+    'momento_dia': {'origen': 'time', 'normalizar': True, 'mapeo': MOMENTO_MAPPING, 'defecto': None, 'categoria': True},
+    'time': {'desconocidos': {''}, 'defecto': None, 'categoria': True},
+    'parte_dia': {'normalizar': True, 'mapeo': PARTE_DIA_MAPPING, 'defecto': None, 'categoria': True}
+}
+
+# Join de ataques, tiburones y estado de conservacion. {condicion} recibe el WHERE de la carga
+# incremental; el orden por id permite alinear el DataFrame con los ids de sus filas
+CONSULTA_DATOS = f"""
+SELECT 
+    a.id,
+    a.is_fatal, 
+    a.activity, 
+    a.moon_phase, 
+    a.moon_phase_rate,
+    a.age, 
+    a.sex, 
+    a.season, 
+    a.country, 
+    a.species,
+    a.year,
+    a.geo_point,
+    a.commune_nom,
+    a.province,
+    a.coast,
+    a.date as fecha,
+    a.time,
+    a.day_part as parte_dia,
+    s.conservation_status,
+    cs.cat as conservation_description
+FROM {CONFIG['tabla_ataques']} a
+LEFT JOIN {CONFIG['tabla_tiburones']} s ON a.species = s.id
+LEFT JOIN {CONFIG['tabla_conservacion']} cs ON s.conservation_status = cs.id_long
+{{condicion}}
+ORDER BY a.id
+"""
+
+# Columna cruda en SQL de cada columna de texto de REGLAS_LIMPIEZA (alias de CONSULTA_DATOS),
+# usada por frecuencias_sql y tablas_doble_entrada_sql
+ORIGENES_SQL = {
+    'is_fatal': "a.is_fatal",
+    'activity': "a.activity",
+    'moon_phase': "a.moon_phase",
+    'sex': "a.sex",
+    'season': "a.season",
+    'country': "a.country",
+    'species': "a.species",
+    'geo_point': "a.geo_point",
+    'commune_nom': "a.commune_nom",
+    'province': "a.province",
+    'coast': "a.coast",
+    'time': "a.time",
+    'momento_dia': "a.time",
+    'parte_dia': "a.day_part",
+    'conservation_status': "s.conservation_status",
+    'conservation_description': "cs.cat"
+}
+
+# Columnas cuyas tablas de frecuencia se mantienen con el delta de cada actualizacion
+COLUMNAS_FRECUENCIA = ('is_fatal_cat', 'activity', 'country', 'season')
+
+# Grupos de edad de las paginas de estadisticas y graficos (intervalos cerrados a la izquierda)
+BINS_EDAD = [0, 18, 30, 45, 60, 100]
+ETIQUETAS_EDAD = ['0-18', '19-30', '31-45', '46-60', '60+']
+
+# Dimensiones del cubo de conteos: las variables que las paginas cruzan con la fatalidad
+DIMENSIONES_CUBO = ('activity', 'country', 'grupo_edad', 'season', 'is_fatal_cat')
+
+# Variables cuyas tasas de fatalidad se acompañan de intervalos de confianza (ver intervalos.py)
+DIMENSIONES_TASAS = ('activity', 'country', 'season', 'grupo_edad')
+
+# Columnas de lugar que resumen cada hotspot (valor mas frecuente): columna de salida -> columna limpia
+LUGARES_HOTSPOT = {'comuna': 'commune_nom', 'provincia': 'province', 'pais': 'country'}
+
+# Columnas del explorador de filtros: bitmaps por categoria y bitmaps por rango (ver filtros.py)
+DIMENSIONES_FILTRO = ('country', 'species', 'activity', 'season', 'moon_phase', 'sex')
+RANGOS_FILTRO = ('age', 'year')
+
+@st.cache_resource(show_spinner="actualizando el esquema de la base de datos...")
+def preparar_bd() -> Optional[int]:
+    """
+    Aplica las migraciones pendientes del esquema (migraciones.py) a CONFIG['base_de_datos']
+    con una conexión de escritura que se cierra al terminar. Las vistas, los resúmenes
+    materializados y la carga incremental suponen el esquema más reciente, por lo que
+    app.py y las páginas que consultan la base de datos la llaman al empezar; se ejecuta
+    una sola vez por proceso. Importar este módulo no modifica la base de datos.
+    
+    Returns:
+        Optional[int]: Versión de esquema final, o None si no se pudo migrar (archivo
+        inexistente, de solo lectura o bloqueado); en ese caso se sigue con el esquema actual
+    """
+    ruta = CONFIG["base_de_datos"]
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return migraciones.aplicar_migraciones(ruta)
+    except Exception as e:
+        st.error(f"error aplicando migraciones de la base de datos: {e}")
+        return None
+
+# Pool compartido y acotado de conexiones de solo lectura (ver conexiones.PoolConexiones)
+POOL_BD = conexiones.PoolConexiones(CONFIG["base_de_datos"])
+
+@contextmanager
+def _conexion_bd():
     """ 
-    Esta función intenta conectarse a la base de datos usando la ruta definida en CONFIG.
+    Esta función toma una conexión de solo lectura del pool compartido POOL_BD, usando la
+    ruta definida en CONFIG, y la devuelve al pool al salir del bloque `with`.
     Es una función interna utilizada por otras funciones para obtener conexiones a la BDD.
+    La conexión pertenece al pool: quien la usa no debe cerrarla.
     
-    Returns:
+    Yields:
         Optional[sqlite3.Connection]: Objeto de conexión a la base de datos si es exitoso, 
         None si ocurre algún error durante la conexión.
         
     """
     try:
-        return sqlite3.connect(CONFIG["base_de_datos"])
+        conn = POOL_BD.adquirir()
     except Exception as e:
         st.error(f"error conectando a la base de datos: {e}")
-        return None
+        yield None
+        return
+    try:
+        yield conn
+    finally:
+        POOL_BD.devolver(conn)
+
+def version_datos() -> str:
+    """
+    Identificador de la versión de los datos de origen, usado como clave de las cachés
+    derivadas. Cambia cada vez que se modifica el archivo de la base de datos.
+    
+    Returns:
+        str: Cadena 'mtime-tamaño' del archivo de la base de datos, o '0' si no existe.
+    """
+    try:
+        info = os.stat(CONFIG["base_de_datos"])
+        return f"{info.st_mtime_ns}-{info.st_size}"
+    except OSError:
+        return "0"
+
+def _consultar_y_limpiar() -> pd.DataFrame:
+    """
+    Ejecuta el join entre ataques, tiburones y estado de conservación en SQLite y aplica
+    REGLAS_LIMPIEZA al resultado. Es el camino lento que reemplaza el snapshot.
+    
+    Returns:
+        pd.DataFrame: DataFrame limpio, o DataFrame vacío si no hay conexión o datos
+    """
+    with _conexion_bd() as conn:
+        if not conn:
+            return pd.DataFrame()
+        df = pd.read_sql_query(CONSULTA_DATOS.format(condicion=""), conn).drop(columns='id')
+    
+    if df.empty:
+        return df
+
+    return limpieza.limpiar_columnas(df, REGLAS_LIMPIEZA)
+
+def _hash_datos() -> str:
+    """Hash de la versión de la base de datos (version_datos) y de las reglas de limpieza que etiqueta el snapshot."""
+    # Los conjuntos de las reglas se ordenan: el orden de un set de cadenas cambia entre procesos
+    reglas = json.dumps(REGLAS_LIMPIEZA, sort_keys=True,
+                        default=lambda v: sorted(v, key=repr) if isinstance(v, (set, frozenset)) else repr(v))
+    return snapshot.hash_origen(version_datos(), reglas)
+
+def construir_snapshot() -> bool:
+    """
+    Construye el snapshot columnar (RUTA_SNAPSHOT) desde SQLite para la versión actual de la
+    base de datos.
+    
+    Returns:
+        bool: True si el snapshot se escribió
+    """
+    hash_actual = _hash_datos()
+    df = _consultar_y_limpiar()
+    if df.empty:
+        return False
+    return snapshot.escribir_snapshot(df, RUTA_SNAPSHOT, hash_actual)
+
+@st.cache_resource(show_spinner="cargando y limpiando datos...")
+def _carga_incremental() -> incremental.CargaIncremental:
+    """
+    Estado de la carga incremental compartido por todas las sesiones del proceso. La primera
+    carga usa el snapshot columnar (RUTA_SNAPSHOT) si su hash coincide con la versión actual
+    de la bbdd; si no, consulta y limpia todo y escribe el snapshot para los siguientes arranques.
+    
+    Returns:
+        incremental.CargaIncremental: Estado con el DataFrame limpio y su marca de agua
+    """
+    carga = incremental.CargaIncremental(CONSULTA_DATOS, REGLAS_LIMPIEZA, COLUMNAS_FRECUENCIA,
+                                         ruta_poda=CONFIG["base_de_datos"])
+    version = version_datos()
+    with _conexion_bd() as conn:
+        if not conn:
+            return carga
+        df = snapshot.leer_snapshot(RUTA_SNAPSHOT, _hash_datos())
+        carga.cargar_completo(conn, df)
+    carga.version_verificada = version
+    # Tras podar registro_cambios la version del archivo cambia: el hash se calcula despues de la carga
+    if df is None and not carga.df.empty:
+        snapshot.escribir_snapshot(carga.df, RUTA_SNAPSHOT, _hash_datos())
+    return carga
+
+def _carga_vigente() -> incremental.CargaIncremental:
+    """
+    Estado de la carga incremental al día con la bbdd. La marca de agua solo se consulta
+    (MAX(id), COUNT(*) y registro_cambios) cuando version_datos() cambió desde la última
+    verificación; en los demás casos no se toca la base de datos.
+    
+    Returns:
+        incremental.CargaIncremental: Estado compartido del proceso
+    """
+    carga = _carga_incremental()
+    version = version_datos()
+    if carga.version_verificada != version:
+        with _conexion_bd() as conn:
+            if conn:
+                carga.actualizar(conn)
+                carga.version_verificada = version
+    return carga
 
-@st.cache_data(show_spinner="cargando y limpiando datos...")
 def load_and_clean_data() -> pd.DataFrame:
     """
     Realiza las siguientes operaciones principales:
-    1. Conecta a la bbdd y ejecuta una consulta joint entre tablas de ataques, tiburones y estado de conservación
-    2. Aplica transformaciones y limpieza a las columnas:
+    1. En la primera llamada del proceso carga el DataFrame completo, desde el snapshot columnar
+       (RUTA_SNAPSHOT) si su hash coincide con el contenido actual de la bbdd, o si no con la
+       consulta joint entre tablas de ataques, tiburones y estado de conservación
+    2. Aplica transformaciones y limpieza a las columnas en una sola pasada vectorizada (REGLAS_LIMPIEZA):
        - Normaliza valores fatales usando FATAL_MAPPING
        - Normaliza géneros usando SEX_MAPPING
        - Limpia y estandariza actividades, fases lunares y estaciones
        - Convierte y valida edades, filtrando valores fuera de rango [0, 100]
-    3. Cachea los resultados para mejorar rendimiento en aplicaciones Streamlit
+       - Representa las columnas categóricas como pd.Categorical y la edad como float32
+    3. En las llamadas siguientes, solo si cambió version_datos(), compara la marca de agua
+       (mayor id y registro_cambios) con la bbdd y solo consulta y limpia las filas nuevas o
+       modificadas, que se agregan al DataFrame en memoria (ver incremental.CargaIncremental)
     
     Returns:
-        pd.DataFrame: DataFrame con los datos limpios y normalizados, o DataFrame vacío si hay error.
+        pd.DataFrame: Vista superficial (sin copiar datos) del DataFrame con los datos limpios
+        y normalizados, o DataFrame vacío si hay error. Se pueden añadir columnas, pero no
+        modificar las existentes en su lugar.
         
     """
     try:
-        conn = _conectar_bd()
-        if not conn:
-            return pd.DataFrame()
-            
-        query = f"""
-        SELECT 
-            a.is_fatal, 
-            a.activity, 
-            a.moon_phase, 
-            a.age, 
-            a.sex, 
-            a.season, 
-            a.country, 
-            a.species,
-            s.conservation_status,
-            cs.cat as conservation_description
-        FROM {CONFIG['tabla_ataques']} a
-        LEFT JOIN {CONFIG['tabla_tiburones']} s ON a.species = s.id
-        LEFT JOIN {CONFIG['tabla_conservacion']} cs ON s.conservation_status = cs.id_long
-        """
-        
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        return _carga_vigente().df.copy(deep=False)
         
-        if df.empty:
-            return df
+    except Exception as e:
+        st.error(f"error critico en carga de datos: {e}")
+        return pd.DataFrame()
 
-        df['is_fatal_cat'] = df['is_fatal'].map(FATAL_MAPPING).fillna('Desconocido')
-        df['sex'] = df['sex'].map(SEX_MAPPING).fillna('Desconocido')
-        
-        df['activity'] = df['activity'].astype(str).str.upper().str.strip()
-        df.loc[df['activity'].str.upper().isin(UNKNOWN_VALUES), 'activity'] = 'Desconocido'
-        df.loc[df['activity'].isna(), 'activity'] = 'Desconocido'
-        
-        df['moon_phase'] = df['moon_phase'].astype(str).str.upper().str.strip()
-        df.loc[df['moon_phase'].str.upper().isin(UNKNOWN_VALUES), 'moon_phase'] = 'Desconocido'
-        df.loc[df['moon_phase'].isna(), 'moon_phase'] = 'Desconocido'
-        
-        df['season'] = df['season'].astype(str).str.upper().str.strip()
-        df.loc[df['season'].str.upper().isin(UNKNOWN_VALUES), 'season'] = 'Desconocido'
-        df.loc[df['season'].isna(), 'season'] = 'Desconocido'
-        
+def _motor_sql(mascara: Optional[np.ndarray]) -> bool:
+    """Indica si una tabla de la versión actual se agrega en SQLite: sin máscara y con CONFIG['motor_agregacion'] 'sql'."""
+    motor = CONFIG["motor_agregacion"]
+    if motor not in ('pandas', 'sql'):
+        raise ValueError(f"motor de agregacion desconocido: {motor}")
+    return mascara is None and motor == 'sql'
+
+def frecuencias_actuales(columna: str, excluir_desconocido: bool = True,
+                         mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Tabla de frecuencias de una columna de COLUMNAS_FRECUENCIA tomada de los conteos que la
+    carga incremental mantiene al día, sin recorrer el DataFrame, o de frecuencias_sql si
+    CONFIG['motor_agregacion'] es 'sql'. Para otras columnas (o con una máscara de filtros)
+    se usa analizar_frecuencias.
+    
+    Args:
+        columna (str): Nombre de la columna categórica
+        excluir_desconocido (bool): Si True, excluye la categoría 'Desconocido' del análisis
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros; None usa todas las filas
+    
+    Returns:
+        pd.DataFrame: Mismo formato que analizar_frecuencias
+    """
+    if _motor_sql(mascara):
+        return frecuencias_sql(columna, excluir_desconocido)
+    carga = _carga_vigente()
+    tabla = carga.frecuencias(columna, excluir_desconocido) if mascara is None else None
+    if tabla is None:
+        return analizar_frecuencias(carga.df, columna, excluir_desconocido, mascara=mascara)
+    return tabla
+
+def metricas_carga() -> Dict[str, Any]:
+    """Marca de agua y número de cargas completas, incrementales y sin cambios del proceso."""
+    return _carga_incremental().metricas()
+
+def grupos_edad(edad: pd.Series) -> pd.Series:
+    """
+    Agrupa la edad en los intervalos BINS_EDAD con las etiquetas ETIQUETAS_EDAD.
+    
+    Args:
+        edad (pd.Series): Columna de edad
+    
+    Returns:
+        pd.Series: Columna categórica con el grupo de edad (nulo si la edad es nula)
+    """
+    return pd.cut(edad, bins=BINS_EDAD, labels=ETIQUETAS_EDAD, right=False)
+
+def cache_por_version(cache=st.cache_data, **opciones):
+    """
+    Decorador para los análisis que admiten una máscara del explorador de filtros. La función
+    decorada recibe `mascara` como último parámetro y calcula sobre las filas seleccionadas
+    (None para todas). Sin máscara, el resultado se guarda con `cache` (st.cache_data o
+    st.cache_resource) bajo la versión de datos actual y el resto de argumentos; con máscara
+    se calcula en cada llamada, sin caché.
+    
+    Args:
+        cache: Decorador de caché de Streamlit para el cálculo sin máscara
+        **opciones: Opciones del decorador de caché (max_entries, show_spinner, ...)
+    
+    Returns:
+        Callable: Decorador que conserva la firma de la función
+    """
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+
+        def por_version(version: str, *args):
+            return funcion(*args, mascara=None)
+        # Streamlit identifica cada caché por módulo, nombre calificado y código fuente:
+        # sin un nombre propio todas las funciones decoradas compartirían la misma caché
+        por_version.__module__ = funcion.__module__
+        por_version.__qualname__ = f"{funcion.__qualname__}.por_version"
+        en_cache = cache(**opciones)(por_version)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            mascara = argumentos.arguments.pop('mascara')
+            if mascara is not None:
+                return funcion(*argumentos.args, mascara=mascara)
+            return en_cache(version_datos(), *argumentos.args)
+        return envoltura
+    return decorador
+
+def _construir_cubo(df: pd.DataFrame) -> cubo.CuboConteos:
+    """Cubo de conteos sobre DIMENSIONES_CUBO de un DataFrame limpio (añade grupo_edad)."""
+    df = df.assign(grupo_edad=grupos_edad(df['age']))
+    return cubo.CuboConteos.desde_dataframe(df, DIMENSIONES_CUBO)
+
+@cache_por_version(st.cache_resource, max_entries=2, show_spinner=False)
+def obtener_cubo(mascara: Optional[np.ndarray] = None) -> cubo.CuboConteos:
+    """
+    Devuelve el cubo de conteos de la versión actual de los datos. Sus métodos frecuencias y
+    tablas_doble_entrada devuelven lo mismo que analizar_frecuencias y
+    crear_tablas_doble_entrada sobre el DataFrame completo, sumando el cubo en lugar de
+    recorrer las filas.
+    
+    Args:
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros (ver cache_por_version)
+    
+    Returns:
+        cubo.CuboConteos: Cubo sobre DIMENSIONES_CUBO (incluye grupo_edad)
+    """
+    return _construir_cubo(aplicar_mascara(load_and_clean_data(), mascara))
+
+@cache_por_version(max_entries=2, show_spinner="calculando pruebas de independencia...")
+def pruebas_independencia(mascara: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Chi-cuadrado, V de Cramér, residuos estandarizados ajustados y, con celdas pequeñas,
+    prueba exacta de Fisher para cada par de variables de DIMENSIONES_CUBO (actividad, país,
+    grupo de edad, estación y fatalidad), a partir del cubo de conteos. Complementa las
+    tablas descriptivas de crear_tablas_doble_entrada.
+    
+    Args:
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros (ver cache_por_version)
+    
+    Returns:
+        Dict[str, Any]: Diccionario con:
+            - 'resumen': pd.DataFrame con una fila por par de variables
+            - 'residuos': residuos por celda de cada par ('variable 1 x variable 2')
+    """
+    return pruebas.pruebas_por_pares(obtener_cubo(mascara))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _indice_filtros(version: str) -> filtros.IndiceBitmaps:
+    """
+    Bitmaps del explorador de filtros sobre DIMENSIONES_FILTRO y RANGOS_FILTRO, construidos
+    una sola vez por versión de datos.
+    
+    Args:
+        version (str): Versión de los datos de origen (version_datos), clave de la caché
+    
+    Returns:
+        filtros.IndiceBitmaps: Índice alineado con las filas de load_and_clean_data
+    """
+    return filtros.IndiceBitmaps.desde_dataframe(load_and_clean_data(), DIMENSIONES_FILTRO, RANGOS_FILTRO)
+
+def obtener_indice_filtros() -> filtros.IndiceBitmaps:
+    """Índice de bitmaps del explorador de filtros para la versión actual de los datos."""
+    return _indice_filtros(version_datos())
+
+@st.cache_resource(max_entries=2, show_spinner="indexando coordenadas...")
+def _indice_geografico(version: str) -> geoespacial.IndiceMalla:
+    """
+    Índice espacial (quadtree por orden de Morton) de las coordenadas de geo_point, con los
+    clusters de cada nivel de zoom precalculados, construido una sola vez por versión de datos.
+    
+    Args:
+        version (str): Versión de los datos de origen (version_datos), clave de la caché
+    
+    Returns:
+        geoespacial.IndiceMalla: Índice alineado con las filas de load_and_clean_data
+    """
+    return geoespacial.IndiceMalla.desde_dataframe(load_and_clean_data())
+
+def obtener_indice_geografico() -> geoespacial.IndiceMalla:
+    """Índice espacial de los incidentes para la versión actual de los datos."""
+    return _indice_geografico(version_datos())
+
+@st.cache_data(max_entries=16, show_spinner="buscando hotspots...")
+def _hotspots_por_version(version: str, radio_km: float, minimo: int, especies: tuple,
+                          fatalidad: Optional[str]) -> pd.DataFrame:
+    """
+    Hotspots de una versión de datos y una combinación de parámetros y filtros; cada
+    combinación se calcula una sola vez por versión.
+    
+    Args:
+        version (str): Versión de los datos de origen (version_datos), clave de la caché
+        radio_km (float): Radio de vecindad en kilómetros
+        minimo (int): Ataques dentro del radio para formar un hotspot
+        especies (tuple): Especies a considerar (vacío para todas)
+        fatalidad (Optional[str]): 'Fatal' o 'No Fatal' para considerar solo esos ataques
+    
+    Returns:
+        pd.DataFrame: Resumen por hotspot (ver hotspots.resumir_hotspots)
+    """
+    df = load_and_clean_data()
+    if df.empty:
+        return pd.DataFrame()
+    
+    seleccion = df['latitud'].notna() & df['longitud'].notna()
+    if especies:
+        seleccion &= df['species'].isin(especies)
+    if fatalidad:
+        seleccion &= df['is_fatal_cat'].eq(fatalidad)
+    puntos = df[seleccion]
+    
+    etiquetas = hotspots.dbscan_esferico(puntos['latitud'].to_numpy(), puntos['longitud'].to_numpy(), radio_km, minimo)
+    return hotspots.resumir_hotspots(puntos, etiquetas, lugares=LUGARES_HOTSPOT)
+
+def obtener_hotspots(radio_km: float = 10.0, minimo: int = 5, especies: Optional[list] = None,
+                     fatalidad: Optional[str] = None) -> pd.DataFrame:
+    """
+    Zonas de concentración de ataques: grupos de al menos `minimo` ataques a menos de
+    `radio_km` kilómetros unos de otros (DBSCAN sobre la esfera con KD-tree, ver hotspots.py),
+    sobre las coordenadas de geo_point de la versión actual de los datos.
+    
+    Args:
+        radio_km (float): Radio de vecindad en kilómetros
+        minimo (int): Ataques dentro del radio para formar un hotspot
+        especies (Optional[list]): Especies a considerar; None o vacío para todas
+        fatalidad (Optional[str]): 'Fatal' o 'No Fatal'; None para todos los ataques
+    
+    Returns:
+        pd.DataFrame: Una fila por hotspot con centro, radio, casos, fatalidad y comuna,
+        provincia y país más frecuentes, ordenado por casos
+    """
+    return _hotspots_por_version(version_datos(), float(radio_km), int(minimo),
+                                 tuple(sorted(especies or ())), fatalidad)
+
+@st.cache_resource(max_entries=2, show_spinner="preparando series temporales...")
+def _serie_temporal(version: str) -> temporal.SerieTemporal:
+    """
+    Fechas, horas y franjas horarias de los ataques codificadas como enteros (ver
+    temporal.SerieTemporal), construidas una sola vez por versión de datos.
+    
+    Args:
+        version (str): Versión de los datos de origen (version_datos), clave de la caché
+    
+    Returns:
+        temporal.SerieTemporal: Serie alineada con las filas de load_and_clean_data
+    """
+    df = load_and_clean_data()
+    df = df.assign(franja_dia=temporal.franja_dia(df['hora'], df['momento_dia'], df['parte_dia']))
+    return temporal.SerieTemporal.desde_dataframe(df)
+
+def obtener_serie_temporal() -> temporal.SerieTemporal:
+    """Serie temporal de los ataques para la versión actual de los datos."""
+    return _serie_temporal(version_datos())
+
+def _agregar_series(serie: temporal.SerieTemporal, ventana: int, desde: Optional[int],
+                    mascara: Optional[np.ndarray]) -> Dict[str, Any]:
+    """Agregados de series_temporales sobre una serie y una máscara."""
+    mensual = serie.mensual(mascara)
+    anual = serie.anual(mascara)
+    if desde is not None:
+        mensual = mensual[mensual.index.year >= desde]
+        anual = anual[anual.index >= desde]
+    mensual = mensual.assign(media_movil=temporal.media_movil(mensual['ataques'], ventana).round(2))
+    anual = anual.assign(media_movil=temporal.media_movil(anual['ataques'], ventana).round(2))
+    descomposicion = temporal.descomponer(mensual['ataques'])
+    return {
+        'mensual': mensual,
+        'anual': anual,
+        'descomposicion': descomposicion,
+        'fuerza_estacional': temporal.fuerza_estacional(descomposicion),
+        'horas': serie.por_hora(mascara),
+        'franjas': serie.por_franja(mascara),
+        'dias_semana': serie.por_dia_semana(mascara)
+    }
+
+@cache_por_version(max_entries=16, show_spinner="calculando series temporales...")
+def series_temporales(ventana: int = 12, desde: Optional[int] = None,
+                      mascara: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Análisis temporal de los ataques a partir de date y time: remuestreo mensual y anual con
+    media móvil, descomposición estacional de la serie mensual e histogramas por hora, franja
+    horaria y día de la semana.
+    
+    Args:
+        ventana (int): Periodos (meses o años) de la media móvil centrada
+        desde (Optional[int]): Primer año de las series mensual y anual y de la descomposición
+            (None para todo el rango de fechas)
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros (ver cache_por_version)
+    
+    Returns:
+        Dict[str, Any]: Diccionario con:
+            - 'mensual' y 'anual': pd.DataFrame con ataques, fatales, tasa de fatalidad y media móvil
+            - 'descomposicion': pd.DataFrame con observado, tendencia, estacional y residuo por mes
+            - 'fuerza_estacional': float entre 0 y 1
+            - 'horas', 'franjas' y 'dias_semana': pd.DataFrame con ataques, fatales y tasa de fatalidad
+    """
+    return _agregar_series(obtener_serie_temporal(), int(ventana), desde, mascara)
+
+@cache_por_version(max_entries=2, show_spinner="analizando el ciclo lunar...")
+def analisis_lunar(mascara: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Posición de los ataques en el ciclo lunar: según moon_phase_rate y moon_phase cuando
+    están registrados y, si no, según la fecha del ataque. Incluye el histograma de la
+    iluminación, los ataques por fase, la dirección media y la prueba de Rayleigh de todos los
+    ataques, de los fatales y de los no fatales, y la comparación entre fatales y no fatales
+    (ver lunar.analizar_ciclo).
+    
+    Args:
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros (ver cache_por_version)
+    
+    Returns:
+        Dict[str, Any]: 'resumen', 'iluminacion', 'fases', 'comparacion' y 'origen'
+    """
+    return lunar.analisis_desde_dataframe(aplicar_mascara(load_and_clean_data(), mascara))
+
+def aplicar_mascara(_df: pd.DataFrame, mascara: Optional[np.ndarray]) -> pd.DataFrame:
+    """
+    Filas de _df seleccionadas por una máscara del explorador de filtros.
+    
+    Args:
+        _df (pd.DataFrame): DataFrame limpio de la misma versión con la que se construyó la máscara
+        mascara (Optional[np.ndarray]): Arreglo booleano por fila (posicional); None no filtra
+    
+    Returns:
+        pd.DataFrame: DataFrame filtrado (o el mismo DataFrame si no hay máscara)
+    """
+    if mascara is None:
+        return _df
+    if len(mascara) != len(_df):
+        raise ValueError(f"la mascara tiene {len(mascara)} filas y el DataFrame {len(_df)}")
+    return _df[mascara]
+
+def huella_mascara(mascara: Optional[np.ndarray]) -> Optional[str]:
+    """Resumen (hash de los bits empaquetados) de una máscara de filtros, para usarla como clave de caché."""
+    if mascara is None:
+        return None
+    return hashlib.blake2b(np.packbits(mascara).tobytes(), digest_size=16).hexdigest()
+
+def mascara_filtros(valores: Optional[Dict[str, list]] = None, rangos: Optional[Dict[str, tuple]] = None,
+                    combinar: str = 'y') -> Optional[np.ndarray]:
+    """
+    Máscara de selección sobre las filas de load_and_clean_data, resuelta con operaciones de
+    bits sobre el índice de la versión actual (ver filtros.IndiceBitmaps.mascara).
+    
+    Args:
+        valores (Optional[Dict[str, list]]): Categorías elegidas por columna de DIMENSIONES_FILTRO
+        rangos (Optional[Dict[str, tuple]]): Rango (desde, hasta) por columna de RANGOS_FILTRO
+        combinar (str): 'y' (todas las condiciones) u 'o' (cualquiera)
+    
+    Returns:
+        Optional[np.ndarray]: Máscara booleana, o None si no hay condiciones
+    """
+    return obtener_indice_filtros().mascara(valores, rangos, combinar)
+
+def explorador_filtros() -> Optional[np.ndarray]:
+    """
+    Dibuja en la barra lateral el explorador de filtros (país, especie, actividad, estación,
+    fase lunar, sexo, rango de edad y rango de años) y devuelve la máscara de la selección.
+    Los rangos solo filtran cuando no cubren todos los valores, de modo que sin cambios no se
+    excluyen las filas con edad o año nulos.
+    
+    Returns:
+        Optional[np.ndarray]: Máscara booleana alineada con load_and_clean_data, o None si no
+        hay ningún filtro activo
+    """
+    indice = obtener_indice_filtros()
+    etiquetas = {
+        'country': "País", 'species': "Especie", 'activity': "Actividad", 'season': "Estación",
+        'moon_phase': "Fase lunar", 'sex': "Sexo", 'age': "Edad", 'year': "Año"
+    }
+    
+    with st.sidebar:
+        st.header("Explorador de filtros")
+        valores = {
+            columna: st.multiselect(etiquetas[columna], indice.valores(columna), key=f"filtro_{columna}")
+            for columna in DIMENSIONES_FILTRO
+        }
         
-        df['age'] = pd.to_numeric(df['age'], errors='coerce')
-        df['age'] = df['age'].apply(lambda x: x if pd.notna(x) and 0 <= x <= 100 else np.nan)
+        rangos = {}
+        for columna in RANGOS_FILTRO:
+            limites = indice.limites(columna)
+            if limites is None:
+                continue
+            minimo, maximo = int(limites[0]), int(limites[1])
+            desde, hasta = st.slider(etiquetas[columna], minimo, maximo, (minimo, maximo), key=f"filtro_{columna}")
+            if (desde, hasta) != (minimo, maximo):
+                rangos[columna] = (desde, hasta)
         
-        return df
+        combinar = st.radio("Combinar filtros", ['y', 'o'], horizontal=True, key="filtro_combinar",
+                            format_func=lambda c: "Todos (Y)" if c == 'y' else "Cualquiera (O)")
         
-    except Exception as e:
-        st.error(f"error critico en carga de datos: {e}")
+        mascara = indice.mascara(valores, rangos, combinar)
+        if mascara is not None:
+            st.caption(f"{int(mascara.sum())} de {indice.n_filas} casos seleccionados")
+    
+    return mascara
+
+
+def _expresion_sql(columna: str) -> Optional[str]:
+    """Expresión SQL limpia de una columna de REGLAS_LIMPIEZA, o None si no se puede agrupar en SQL."""
+    regla = REGLAS_LIMPIEZA.get(columna)
+    if regla is None or regla.get('tipo', 'texto') != 'texto':
+        return None
+    origen = ORIGENES_SQL.get(regla.get('origen', columna))
+    return limpieza.expresion_sql(origen, regla) if origen else None
+
+def _desde_join() -> str:
+    """Cláusula FROM con el join de CONSULTA_DATOS."""
+    return CONSULTA_DATOS[CONSULTA_DATOS.index("FROM"):CONSULTA_DATOS.index("{condicion}")]
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _conteos_sql(columnas: tuple, version: str) -> pd.DataFrame:
+    """
+    Agrupa en SQLite por las expresiones limpias de una o dos columnas y devuelve solo las
+    filas agregadas. Con dos columnas se excluyen nulos y 'Desconocido', igual que
+    frecuencias.conteos_cruzados.
+    
+    Args:
+        columnas (tuple): Una o dos columnas de REGLAS_LIMPIEZA
+        version (str): Versión de los datos de origen, clave de la caché
+    
+    Returns:
+        pd.DataFrame: Una columna por variable más 'cantidad'
+    """
+    expresiones = [_expresion_sql(c) for c in columnas]
+    seleccion = ", ".join(f'{e} AS "{c}"' for e, c in zip(expresiones, columnas))
+    condicion = ""
+    if len(columnas) > 1:
+        condicion = "WHERE " + " AND ".join(f"{e} IS NOT NULL AND {e} != 'Desconocido'" for e in expresiones)
+    grupos = ", ".join(str(i + 1) for i in range(len(columnas)))
+    consulta = f"SELECT {seleccion}, COUNT(*) AS cantidad {_desde_join()} {condicion} GROUP BY {grupos}"
+    
+    with _conexion_bd() as conn:
+        if not conn:
+            return pd.DataFrame()
+        return pd.read_sql_query(consulta, conn)
+
+def tablas_doble_entrada_actuales(fila: str, columna: str,
+                                  mascara: Optional[np.ndarray] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Tablas de doble entrada de dos columnas de la versión actual: del cubo de conteos
+    (obtener_cubo), o de tablas_doble_entrada_sql si CONFIG['motor_agregacion'] es 'sql' y
+    no hay máscara de filtros.
+    
+    Args:
+        fila (str): Columna de DIMENSIONES_CUBO para las filas de la tabla
+        columna (str): Columna de DIMENSIONES_CUBO para las columnas de la tabla
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros; None usa todas las filas
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Mismo formato que crear_tablas_doble_entrada
+    """
+    if _motor_sql(mascara) and fila in REGLAS_LIMPIEZA and columna in REGLAS_LIMPIEZA:
+        return tablas_doble_entrada_sql(fila, columna)
+    return obtener_cubo(mascara).tablas_doble_entrada(fila, columna)
+
+def frecuencias_sql(columna: str, excluir_desconocido: bool = True) -> pd.DataFrame:
+    """
+    Tabla de frecuencias de una columna sobre la tabla completa de la bbdd, agrupando en
+    SQLite con la traducción SQL de su regla de limpieza: solo las filas agregadas llegan a
+    pandas. No recibe DataFrame: para datos filtrados usar analizar_frecuencias. Las columnas
+    sin traducción SQL (derivadas o no textuales) se cuentan en pandas sobre load_and_clean_data.
+    
+    Args:
+        columna (str): Columna de REGLAS_LIMPIEZA
+        excluir_desconocido (bool): Si True, excluye la categoría 'Desconocido' del análisis
+    
+    Returns:
+        pd.DataFrame: Mismo formato que analizar_frecuencias sobre el DataFrame completo
+    """
+    if _expresion_sql(columna) is None:
+        return analizar_frecuencias(load_and_clean_data(), columna, excluir_desconocido)
+    
+    conteos = _conteos_sql((columna,), version_datos())
+    if conteos.empty:
         return pd.DataFrame()
+    etiquetas = pd.Index(conteos[columna].to_numpy(dtype=object), dtype=object)
+    serie = pd.Series(conteos['cantidad'].to_numpy(), index=etiquetas.where(etiquetas.notna(), np.nan))
+    return frecuencias.tabla_frecuencias(serie.sort_index(na_position='last'), excluir_desconocido)
+
+def tablas_doble_entrada_sql(fila: str, columna: str) -> Dict[str, pd.DataFrame]:
+    """
+    Tablas de doble entrada de dos columnas sobre la tabla completa de la bbdd, con un
+    GROUP BY de ambas columnas limpias en SQLite. No recibe DataFrame: para datos filtrados
+    usar crear_tablas_doble_entrada. Si alguna columna no tiene traducción SQL se cuenta en
+    pandas sobre load_and_clean_data.
+    
+    Args:
+        fila (str): Columna de REGLAS_LIMPIEZA para las filas de la tabla
+        columna (str): Columna de REGLAS_LIMPIEZA para las columnas de la tabla
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Mismo formato que crear_tablas_doble_entrada sobre el DataFrame completo
+    """
+    if _expresion_sql(fila) is None or _expresion_sql(columna) is None:
+        return crear_tablas_doble_entrada(load_and_clean_data(), fila, columna)
+    
+    conteos = _conteos_sql((fila, columna), version_datos())
+    if conteos.empty:
+        return {}
+    tabla = conteos.pivot_table(index=fila, columns=columna, values='cantidad', aggfunc='sum', fill_value=0)
+    tabla.index = pd.Index(tabla.index.astype(object), name=fila)
+    tabla.columns = pd.Index(tabla.columns.astype(object), name=columna)
+    return frecuencias.tablas_doble_entrada(tabla.sort_index(axis=0).sort_index(axis=1).astype(np.int64))
 
-def analizar_frecuencias(_df: pd.DataFrame, columna: str, excluir_desconocido: bool = True) -> pd.DataFrame:
+def analizar_frecuencias(_df: pd.DataFrame, columna: str, excluir_desconocido: bool = True,
+                         mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
     """
     Calcula distribuciones de frecuencia absoluta y relativa para una columna determinada,
     permitiendo excluir valores desconocidos para focarse en datos válidos. Es útil para
     entender la distribución de variables como actividad, país, especie, etc.
     
+    El conteo se hace con np.bincount sobre los códigos de la columna categórica, sin
+    comparar cadenas de texto fila a fila. Para contar la tabla completa en SQLite ver
+    frecuencias_sql.
+    
     Args:
         _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
         columna (str): Nombre de la columna categórica a analizar
         excluir_desconocido (bool): Si True, excluye la categoría 'Desconocido' del análisis
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros sobre las filas de _df
     
     Returns:
         pd.DataFrame: DataFrame con columnas:
@@ -138,26 +867,11 @@ def analizar_frecuencias(_df: pd.DataFrame, columna: str, excluir_desconocido: b
     if columna not in _df.columns:
         return pd.DataFrame()
 
-    df_filtrado = _df[_df[columna] != 'Desconocido'] if excluir_desconocido else _df
-
-    if df_filtrado.empty:
-        return pd.DataFrame()
-
-    # Frecuencias basicas
-    frecuencias = df_filtrado[columna].value_counts(dropna=False)
-    total = frecuencias.sum()
-
-    # Crear dataframe base
-    resultado = pd.DataFrame({
-        'Categoria': frecuencias.index,
-        'Frecuencia Absoluta': frecuencias.values,
-        'Frecuencia Relativa': (frecuencias.values / total).round(4),
-        'Frecuencia Relativa %': (frecuencias.values / total * 100).round(2)
-    }).sort_values('Frecuencia Absoluta', ascending=False).reset_index(drop=True)
-
-    return resultado
+    serie = aplicar_mascara(_df[columna], mascara)
+    return frecuencias.tabla_frecuencias(frecuencias.conteos_columna(serie), excluir_desconocido)
 
-def crear_tablas_doble_entrada(_df: pd.DataFrame, fila: str, columna: str) -> Dict[str, pd.DataFrame]:
+def crear_tablas_doble_entrada(_df: pd.DataFrame, fila: str, columna: str,
+                               mascara: Optional[np.ndarray] = None) -> Dict[str, pd.DataFrame]:
     """
     Genera cuatro tipos de tablas para analizar la relación entre dos variables:
     1. Frecuencias absolutas
@@ -165,10 +879,15 @@ def crear_tablas_doble_entrada(_df: pd.DataFrame, fila: str, columna: str) -> Di
     3. Distribuciones condicionales por filas (cada fila suma 100%)
     4. Distribuciones condicionales por columnas (cada columna suma 100%)
     
+    La tabla absoluta se obtiene con un único np.bincount sobre los códigos combinados
+    (fila * n_columnas + columna) de ambas variables categóricas. Para contar la tabla
+    completa en SQLite ver tablas_doble_entrada_sql.
+    
     Args:
         _df (pd.DataFrame): DataFrame con los datos de ataques
         fila (str): Nombre de la variable para las filas de la tabla
         columna (str): Nombre de la variable para las columnas de la tabla
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros sobre las filas de _df
     
     Returns:
         Dict[str, pd.DataFrame]: Diccionario con cuatro tablas y sus explicaciones:
@@ -181,123 +900,261 @@ def crear_tablas_doble_entrada(_df: pd.DataFrame, fila: str, columna: str) -> Di
     if fila not in _df.columns or columna not in _df.columns:
         return {}
 
-    df_filtrado = _df[(_df[fila] != 'Desconocido') & (_df[columna] != 'Desconocido')].copy()
-
-    if df_filtrado.empty:
-        return {}
+    seleccion = aplicar_mascara(_df[[fila, columna]], mascara)
+    return frecuencias.tablas_doble_entrada(frecuencias.conteos_cruzados(seleccion[fila], seleccion[columna]))
 
-    # Tabla absoluta basica
-    tabla_absoluta = pd.crosstab(df_filtrado[fila], df_filtrado[columna], margins=True, margins_name="Total")
-    total_general = tabla_absoluta.loc['Total', 'Total']
 
-    # Distribuciones porcentuales
-    tabla_porcentaje_total = (tabla_absoluta / total_general * 100).round(2)
-
-    # Distribuciones condicionales por filas (cada fila suma 100%)
-    tabla_condicional_filas = tabla_absoluta.copy().drop('Total', axis=1).drop('Total', axis=0)
-    tabla_condicional_filas = tabla_condicional_filas.div(tabla_condicional_filas.sum(axis=1), axis=0) * 100
-    tabla_condicional_filas = tabla_condicional_filas.round(2)
-
-    # Distribuciones condicionales por columnas (cada columna suma 100%)
-    tabla_condicional_columnas = tabla_absoluta.copy().drop('Total', axis=1).drop('Total', axis=0)
-    tabla_condicional_columnas = tabla_condicional_columnas.div(tabla_condicional_columnas.sum(axis=0), axis=1) * 100
-    tabla_condicional_columnas = tabla_condicional_columnas.round(2)
-
-    # Agregar totales a las tablas condicionales
-    tabla_condicional_filas['Total'] = 100.0
-    tabla_condicional_columnas.loc['Total'] = 100.0
+def bloques_limpios(bloque: int = 50_000, archivo: Optional[str] = None):
+    """
+    Recorre los datos en bloques de `bloque` filas y aplica REGLAS_LIMPIEZA a cada uno, sin
+    cargar todo el conjunto en memoria. Pensado para alimentar los acumuladores de frecuencias.
+    
+    Args:
+        bloque (int): Número de filas por bloque
+        archivo (Optional[str]): CSV con las columnas de CONSULTA_DATOS (por ejemplo, una
+            exportación del join); si se omite se lee de la base de datos
+    
+    Yields:
+        pd.DataFrame: Bloque limpio
+    """
+    # La conexion del pool se conserva mientras se recorren los bloques de la consulta
+    with (nullcontext() if archivo else _conexion_bd()) as conn:
+        if archivo:
+            lector = pd.read_csv(archivo, chunksize=bloque)
+        elif conn:
+            lector = pd.read_sql_query(CONSULTA_DATOS.format(condicion=""), conn, chunksize=bloque)
+        else:
+            return
+        
+        for trozo in lector:
+            trozo = trozo.drop(columns='id', errors='ignore')
+            if not trozo.empty:
+                yield limpieza.limpiar_columnas(trozo, REGLAS_LIMPIEZA)
 
-    return {
-        'absoluta': tabla_absoluta,
-        'porcentaje_total': tabla_porcentaje_total,
-        'condicional_filas': tabla_condicional_filas,
-        'condicional_columnas': tabla_condicional_columnas,
-        'explicacion': {
-            'absoluta': "Frecuencias absolutas de casos",
-            'porcentaje_total': "Porcentaje sobre el total general (base: 100% = total de casos)",
-            'condicional_filas': f"Distribución condicional de {columna} dado {fila} - cada fila suma 100%",
-            'condicional_columnas': f"Distribución condicional de {fila} dado {columna} - cada columna suma 100%"
-        }
-    }
+def acumular_por_bloques(acumuladores: list, bloque: int = 50_000, archivo: Optional[str] = None) -> list:
+    """
+    Actualiza varios acumuladores (frecuencias.AcumuladorFrecuencias o
+    frecuencias.AcumuladorContingencia) en una sola pasada por los bloques de datos.
+    
+    Args:
+        acumuladores (list): Acumuladores a actualizar
+        bloque (int): Número de filas por bloque
+        archivo (Optional[str]): CSV de origen (ver bloques_limpios)
+    
+    Returns:
+        list: Los mismos acumuladores, ya actualizados; sus tablas se obtienen con result()
+    """
+    for trozo in bloques_limpios(bloque, archivo):
+        for acumulador in acumuladores:
+            acumulador.update(trozo)
+    return acumuladores
 
 
-def obtener_estadisticas_completas(_df: pd.DataFrame) -> Dict[str, Any]:
+def calcular_metricas_basicas(_df: pd.DataFrame) -> Dict[str, Any]:
     """
-    Calcula estadísticas descriptivas completas.
-      
+    Métricas generales: total de registros, conteos fatales y no fatales, tasa de fatalidad,
+    edad promedio y actividad más común.
+    
     Args:
         _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
     
     Returns:
-        Dict[str, Any]: Diccionario con tres componentes:
-            - 'metricas_basicas': Total registros, conteos fatales, tasa fatalidad, etc.
-            - 'estadisticas_edad': DataFrame con stats descriptivas por tipo de caso
-            - 'tasas_actividad': DataFrame con tasas de fatalidad por actividad ordenadas
-    
+        Dict[str, Any]: Diccionario con las métricas básicas
     """
     ataques_conocidos = _df['is_fatal_cat'].isin(['Fatal', 'No Fatal']).sum()
     tasa_fatalidad = (_df['is_fatal_cat'].eq('Fatal').sum() / ataques_conocidos * 100) if ataques_conocidos > 0 else 0
     
-    metricas_basicas = {
+    return {
         'total_registros': len(_df),
         'ataques_fatales': _df['is_fatal_cat'].eq('Fatal').sum(),
         'ataques_no_fatales': _df['is_fatal_cat'].eq('No Fatal').sum(),
         'tasa_fatalidad': tasa_fatalidad,
-        'edad_promedio': _df['age'].mean(),
+        'edad_promedio': _df['age'].astype('float64').mean(),
         'actividad_mas_comun': _df['activity'].mode().iloc[0] if not _df['activity'].mode().empty else 'N/A'
     }
+
+def calcular_estadisticas_edad(_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Media, mediana, moda, desviación, asimetría y curtosis de la edad para todos los casos,
+    los fatales y los no fatales, calculadas en una sola pasada (ver momentos.py).
     
-    estadisticas_edad = pd.DataFrame()
-    if 'age' in _df.columns and not _df['age'].isna().all():
-        def _calcular_stats(serie):
-            if serie.empty:
-                return {k: np.nan for k in ['Media', 'Mediana', 'Moda', 'Desviacion', 'Asimetria', 'Curtosis']}
-            
-            return {
-                'Media': serie.mean(),
-                'Mediana': serie.median(),
-                'Moda': serie.mode().iloc[0] if not serie.mode().empty else np.nan,
-                'Desviacion': serie.std(),
-                'Asimetria': stats.skew(serie) if len(serie) > 2 else np.nan,
-                'Curtosis': stats.kurtosis(serie) if len(serie) > 3 else np.nan
-            }
-        
-        df_edad = _df[~_df['age'].isna()].copy()
-        edad_total = df_edad['age'].dropna()
-        edad_fatal = df_edad[df_edad['is_fatal_cat'] == 'Fatal']['age'].dropna()
-        edad_no_fatal = df_edad[df_edad['is_fatal_cat'] == 'No Fatal']['age'].dropna()
-        
-        estadisticas_edad = pd.DataFrame({
-            'Todos los Casos': _calcular_stats(edad_total),
-            'Casos Fatales': _calcular_stats(edad_fatal),
-            'Casos No Fatales': _calcular_stats(edad_no_fatal)
-        }).round(2)
+    Args:
+        _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
     
-    tasas_actividad = pd.DataFrame()
-    df_actividad = _df[(_df['activity'] != 'Desconocido') & (_df['is_fatal_cat'].isin(['Fatal', 'No Fatal']))].copy()
+    Returns:
+        pd.DataFrame: Estadísticas por tipo de caso (columnas), o vacío si no hay edades
+    """
+    tabla = estadisticas_edad_por(_df, 'is_fatal_cat', total='Todos los Casos')
+    if tabla.empty:
+        return tabla
     
-    if not df_actividad.empty:
-        tabla_actividad = pd.crosstab(df_actividad['activity'], df_actividad['is_fatal_cat'])
-        tabla_actividad['Total'] = tabla_actividad.sum(axis=1)
-        tabla_actividad['Tasa Fatalidad %'] = (tabla_actividad['Fatal'] / tabla_actividad['Total'] * 100).round(2)
-        tasas_actividad = tabla_actividad.sort_values('Tasa Fatalidad %', ascending=False)
+    return pd.DataFrame({
+        'Todos los Casos': tabla['Todos los Casos'],
+        'Casos Fatales': tabla.get('Fatal', pd.Series(np.nan, index=tabla.index)),
+        'Casos No Fatales': tabla.get('No Fatal', pd.Series(np.nan, index=tabla.index))
+    })
+
+def estadisticas_edad_por(_df: pd.DataFrame, columna: str, total: Optional[str] = 'Todos los Casos',
+                          mascara: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Estadísticas descriptivas de la edad para cada categoría de una columna de agrupación
+    (is_fatal_cat, sex, season, country, ...), con un solo recorrido de los datos.
     
-    return {
-        'metricas_basicas': metricas_basicas,
-        'estadisticas_edad': estadisticas_edad,
-        'tasas_actividad': tasas_actividad
-    }
+    Args:
+        _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
+        columna (str): Columna de agrupación
+        total (Optional[str]): Nombre de la columna con todos los casos; None para omitirla
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros sobre las filas de _df
+    
+    Returns:
+        pd.DataFrame: Una fila por estadístico y una columna por categoría, redondeado a 2
+        decimales, o vacío si no hay edades
+    """
+    _df = aplicar_mascara(_df, mascara)
+    if 'age' not in _df.columns or columna not in _df.columns or _df['age'].isna().all():
+        return pd.DataFrame()
+    
+    rango = REGLAS_LIMPIEZA['age']['rango']
+    return momentos.estadisticas_agrupadas(_df['age'], _df[columna], rango=rango, total=total).round(2)
 
+def calcular_tasas_actividad(_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tabla de actividad por fatalidad con la tasa de fatalidad de cada actividad.
+    
+    Args:
+        _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
+    
+    Returns:
+        pd.DataFrame: Conteos y 'Tasa Fatalidad %' por actividad, ordenados de mayor a menor tasa
+    """
+    tablas_actividad = crear_tablas_doble_entrada(_df, 'activity', 'is_fatal_cat')
+    if not tablas_actividad:
+        return pd.DataFrame()
+    
+    tabla_actividad = tablas_actividad['absoluta'].drop('Total', axis=0)
+    tabla_actividad['Tasa Fatalidad %'] = (tabla_actividad['Fatal'] / tabla_actividad['Total'] * 100).round(2)
+    return tabla_actividad.sort_values('Tasa Fatalidad %', ascending=False)
+
+def calcular_intervalos_fatalidad(_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Tasa de fatalidad por categoría de cada variable de DIMENSIONES_TASAS con intervalos de
+    confianza al 95% de Wilson, Clopper-Pearson y bootstrap (CONFIG['replicas_bootstrap']
+    réplicas con la semilla CONFIG['semilla_bootstrap'], en CONFIG['procesos_bootstrap']
+    procesos). Los conteos salen de un cubo sobre _df.
+    
+    Args:
+        _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Por variable, casos, tasa e intervalos en porcentaje por
+        categoría, ordenados por el límite inferior de Wilson
+    """
+    cubo_df = _construir_cubo(_df)
+    tablas = {d: cubo_df.conteos_cruzados(d, 'is_fatal_cat') for d in DIMENSIONES_TASAS}
+    return intervalos.intervalos_fatalidad(
+        tablas,
+        replicas=CONFIG["replicas_bootstrap"],
+        semilla=CONFIG["semilla_bootstrap"],
+        procesos=CONFIG["procesos_bootstrap"]
+    )
+
+@st.cache_data(max_entries=16, show_spinner="calculando intervalos de confianza...")
+def _intervalos_por_seleccion(version: str, huella: str, _mascara: np.ndarray) -> Dict[str, pd.DataFrame]:
+    """
+    Intervalos de calcular_intervalos_fatalidad sobre una selección del explorador de filtros,
+    calculados una sola vez por versión de datos y selección.
+    
+    Args:
+        version (str): Versión de los datos de origen (version_datos), clave de la caché
+        huella (str): Huella de la máscara (huella_mascara), clave de la caché
+        _mascara (np.ndarray): Máscara de la selección (no se usa como clave)
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Ver calcular_intervalos_fatalidad
+    """
+    return calcular_intervalos_fatalidad(aplicar_mascara(load_and_clean_data(), _mascara))
+
+def intervalos_seleccion(mascara: np.ndarray) -> Dict[str, pd.DataFrame]:
+    """
+    Tasas de fatalidad con intervalos de confianza de las filas seleccionadas en el explorador
+    de filtros, en caché por versión de datos y huella de la máscara para no repetir el
+    bootstrap en cada rerun con la misma selección.
+    
+    Args:
+        mascara (np.ndarray): Selección del explorador de filtros
+    
+    Returns:
+        Dict[str, pd.DataFrame]: Ver calcular_intervalos_fatalidad
+    """
+    return _intervalos_por_seleccion(version_datos(), huella_mascara(mascara), mascara)
+
+# Miembros del conjunto de estadisticas y la funcion que calcula cada uno
+CALCULOS_ESTADISTICAS = {
+    'metricas_basicas': calcular_metricas_basicas,
+    'estadisticas_edad': calcular_estadisticas_edad,
+    'tasas_actividad': calcular_tasas_actividad,
+    'intervalos_fatalidad': calcular_intervalos_fatalidad
+}
+
+def obtener_estadisticas_completas(_df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Calcula estadísticas descriptivas completas (todos los miembros de CALCULOS_ESTADISTICAS).
+    Para calcular solo lo que se muestra usar cargar_datos_y_estadisticas.
+      
+    Args:
+        _df (pd.DataFrame): DataFrame con los datos de ataques de tiburones
+    
+    Returns:
+        Dict[str, Any]: Diccionario con cuatro componentes:
+            - 'metricas_basicas': Total registros, conteos fatales, tasa fatalidad, etc.
+            - 'estadisticas_edad': DataFrame con stats descriptivas por tipo de caso
+            - 'tasas_actividad': DataFrame con tasas de fatalidad por actividad ordenadas
+            - 'intervalos_fatalidad': Tasas con intervalos de confianza por variable
+    
+    """
+    return {nombre: calculo(_df) for nombre, calculo in CALCULOS_ESTADISTICAS.items()}
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _estadisticas_por_version(version: str) -> estadisticas.EstadisticasPerezosas:
+    """
+    Conjunto perezoso de estadísticas de una versión de datos, compartido entre reruns y
+    sesiones; cada miembro se calcula una sola vez por versión.
+    
+    Args:
+        version (str): Versión de los datos de origen (version_datos), clave de la caché
+    
+    Returns:
+        estadisticas.EstadisticasPerezosas: Estadísticas sin calcular hasta el primer acceso
+    """
+    return estadisticas.EstadisticasPerezosas(load_and_clean_data(), CALCULOS_ESTADISTICAS, version)
 
 def cargar_datos_y_estadisticas():
     """
-    Función principal que carga los datos y calcula todas las estadísticas necesarias.
+    Función principal que carga los datos y las estadísticas. Las estadísticas se devuelven
+    como un diccionario perezoso memorizado por versión de datos: cada miembro se calcula al
+    primer acceso, por lo que la página solo paga por lo que muestra.
     
     Returns:
         tuple: Tupla con dos elementos:
             - pd.DataFrame: DataFrame con todos los datos limpios
-            - dict: Diccionario con todas las estadísticas calculadas
+            - Mapping: Estadísticas (mismas claves que obtener_estadisticas_completas), o {}
+              si no hay datos
     """
     df = load_and_clean_data()
-    estadisticas = obtener_estadisticas_completas(df) if not df.empty else {}
-    return df, estadisticas
\ No newline at end of file
+    if df.empty:
+        return df, {}
+    return df, _estadisticas_por_version(version_datos())
+
+def metricas_estadisticas() -> Dict[str, Any]:
+    """Miembros de las estadísticas ya calculados para la versión actual y cuántas veces se calculó cada uno."""
+    return _estadisticas_por_version(version_datos()).metricas()
+
+def mostrar_metricas_estadisticas():
+    """
+    Muestra qué miembros de las estadísticas se calcularon para la versión actual de los datos
+    y cuántas veces, para verificar que cada página solo calcula lo que muestra.
+    """
+    metricas = metricas_estadisticas()
+    with st.expander("métricas de las estadísticas"):
+        st.caption(f"versión de datos: {metricas['version']}")
+        st.json(metricas['materializaciones'])
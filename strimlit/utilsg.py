@@ -4,8 +4,13 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import plotly.io as pio
+import threading
+from collections import OrderedDict
 from typing import Optional
 import utils
+import cubo
+import actividades
 
 COLORES = {
     'fatal': '#1f77b4',      
@@ -21,54 +26,108 @@ COLORES = {
 PALETA_AZULES = ['#1f77b4', '#aec7e8', '#6baed6', '#3182bd', '#08519c', '#d0d1e6', '#9ecae1', '#c6dbef']
 PALETA_SECUENCIAL = 'Blues'
 
-def load_and_clean_data1() -> pd.DataFrame:
-    """Carga datos usando utils y añade transformaciones específicas para gráficos"""
-    df, _ = utils.cargar_datos_y_estadisticas()
+def _solo_lectura(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Marca como no escribibles los arreglos de NumPy que respaldan cada columna, de modo que
+    las vistas que se entregan a las páginas no puedan modificar el DataFrame en caché.
+    """
+    for columna in df.columns:
+        valores = df[columna].array
+        arreglo = valores.codes if isinstance(valores, pd.Categorical) else df[columna].to_numpy()
+        while isinstance(arreglo.base, np.ndarray):
+            arreglo = arreglo.base
+        arreglo.flags.writeable = False
+    return df
+
+@st.cache_resource(max_entries=2, show_spinner="preparando datos para gráficos...")
+def _construir_datos_graficos(version: str) -> pd.DataFrame:
+    """
+    Construye una sola vez por proceso y por versión de datos el DataFrame derivado para
+    gráficos (activity_clean, season_clean y age_group). El resultado se comparte entre
+    todas las llamadas y sesiones, por lo que se devuelve en modo solo lectura.
     
-    # Añadir transformaciones específicas para gráficos
-    # Limpieza y categorización de actividades
-    df['activity'] = df['activity'].astype(str).str.upper().str.strip()
+    Args:
+        version (str): Versión de los datos de origen (utils.version_datos), clave de la caché
     
-    activity_mapping = {
-        'SURFING': 'Surfing', 'SURF': 'Surfing', 'SURFER': 'Surfing',
-        'BODYBOARDING': 'Bodyboarding', 'BODY BOARDING': 'Bodyboarding', 'BOOGIE BOARDING': 'Bodyboarding',
-        'FISHING': 'Pesca', 'FISHERMAN': 'Pesca', 'SPEARFISHING': 'Pesca',
-        'SWIMMING': 'Natación', 'SWIM': 'Natación', 'SWIMMER': 'Natación',
-        'PADDLE BOARDING': 'Paddle Boarding', 'STAND-UP PADDLE BOARDING': 'Paddle Boarding',
-        'DIVING': 'Buceo', 'SCUBA DIVING': 'Buceo', 'SNORKELING': 'Buceo',
-        'WADING': 'Vadeo', 'WADE FISHING': 'Vadeo',
-        'KAYAKING': 'Kayaking', 'CANOEING': 'Kayaking',
-        'SURF-SKIING': 'Surf-skiing', 'SURF SKIING': 'Surf-skiing',
-        'ROWING': 'Remo', 'ROWBOAT': 'Remo'
-    }
+    Returns:
+        pd.DataFrame: DataFrame limpio con las columnas derivadas para gráficos
+    """
+    df = utils.load_and_clean_data()
     
-    df['activity_clean'] = df['activity'].map(activity_mapping)
-    df.loc[df['activity_clean'].isna(), 'activity_clean'] = 'Otras actividades'
+    # Añadir transformaciones específicas para gráficos
+    # Categorización de actividades (reglas y coincidencia difusa sobre los valores únicos)
+    df['activity_clean'] = actividades.normalizar_actividades(df['activity'])
     
     # Limpieza de temporadas
     season_mapping = {
         'WINTER': 'Invierno', 'SUMMER': 'Verano', 
         'SPRING': 'Primavera', 'FALL': 'Otoño', 'AUTUMN': 'Otoño'
     }
-    df['season_clean'] = df['season'].map(season_mapping).fillna('Desconocido')
+    df['season_clean'] = df['season'].astype(str).map(season_mapping).fillna('Desconocido')
     
     # Crear grupos de edad (igual que en Estadísticas Descriptivas)
-    bins = [0, 18, 30, 45, 60, 100]
-    labels = ['0-18', '19-30', '31-45', '46-60', '60+']
-    df['age_group'] = pd.cut(df['age'], bins=bins, labels=labels, right=False)
+    df['age_group'] = utils.grupos_edad(df['age'])
     
-    return df
+    return _solo_lectura(df)
 
-def grafico_fatalidad_interactivo() -> go.Figure:
-    """Gráfico circular interactivo para fatalidad usando datos de utils"""
-    df = load_and_clean_data1()
+# Dimensiones del cubo de conteos de los graficos (columnas derivadas de _construir_datos_graficos)
+DIMENSIONES_CUBO_GRAFICOS = ('activity_clean', 'season_clean', 'age_group', 'is_fatal_cat')
+
+@utils.cache_por_version(st.cache_resource, max_entries=2, show_spinner=False)
+def obtener_cubo_graficos(mascara: Optional[np.ndarray] = None) -> cubo.CuboConteos:
+    """
+    Cubo de conteos sobre las columnas derivadas para gráficos de la versión actual de los
+    datos; las tablas de los gráficos se obtienen sumando el cubo.
     
-    # Usar analizar_frecuencias de utils para obtener datos consistentes
-    tabla_fatalidad = utils.analizar_frecuencias(df, 'is_fatal_cat', excluir_desconocido=True)
+    Args:
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros (ver utils.cache_por_version)
+    
+    Returns:
+        cubo.CuboConteos: Cubo sobre DIMENSIONES_CUBO_GRAFICOS
+    """
+    df = utils.aplicar_mascara(load_and_clean_data1(), mascara)
+    return cubo.CuboConteos.desde_dataframe(df, DIMENSIONES_CUBO_GRAFICOS)
+
+def load_and_clean_data1() -> pd.DataFrame:
+    """
+    Devuelve el DataFrame para gráficos como una vista superficial (sin copiar datos) del
+    DataFrame derivado en caché para la versión actual de los datos. Las transformaciones
+    se ejecutan una sola vez por proceso, no una vez por gráfico.
+    """
+    return _construir_datos_graficos(utils.version_datos()).copy(deep=False)
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _cobertura_por_version(version: str) -> dict:
+    """
+    Informe de cobertura de la normalización de actividades, calculado una vez por versión.
+    
+    Args:
+        version (str): Versión de los datos de origen (utils.version_datos), clave de la caché
+    
+    Returns:
+        dict: Resultado de actividades.informe_cobertura sobre la columna activity
+    """
+    return actividades.informe_cobertura(utils.load_and_clean_data()['activity'])
+
+def cobertura_actividades() -> dict:
+    """
+    Cobertura y tiempo de la normalización de actividades (activity_clean) para la versión
+    actual de los datos: proporción de filas y de valores únicos con actividad conocida que
+    llegan a una categoría, y cuántos se resolvieron por cada método.
+    """
+    return _cobertura_por_version(utils.version_datos())
+
+def grafico_fatalidad_interactivo(mascara: Optional[np.ndarray] = None) -> go.Figure:
+    """Gráfico circular interactivo para fatalidad usando datos de utils"""
+    # Tabla desde el cubo de conteos (mismo resultado que utils.analizar_frecuencias)
+    tabla_fatalidad = obtener_cubo_graficos(mascara).frecuencias('is_fatal_cat', excluir_desconocido=True)
     
     # Filtrar solo datos conocidos de fatalidad
     fatal_data = tabla_fatalidad[tabla_fatalidad['Categoria'].isin(['Fatal', 'No Fatal'])]
     
+    if fatal_data.empty:
+        return go.Figure()
+    
     # Calcular porcentajes para mostrar en etiquetas
     total = fatal_data['Frecuencia Absoluta'].sum()
     fatal_data = fatal_data.copy()
@@ -96,13 +155,11 @@ def grafico_fatalidad_interactivo() -> go.Figure:
     
     return fig
 
-def grafico_actividad_interactivo(condicionar_fatalidad: bool = False) -> go.Figure:
+def grafico_actividad_interactivo(condicionar_fatalidad: bool = False, mascara: Optional[np.ndarray] = None) -> go.Figure:
     """Gráfico de actividades usando tablas de utils"""
-    df = load_and_clean_data1()
-    
     if condicionar_fatalidad:
-        # Usar crear_tablas_doble_entrada de utils para datos consistentes
-        tablas = utils.crear_tablas_doble_entrada(df, 'activity_clean', 'is_fatal_cat')
+        # Tablas desde el cubo de conteos (mismo resultado que utils.crear_tablas_doble_entrada)
+        tablas = obtener_cubo_graficos(mascara).tablas_doble_entrada('activity_clean', 'is_fatal_cat')
         
         if not tablas:
             return go.Figure()
@@ -150,8 +207,8 @@ def grafico_actividad_interactivo(condicionar_fatalidad: bool = False) -> go.Fig
         fig.update_yaxes(range=[0, max_valor * 1.15])
         
     else:
-        # Usar analizar_frecuencias de utils para datos consistentes
-        tabla_actividad = utils.analizar_frecuencias(df, 'activity_clean', excluir_desconocido=True)
+        # Tabla desde el cubo de conteos (mismo resultado que utils.analizar_frecuencias)
+        tabla_actividad = obtener_cubo_graficos(mascara).frecuencias('activity_clean', excluir_desconocido=True)
         top_actividades = tabla_actividad.head(8)
         
         fig = px.bar(
@@ -182,9 +239,9 @@ def grafico_actividad_interactivo(condicionar_fatalidad: bool = False) -> go.Fig
     
     return fig
 
-def grafico_edad_interactivo(condicionar_fatalidad: bool = False) -> go.Figure:
+def grafico_edad_interactivo(condicionar_fatalidad: bool = False, mascara: Optional[np.ndarray] = None) -> go.Figure:
     """Gráfico de distribución de edad"""
-    df = load_and_clean_data1()
+    df = utils.aplicar_mascara(load_and_clean_data1(), mascara)
     
     # Filtrar edades válidas
     age_data = df[df['age'].notna()]
@@ -234,13 +291,11 @@ def grafico_edad_interactivo(condicionar_fatalidad: bool = False) -> go.Figure:
     
     return fig
 
-def grafico_grupo_edad_interactivo(condicionar_fatalidad: bool = False) -> go.Figure:
+def grafico_grupo_edad_interactivo(condicionar_fatalidad: bool = False, mascara: Optional[np.ndarray] = None) -> go.Figure:
     """Gráfico de grupos de edad usando funciones de utils"""
-    df = load_and_clean_data1()
-    
     if condicionar_fatalidad:
-        # Usar crear_tablas_doble_entrada de utils
-        tablas = utils.crear_tablas_doble_entrada(df, 'age_group', 'is_fatal_cat')
+        # Tablas desde el cubo de conteos (mismo resultado que utils.crear_tablas_doble_entrada)
+        tablas = obtener_cubo_graficos(mascara).tablas_doble_entrada('age_group', 'is_fatal_cat')
         
         if not tablas:
             return go.Figure()
@@ -285,8 +340,8 @@ def grafico_grupo_edad_interactivo(condicionar_fatalidad: bool = False) -> go.Fi
         fig.update_yaxes(range=[0, max_valor * 1.15])
         
     else:
-        # Usar analizar_frecuencias de utils
-        tabla_edad = utils.analizar_frecuencias(df, 'age_group', excluir_desconocido=True)
+        # Tabla desde el cubo de conteos (mismo resultado que utils.analizar_frecuencias)
+        tabla_edad = obtener_cubo_graficos(mascara).frecuencias('age_group', excluir_desconocido=True)
         
         fig = px.bar(
             tabla_edad,
@@ -317,13 +372,11 @@ def grafico_grupo_edad_interactivo(condicionar_fatalidad: bool = False) -> go.Fi
     
     return fig
 
-def grafico_temporada_interactivo(condicionar_fatalidad: bool = False) -> go.Figure:
+def grafico_temporada_interactivo(condicionar_fatalidad: bool = False, mascara: Optional[np.ndarray] = None) -> go.Figure:
     """Gráfico de temporadas usando funciones de utils"""
-    df = load_and_clean_data1()
-    
     if condicionar_fatalidad:
-        # Usar crear_tablas_doble_entrada de utils
-        tablas = utils.crear_tablas_doble_entrada(df, 'season_clean', 'is_fatal_cat')
+        # Tablas desde el cubo de conteos (mismo resultado que utils.crear_tablas_doble_entrada)
+        tablas = obtener_cubo_graficos(mascara).tablas_doble_entrada('season_clean', 'is_fatal_cat')
         
         if not tablas:
             return go.Figure()
@@ -369,8 +422,8 @@ def grafico_temporada_interactivo(condicionar_fatalidad: bool = False) -> go.Fig
         fig.update_yaxes(range=[0, max_valor * 1.15])
         
     else:
-        # Usar analizar_frecuencias de utils
-        tabla_temporada = utils.analizar_frecuencias(df, 'season_clean', excluir_desconocido=True)
+        # Tabla desde el cubo de conteos (mismo resultado que utils.analizar_frecuencias)
+        tabla_temporada = obtener_cubo_graficos(mascara).frecuencias('season_clean', excluir_desconocido=True)
         
         fig = px.bar(
             tabla_temporada,
@@ -400,4 +453,88 @@ def grafico_temporada_interactivo(condicionar_fatalidad: bool = False) -> go.Fig
         max_valor = tabla_temporada['Frecuencia Absoluta'].max()
         fig.update_yaxes(range=[0, max_valor * 1.15])
     
-    return fig
\ No newline at end of file
+    return fig
+
+
+# Caché de figuras serializadas: (grafico, condicionar_fatalidad, version_datos, huella de la mascara) -> JSON
+MAX_FIGURAS_CACHE = 32
+_cache_figuras: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_figuras_lock = threading.Lock()
+_metricas_figuras = {'aciertos': 0, 'fallos': 0, 'desalojos': 0}
+
+GRAFICOS = {
+    'fatalidad': lambda condicionar_fatalidad, mascara: grafico_fatalidad_interactivo(mascara),
+    'actividad': grafico_actividad_interactivo,
+    'edad': grafico_edad_interactivo,
+    'grupo_edad': grafico_grupo_edad_interactivo,
+    'temporada': grafico_temporada_interactivo
+}
+
+def obtener_figura(grafico: str, condicionar_fatalidad: bool = False,
+                   mascara: Optional[np.ndarray] = None) -> go.Figure:
+    """
+    Devuelve la figura de un gráfico desde la caché de figuras serializadas. Si la
+    combinación (grafico, condicionar_fatalidad, versión de datos, máscara) no está en caché,
+    construye la figura, guarda su JSON y desaloja la entrada menos usada recientemente
+    cuando se supera MAX_FIGURAS_CACHE.
+    
+    Args:
+        grafico (str): Nombre del gráfico, una de las claves de GRAFICOS
+        condicionar_fatalidad (bool): Si True, la versión condicionada por fatalidad
+        mascara (Optional[np.ndarray]): Selección del explorador de filtros; None usa todas las filas
+    
+    Returns:
+        go.Figure: Figura de Plotly reconstruida desde el JSON en caché
+    """
+    clave = (grafico, bool(condicionar_fatalidad), utils.version_datos(), utils.huella_mascara(mascara))
+    
+    with _cache_figuras_lock:
+        figura_json = _cache_figuras.get(clave)
+        if figura_json is not None:
+            _cache_figuras.move_to_end(clave)
+            _metricas_figuras['aciertos'] += 1
+    
+    if figura_json is None:
+        figura_json = _construir_figura(clave, grafico, condicionar_fatalidad, mascara)
+    
+    return pio.from_json(figura_json)
+
+def _construir_figura(clave: tuple, grafico: str, condicionar_fatalidad: bool,
+                      mascara: Optional[np.ndarray]) -> str:
+    """Construye una figura, guarda su JSON en la caché con la clave dada y desaloja la menos usada si sobra."""
+    figura_json = GRAFICOS[grafico](condicionar_fatalidad=bool(condicionar_fatalidad), mascara=mascara).to_json()
+    with _cache_figuras_lock:
+        _metricas_figuras['fallos'] += 1
+        _cache_figuras[clave] = figura_json
+        _cache_figuras.move_to_end(clave)
+        while len(_cache_figuras) > MAX_FIGURAS_CACHE:
+            _cache_figuras.popitem(last=False)
+            _metricas_figuras['desalojos'] += 1
+    return figura_json
+
+def precalentar_figuras() -> int:
+    """
+    Construye por adelantado las combinaciones de gráfico y condicionamiento de la versión
+    actual de los datos que aún no están en caché, de modo que los cambios de checkbox sean
+    aciertos. Solo comprueba la presencia de cada clave: las figuras ya guardadas no se
+    deserializan ni cuentan como aciertos, por lo que en los reruns siguientes no cuesta nada.
+    
+    Returns:
+        int: Número de figuras construidas en esta llamada
+    """
+    version = utils.version_datos()
+    construidas = 0
+    for grafico in GRAFICOS:
+        for condicionar_fatalidad in (False, True):
+            clave = (grafico, condicionar_fatalidad, version, None)
+            with _cache_figuras_lock:
+                presente = clave in _cache_figuras
+            if not presente:
+                _construir_figura(clave, grafico, condicionar_fatalidad, None)
+                construidas += 1
+    return construidas
+
+def metricas_cache_figuras() -> dict:
+    """Devuelve aciertos, fallos, desalojos y tamaño actual de la caché de figuras."""
+    with _cache_figuras_lock:
+        return {**_metricas_figuras, 'tamano': len(_cache_figuras)}
@@ -1,13 +1,107 @@
 import streamlit as st
 import pandas as pd
-from utils import _conectar_bd 
+import materializacion
+from utils import _conexion_bd, POOL_BD, version_datos
 
-# Ya no necesitamos definir CONFIG ni _conectar_bd aquí
+# Todas las consultas comparten el pool de conexiones de solo lectura de utils (POOL_BD)
+
+# Consultas equivalentes a cada vista, leidas desde las tablas de resumen materializadas
+RESUMEN_ESTACION = """
+SELECT 
+    clave as estacion,
+    cantidad as cantidad_ataques,
+    ROUND(cantidad * 100.0 / (SELECT SUM(cantidad) FROM resumen_estacion), 2) as porcentaje
+FROM resumen_estacion
+WHERE cantidad > 0
+ORDER BY cantidad_ataques DESC;
+"""
+
+RESUMEN_TOP5_ACTIVIDADES = """
+SELECT 
+    clave as actividad,
+    cantidad as ataques_fatales
+FROM resumen_actividad_fatal
+WHERE cantidad > 0
+ORDER BY ataques_fatales DESC
+LIMIT 5;
+"""
+
+RESUMEN_FASE_LUNAR = """
+SELECT 
+    clave as fase_lunar,
+    cantidad as cantidad_ataques,
+    ROUND(cantidad * 100.0 / (SELECT SUM(cantidad) FROM resumen_fase_lunar), 2) as porcentaje
+FROM resumen_fase_lunar
+WHERE cantidad > 0
+ORDER BY cantidad_ataques DESC;
+"""
+
+RESUMEN_ESPECIES = """
+SELECT 
+    r.clave as especie,
+    s.conservation_status as categoria_conservacion,
+    cs.desc as descripcion_completa
+FROM resumen_especie r
+INNER JOIN SHARKS s ON r.clave = s.id
+INNER JOIN conservation_status cs ON s.conservation_status = cs.id_long
+WHERE r.cantidad > 0;
+"""
+
+# Anchos (en años) de los periodos con nombre para obtener_ataques_por_periodo
+PERIODOS = {'lustro': 5, 'decada': 10, 'siglo': 100}
+
+# Agrupacion por periodo con aritmetica entera: (year / ancho) * ancho es el inicio del periodo.
+# Sin CASE: una sola expresion por fila. El indice de year (o is_fatal + year) lo elige el
+# planificador con las estadisticas de ANALYZE; sin indices (esquema sin migrar) recorre la tabla
+CONSULTA_PERIODOS = """
+SELECT 
+    ((year / :ancho) * :ancho) || '-' || ((year / :ancho) * :ancho + :ancho - 1) as periodo,
+    (year / :ancho) * :ancho as inicio,
+    COUNT(*) as ataques
+FROM shark_attackdatos
+WHERE {filtro_fatal} year IS NOT NULL
+    AND year BETWEEN :desde AND :hasta
+GROUP BY inicio
+ORDER BY inicio;
+"""
+
+# Misma agrupacion sobre el resumen materializado de ataques fatales por año
+CONSULTA_PERIODOS_RESUMEN = """
+SELECT 
+    ((clave / :ancho) * :ancho) || '-' || ((clave / :ancho) * :ancho + :ancho - 1) as periodo,
+    (clave / :ancho) * :ancho as inicio,
+    SUM(cantidad) as ataques
+FROM resumen_fatales_anio
+WHERE cantidad > 0
+    AND clave BETWEEN :desde AND :hasta
+GROUP BY inicio
+ORDER BY inicio;
+"""
+
+@st.cache_data(max_entries=16)
+def _consultar_resumen(consulta_resumen: str, vista: str, version: str) -> pd.DataFrame:
+    """
+    Ejecuta la consulta sobre la tabla de resumen materializada si está vigente para la
+    versión actual de los datos (control_datos); si no, consulta la vista en vivo.
+    
+    Args:
+        consulta_resumen (str): Consulta sobre la tabla de resumen
+        vista (str): Nombre de la vista equivalente, usada como respaldo
+        version (str): Versión de los datos de origen, clave de la caché
+    
+    Returns:
+        pd.DataFrame: Resultado de la consulta
+    """
+    with _conexion_bd() as conn:
+        if not conn:
+            return pd.DataFrame()
+        if materializacion.resumenes_vigentes(conn):
+            return pd.read_sql_query(consulta_resumen, conn)
+        return pd.read_sql_query(f"SELECT * FROM {vista};", conn)
 
-@st.cache_data
 def obtener_ataques_por_estacion():
     """
-    Obtiene la distribución de ataques de tiburones por estación del año desde la vista predefinida.
+    Obtiene la distribución de ataques de tiburones por estación del año desde la tabla de resumen materializada (o la vista predefinida si está desactualizada).
     
 
     Returns:
@@ -17,22 +111,14 @@ def obtener_ataques_por_estacion():
             - porcentaje: Porcentaje que representa cada estación sobre el total de ataques
     """
     try:
-        conn = _conectar_bd() 
-        if not conn:
-            return pd.DataFrame()
-        
-        consulta = "SELECT * FROM vista_ataques_por_estacion;"
-        resultado = pd.read_sql_query(consulta, conn)
-        conn.close()
-        return resultado
+        return _consultar_resumen(RESUMEN_ESTACION, "vista_ataques_por_estacion", version_datos())
     except Exception as e:
         st.error(f"error en consulta de estaciones: {e}")
         return pd.DataFrame()
 
-@st.cache_data
 def obtener_top5_actividades_fatales():
     """
-    Recupera las 5 actividades con mayor número de ataques fatales desde la vista especializada.
+    Recupera las 5 actividades con mayor número de ataques fatales desde la tabla de resumen materializada (o la vista especializada si está desactualizada).
 
     Returns:
         pd.DataFrame: DataFrame con las columnas:
@@ -40,22 +126,14 @@ def obtener_top5_actividades_fatales():
             - ataques_fatales: Cantidad de ataques mortales asociados a cada actividad
     """
     try:
-        conn = _conectar_bd()  
-        if not conn:
-            return pd.DataFrame()
-        
-        consulta = "SELECT * FROM vista_top5_actividades_fatales;"
-        resultado = pd.read_sql_query(consulta, conn)
-        conn.close()
-        return resultado
+        return _consultar_resumen(RESUMEN_TOP5_ACTIVIDADES, "vista_top5_actividades_fatales", version_datos())
     except Exception as e:
         st.error(f"error en consulta de actividades fatales: {e}")
         return pd.DataFrame()
 
-@st.cache_data
 def obtener_ataques_por_fase_lunar():
     """
-    Obtiene la distribución de ataques según las fases lunares desde la vista correspondiente.
+    Obtiene la distribución de ataques según las fases lunares desde la tabla de resumen materializada (o la vista correspondiente si está desactualizada).
 
     Returns:
         pd.DataFrame: DataFrame con las columnas:
@@ -64,22 +142,14 @@ def obtener_ataques_por_fase_lunar():
             - porcentaje: Porcentaje que representa cada fase lunar sobre el total de ataques
     """
     try:
-        conn = _conectar_bd()  
-        if not conn:
-            return pd.DataFrame()
-        
-        consulta = "SELECT * FROM vista_ataques_por_fase_lunar;"
-        resultado = pd.read_sql_query(consulta, conn)
-        conn.close()
-        return resultado
+        return _consultar_resumen(RESUMEN_FASE_LUNAR, "vista_ataques_por_fase_lunar", version_datos())
     except Exception as e:
         st.error(f"error en consulta de fases lunares: {e}")
         return pd.DataFrame()
 
-@st.cache_data
 def obtener_especies_conservacion():
     """
-    Recupera información sobre las especies de tiburones y su estado de conservación desde la vista.
+    Recupera información sobre las especies de tiburones y su estado de conservación desde la tabla de resumen materializada (o la vista si está desactualizada).
     
     Returns:
         pd.DataFrame: DataFrame con información detallada que incluye:
@@ -88,39 +158,75 @@ def obtener_especies_conservacion():
             - Otros datos relevantes sobre la distribución y frecuencia de ataques por especie
     """
     try:
-        conn = _conectar_bd() 
-        if not conn:
-            return pd.DataFrame()
-        
-        consulta = "SELECT * FROM vista_especies_conservacion;"
-        resultado = pd.read_sql_query(consulta, conn)
-        conn.close()
-        return resultado
+        return _consultar_resumen(RESUMEN_ESPECIES, "vista_especies_conservacion", version_datos())
     except Exception as e:
         st.error(f"error en consulta de especies: {e}")
         return pd.DataFrame()
 
-@st.cache_data
 def obtener_ataques_fatales_por_decada():
     """
-    Obtiene la cantidad de ataques fatales agrupados por década desde la vista designada.
+    Obtiene la cantidad de ataques fatales agrupados por década, usando obtener_ataques_por_periodo.
+    Incluye todas las décadas presentes en los datos (no agrupa los años anteriores a 1900 en 'Otra').
     
     Returns:
         pd.DataFrame: DataFrame con las columnas:
             - decada: Rango de años representado por la década (ej: 1990-1999)
             - ataques_fatales: Número total de ataques mortales registrados en esa década
     """
-    try:
-        conn = _conectar_bd() 
+    resultado = obtener_ataques_por_periodo('decada', solo_fatales=True)
+    if resultado.empty:
+        return resultado
+    return resultado.rename(columns={'periodo': 'decada', 'ataques': 'ataques_fatales'})[['decada', 'ataques_fatales']]
+
+@st.cache_data(max_entries=16)
+def _consultar_periodos(ancho: int, solo_fatales: bool, desde: int, hasta: int, version: str) -> pd.DataFrame:
+    """
+    Ejecuta la agrupación por periodos. Los ataques fatales se leen del resumen materializado
+    por año si está vigente; en otro caso se agrupa shark_attackdatos y el planificador de
+    SQLite elige el índice de year (o el compuesto is_fatal + year para los fatales) si existe.
+    """
+    parametros = {'ancho': ancho, 'desde': desde, 'hasta': hasta}
+    consulta = CONSULTA_PERIODOS.format(filtro_fatal="is_fatal = 'Y' AND" if solo_fatales else "")
+    
+    with _conexion_bd() as conn:
         if not conn:
             return pd.DataFrame()
-        
-        consulta = "SELECT * FROM vista_ataques_fatales_por_decada;"
-        resultado = pd.read_sql_query(consulta, conn)
-        conn.close()
-        return resultado
+        if solo_fatales and materializacion.resumenes_vigentes(conn):
+            return pd.read_sql_query(CONSULTA_PERIODOS_RESUMEN, conn, params=parametros)
+        return pd.read_sql_query(consulta, conn, params=parametros)
+
+def obtener_ataques_por_periodo(periodo='decada', solo_fatales: bool = False,
+                                desde: int = None, hasta: int = None) -> pd.DataFrame:
+    """
+    Agrupa los ataques en periodos de ancho fijo (lustro, década, siglo o cualquier número
+    de años) calculados con aritmética entera sobre la columna year.
+    
+    Args:
+        periodo (str | int): 'lustro', 'decada', 'siglo' o el ancho del periodo en años
+        solo_fatales (bool): Si True, cuenta solo los ataques fatales
+        desde (int): Primer año a considerar (por defecto, sin límite)
+        hasta (int): Último año a considerar (por defecto, sin límite)
+    
+    Returns:
+        pd.DataFrame: DataFrame con las columnas:
+            - periodo: Rango de años del periodo (ej: 1990-1999)
+            - inicio: Primer año del periodo
+            - ataques: Número de ataques en el periodo
+    """
+    ancho = PERIODOS.get(periodo, periodo)
+    if not isinstance(ancho, int) or ancho <= 0:
+        st.error(f"periodo no valido: {periodo}")
+        return pd.DataFrame()
+    
+    try:
+        return _consultar_periodos(
+            ancho, solo_fatales,
+            desde if desde is not None else -9999,
+            hasta if hasta is not None else 9999,
+            version_datos()
+        )
     except Exception as e:
-        st.error(f"error en consulta de decadas: {e}")
+        st.error(f"error en consulta de periodos: {e}")
         return pd.DataFrame()
 
 def mostrar_consulta(funcion_consulta, titulo, descripcion, codigo_sql):
@@ -155,4 +261,17 @@ def mostrar_consulta(funcion_consulta, titulo, descripcion, codigo_sql):
     else:
         st.warning("no se encontraron datos para esta consulta")
     
-    st.markdown("---")
\ No newline at end of file
+    st.markdown("---")
+
+def mostrar_metricas_pool():
+    """
+    Muestra las métricas del pool compartido de conexiones (adquisiciones, tasa de
+    reutilización y tiempos de espera), útiles para dimensionarlo con varias sesiones.
+    """
+    metricas = POOL_BD.metricas()
+    with st.expander("métricas del pool de conexiones"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Adquisiciones", metricas['adquisiciones'])
+        col2.metric("Tasa de reutilización", f"{metricas['tasa_reutilizacion'] * 100:.1f}%")
+        col3.metric("Espera promedio", f"{metricas['espera_promedio_ms']:.3f} ms")
+        st.json(metricas)